@@ -2,6 +2,8 @@
 
 from fastapi import APIRouter
 from app.services.cache_service import cache_service
+from app.services.embedding_store import embedding_store
+from app.detectors.document_classifier import classification_gate
 
 router = APIRouter(prefix="/api/cache", tags=["Cache Management"])
 
@@ -10,9 +12,16 @@ router = APIRouter(prefix="/api/cache", tags=["Cache Management"])
 def get_cache_stats():
     """
     Get cache statistics.
-    Returns total entries, size, and breakdown by operation.
+    Returns total entries, size, breakdown by operation,
+    per-tier hit ratios, request coalescing counters and how many
+    classifications the rule-based tier answered without Gemini.
     """
+    from app.llm.gemini_client import async_gemini
+
     stats = cache_service.stats()
+    stats["coalescing"] = async_gemini.flight.stats()
+    stats["embedding_store"] = embedding_store.stats()
+    stats["classifier"] = classification_gate.stats()
 
     return {
         "status": "ok",
@@ -36,6 +45,8 @@ def clear_cache(operation: str = None):
     """
 
     cache_service.clear(operation)
+    if operation in (None, "embeddings"):
+        embedding_store.clear()
 
     message = f"Cleared cache"
     if operation:
@@ -48,11 +59,32 @@ def clear_cache(operation: str = None):
     }
 
 
+@router.post("/reindex")
+def reindex_cache():
+    """
+    Rebuild the cache manifest from the entry files on disk.
+    Only needed if files were added or removed outside the API.
+    """
+
+    indexed = cache_service.reindex()
+
+    return {
+        "status": "ok",
+        "message": f"Indexed {indexed} cache entries",
+        "new_stats": cache_service.stats()
+    }
+
+
 @router.post("/warm")
-def warm_cache():
+async def warm_cache():
     """
     Pre-warm cache with common document types.
     Useful for testing or demo purposes.
+
+    The samples are classified by Gemini even when the rule-based tier
+    would answer them, since its answers are never cached. Each entry
+    reports whether it was written, already cached, or not written
+    (the Gemini call failed).
     """
 
     sample_texts = {
@@ -61,20 +93,32 @@ def warm_cache():
         "report": "QUARTERLY REPORT\nQ4 2024\nRevenue: $1.2M\nProfit: $450K"
     }
 
-    from app.llm.gemini_client import gemini
+    from app.llm.gemini_client import async_gemini
 
     warmed = []
     for doc_type, text in sample_texts.items():
-        result = gemini.classify_document(text)
+        if cache_service.contains(text, "classify"):
+            status = "already cached"
+        else:
+            status = None
+
+        result = await async_gemini.classify_document(text, use_rules=False)
+
+        if status is None:
+            status = "written" if cache_service.contains(text, "classify") else "not written"
+
         warmed.append({
             "type": doc_type,
             "classified_as": result.get("document_type"),
-            "confidence": result.get("confidence")
+            "confidence": result.get("confidence"),
+            "cache": status,
         })
 
+    written = sum(1 for w in warmed if w["cache"] == "written")
+
     return {
         "status": "ok",
-        "message": "Cache warmed with sample documents",
+        "message": f"Wrote {written} of {len(warmed)} sample classifications to the cache",
         "warmed": warmed,
         "new_stats": cache_service.stats()
-    }
\ No newline at end of file
+    }
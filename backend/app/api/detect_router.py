@@ -1,23 +1,50 @@
 # app/api/detect_router.py
 
 from fastapi import APIRouter, Query, HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.services.document_service import document_service
-from app.llm.gemini_client import GeminiClient
+from app.llm.gemini_client import async_gemini
+from app.services.extractor_service import extractor_service
 
 router = APIRouter(prefix="/api", tags=["Document Detection"])
-gemini = GeminiClient()
 
 @router.post("/detect")
-async def detect_document(file_id: str = Query(...)):
+async def detect_document(
+    file_id: str = Query(...),
+    partial: bool = Query(False, description="Allow detection on the pages OCR'd so far"),
+    near_duplicates: bool = Query(False, description="Borrow the classification of a near-identical document"),
+):
     text = document_service.get_text(file_id)
+    pages_done = None
+
+    if not text and partial:
+        # Streaming OCR still running: classify on its first pages
+        done = await run_in_threadpool(document_service.get_partial_text, file_id)
+        if done:
+            text, pages_done = done
 
     if not text:
         raise HTTPException(status_code=400, detail="OCR missing. Run /api/ocr first.")
 
-    result = gemini.classify_document(text)
+    near_duplicate, borrowed = None, {}
+    if pages_done is None:
+        fingerprint = document_service.get_fingerprint(file_id)
+        if near_duplicates:
+            near_duplicate, borrowed = await run_in_threadpool(
+                extractor_service.reuse_near_duplicate, text, fingerprint
+            )
+    else:
+        # No fingerprint until the full text is saved; cache by content
+        fingerprint = None
+
+    result = borrowed.get("classify") or await async_gemini.classify_document(text, fingerprint)
 
     return {
         "file_id": file_id,
         "document_type": result.get("document_type", "unknown"),
         "confidence": result.get("confidence", 0.0),
+        "tier": result.get("tier", "gemini"),
+        "near_duplicate": near_duplicate,
+        "partial": pages_done is not None,
+        "pages_done": pages_done,
     }
@@ -1,49 +1,60 @@
 # app/api/extract_router.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from app.extractors.local_engine import UnsupportedDocumentType
 from app.services.document_service import document_service
-from app.llm.gemini_client import GeminiClient
-from app.services.nlp_service import nlp_service
+from app.services.extractor_service import extraction_response, extractor_service
 
 router = APIRouter(prefix="/api", tags=["Extraction"])
-gemini = GeminiClient()
 
 @router.post("/extract/{file_id}")
 async def extract_document(
     file_id: str,
     override_type: str | None = None,
     include_summary: bool = False,
-    include_embeddings: bool = False
+    include_embeddings: bool = False,
+    embeddings_format: str = Query("list", pattern="^(list|base64)$"),
+    pipeline: str = Query("sequential", pattern="^(sequential|concurrent)$"),
+    fused: bool = False,
+    near_duplicates: bool = False,
+    engine: str = Query("gemini", pattern="^(gemini|local)$")
 ):
     # 1. Get OCR text
     text = document_service.get_text(file_id)
     if not text:
         raise HTTPException(status_code=400, detail="OCR missing. Run /api/ocr first.")
 
-    # 2. Detect type using Gemini
-    detected = gemini.classify_document(text)
-    detected_type = detected.get("document_type")
-    confidence = detected.get("confidence", 0.0)
-
-    # Use override only if provided
-    used_type = override_type or detected_type
-
-    # 3. Extract structured information
-    extraction = gemini.extract_structured(text, used_type)
-
-    # 4. Summary
-    summary = gemini.summarize(text) if include_summary else None
-
-    # 5. Embeddings
-    embeddings = nlp_service.embed_text(text) if include_embeddings else None
-
-    return {
-        "file_id": file_id,
-        "detected_type": detected_type,
-        "used_type": used_type,
-        "override_used": override_type is not None,
-        "detection_confidence": confidence,
-        "extraction": extraction,
-        "summary": summary,
-        "embeddings": embeddings,
-    }
+    # engine=local: rule-based classify + extract only, no Gemini call
+    if engine == "local":
+        if include_summary or include_embeddings:
+            raise HTTPException(
+                status_code=422,
+                detail="engine=local does not call Gemini; summary and embeddings are unavailable.",
+            )
+        try:
+            result = await run_in_threadpool(extractor_service.run_local, text, override_type)
+        except UnsupportedDocumentType as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        return extraction_response(file_id, override_type, result, embeddings_format)
+
+    # 2-5. Classify, extract, summarize, embed
+    #   pipeline=concurrent runs independent stages side by side,
+    #   fused=true classifies and extracts in one Gemini call,
+    #   near_duplicates=true borrows results of a near-identical document
+    #   (reported, with its match score, under "near_duplicate")
+    result = await extractor_service.run(
+        text,
+        fingerprint=document_service.get_fingerprint(file_id),
+        file_id=file_id,
+        override_type=override_type,
+        include_summary=include_summary,
+        include_embeddings=include_embeddings,
+        mode=pipeline,
+        fused=fused,
+        near_duplicates=near_duplicates,
+    )
+
+    return extraction_response(file_id, override_type, result, embeddings_format)
+
@@ -0,0 +1,157 @@
+# app/api/jobs_router.py
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.api.upload_router import UPLOAD_FORM, accept_upload
+from app.models.job_model import JobListResponse, JobResponse
+from app.services.document_service import document_service
+from app.services.job_queue import TERMINAL, job_queue
+from app.utils.config import JOB_POLL_SECONDS
+from app.utils.sse import SSE_HEADERS, sse_event
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+def _job_response(job: dict, include_result: bool = True) -> JobResponse:
+    return JobResponse(
+        job_id=job["id"],
+        file_id=job["file_id"],
+        status=job["status"],
+        stage=job["stage"],
+        options=job["options"] or {},
+        stages=job["stages"] or {},
+        result=job["result"] if include_result else None,
+        error=job["error"],
+        attempts=job["attempts"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        finished_at=job["finished_at"],
+    )
+
+
+async def _get_job(job_id: str) -> dict:
+    job = await run_in_threadpool(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("", response_model=JobResponse, status_code=202, openapi_extra=UPLOAD_FORM)
+async def submit_job(
+    request: Request,
+    file_id: Optional[str] = Query(None, description="Process an existing upload instead of a new file"),
+    override_type: str | None = None,
+    include_summary: bool = False,
+    include_embeddings: bool = False,
+    embeddings_format: str = Query("list", pattern="^(list|base64)$"),
+    pipeline: str = Query("sequential", pattern="^(sequential|concurrent)$"),
+    fused: bool = False,
+    near_duplicates: bool = False,
+    engine: str = Query("gemini", pattern="^(gemini|local)$"),
+):
+    """
+    Queue the whole pipeline (OCR -> detect -> extract) for a document.
+
+    Send the file as multipart field "file" (stored exactly like
+    /api/upload), or pass `file_id` of an earlier upload with no body.
+    The other parameters are those of /api/extract. Returns 202 with the
+    job straight away; follow it with GET /api/jobs/{job_id} or the
+    /api/jobs/{job_id}/events stream. Jobs are persisted, so they finish
+    even if the client disconnects or the server restarts.
+    """
+    if engine == "local" and (include_summary or include_embeddings):
+        raise HTTPException(
+            status_code=422,
+            detail="engine=local does not call Gemini; summary and embeddings are unavailable.",
+        )
+
+    if file_id is None:
+        file_id = (await accept_upload(request)).file_id
+    elif await run_in_threadpool(document_service.get_blob, file_id) is None:
+        raise HTTPException(status_code=404, detail=f"File not found in uploads/: {file_id}")
+
+    job = await job_queue.submit(file_id, {
+        "override_type": override_type,
+        "include_summary": include_summary,
+        "include_embeddings": include_embeddings,
+        "embeddings_format": embeddings_format,
+        "pipeline": pipeline,
+        "fused": fused,
+        "near_duplicates": near_duplicates,
+        "engine": engine,
+    })
+    return _job_response(job)
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|completed|failed|cancelled)$"),
+    limit: int = Query(50, ge=1, le=500),
+    include_results: bool = False,
+):
+    """
+    Most recent jobs first. Results are left out unless include_results=true.
+    """
+    jobs = await run_in_threadpool(job_queue.store.list, status, limit)
+    return JobListResponse(
+        total=len(jobs),
+        jobs=[_job_response(job, include_results) for job in jobs],
+    )
+
+
+@router.get("/stats")
+async def job_stats():
+    """
+    Worker pool size and usage, and job counts by status.
+    """
+    return {"status": "ok", "jobs": await run_in_threadpool(job_queue.stats)}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Status of a job: current stage, a summary of every finished stage and,
+    once completed, the same result body as /api/extract.
+    """
+    return _job_response(await _get_job(job_id))
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Follow a job as server-sent events: a `job` event with the job (no
+    result) every time it changes, then `done` with the full job once it
+    is completed, failed or cancelled.
+    """
+    job = await _get_job(job_id)
+
+    async def events():
+        current, last_update = job, None
+        while True:
+            if current["status"] in TERMINAL:
+                yield sse_event("done", _job_response(current).model_dump())
+                return
+
+            if current["updated_at"] != last_update:
+                last_update = current["updated_at"]
+                yield sse_event("job", _job_response(current, include_result=False).model_dump())
+
+            await job_queue.wait_for_change(JOB_POLL_SECONDS)
+            current = await run_in_threadpool(job_queue.store.get, job_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a job that is still queued (409 once it has started).
+    """
+    job = await _get_job(job_id)
+
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; only queued jobs can be cancelled")
+
+    return _job_response(await _get_job(job_id))
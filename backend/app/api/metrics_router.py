@@ -0,0 +1,33 @@
+# app/api/metrics_router.py
+
+from fastapi import APIRouter, Response
+from starlette.concurrency import run_in_threadpool
+from app.services.ocr_service import ocr_service
+from app.services.job_queue import TERMINAL, job_queue
+from app.utils.metrics import OCR_QUEUE, PIPELINE_JOBS, registry
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _refresh_gauges():
+    """Snapshot gauges owned by the services, read at scrape time."""
+    queue = ocr_service.queue_stats()
+    OCR_QUEUE.set(queue["running"], state="running")
+    OCR_QUEUE.set(queue["queued"], state="queued")
+
+    counts = job_queue.store.counts()
+    for status in ("queued", "running", *sorted(TERMINAL)):
+        PIPELINE_JOBS.set(counts.get(status, 0), status=status)
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Process metrics in the Prometheus text exposition format: stage and
+    upstream latency histograms, Gemini / Document AI call and token
+    counters, cache lookups by operation and tier, in-flight gauges.
+    """
+    await run_in_threadpool(_refresh_gauges)
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
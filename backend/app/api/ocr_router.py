@@ -1,26 +1,181 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
-from app.services.ocr_service import ocr_service
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.services.ocr_service import ocr_service, OCRQueueFull
 from app.services.document_service import document_service
-from app.models.ocr_response import OCRResponse
+from app.models.ocr_response import (
+    OCRResponse,
+    OCRBatchRequest,
+    OCRBatchItem,
+    OCRBatchResponse,
+)
+from app.utils.config import OCR_BATCH_CONCURRENCY
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.sse import SSE_HEADERS, sse_event
+from app.utils.text_utils import join_page_texts
 
 router = APIRouter(prefix="/api/ocr", tags=["OCR"])
 
+
+@router.get("/queue")
+def ocr_queue():
+    """
+    Current OCR worker pool usage: running and queued jobs.
+    """
+    return {"status": "ok", "queue": ocr_service.queue_stats()}
+
+
+@router.post("/batch", response_model=OCRBatchResponse)
+async def perform_ocr_batch(request: OCRBatchRequest):
+    """
+    OCR many uploaded files in one call.
+
+    Documents that already have text in cache/{file_id}.txt, or whose
+    file content was OCR'd before under another file_id, are not sent to
+    Document AI again.
+    The rest are OCR'd with at most OCR_BATCH_CONCURRENCY in flight, and
+    each one reports its own result or error.
+    """
+
+    # Preserve request order, drop duplicates
+    file_ids = list(dict.fromkeys(request.file_ids))
+    limit = asyncio.Semaphore(OCR_BATCH_CONCURRENCY)
+
+    async def run_one(file_id: str) -> OCRBatchItem:
+        text = await run_in_threadpool(document_service.get_text, file_id)
+        if text:
+            return OCRBatchItem(
+                file_id=file_id,
+                status="cached",
+                chars=len(text),
+                text=text if request.include_text else None,
+            )
+
+        async with limit:
+            try:
+                blob = await run_in_threadpool(document_service.get_blob, file_id)
+                if blob is None:
+                    raise FileNotFoundError(f"File not found in uploads/: {file_id}")
+                text, cached = await ocr_service.extract_blob_async(
+                    blob, document_service.blob_path(blob["sha256"])
+                )
+                await run_in_threadpool(document_service.save_text, file_id, text)
+            except Exception as e:
+                return OCRBatchItem(file_id=file_id, status="error", error=str(e))
+
+        return OCRBatchItem(
+            file_id=file_id,
+            status="cached" if cached else "ok",
+            chars=len(text),
+            text=text if request.include_text else None,
+        )
+
+    results = await asyncio.gather(*(run_one(fid) for fid in file_ids))
+
+    return OCRBatchResponse(
+        total=len(results),
+        processed=sum(1 for r in results if r.status == "ok"),
+        cached=sum(1 for r in results if r.status == "cached"),
+        failed=sum(1 for r in results if r.status == "error"),
+        results=results,
+    )
+
+
+@router.api_route("/{file_id}/stream", methods=["GET", "POST"])
+async def perform_ocr_stream(file_id: str):
+    """
+    OCR an uploaded file and stream its text as server-sent events, one
+    `pages` event per page range as soon as that range is done:
+
+        event: start  {"file_id", "sha256", "cached"}
+        event: pages  {"first_page", "last_page", "text"}   (completion order)
+        event: done   {"file_id", "sha256", "chars", "cached"}
+        event: error  {"detail"}
+
+    Finished ranges are saved as they arrive, so /api/detect?partial=true
+    can start on the first pages while the rest are still being OCR'd.
+    The complete text is saved and cached the same way as POST
+    /api/ocr/{file_id}, and a concurrent POST for the same file shares
+    its Document AI calls. last_page is null when the document was OCR'd
+    in a single request. The saved ranges are removed once the stream
+    ends, however it ends.
+    """
+
+    blob = await run_in_threadpool(document_service.get_blob, file_id)
+    if blob is None:
+        raise HTTPException(status_code=404, detail=f"File not found in uploads/: {file_id}")
+
+    async def events():
+        text = ocr_service.cached_blob_text(blob)
+        cached = text is not None
+        yield sse_event("start", {"file_id": file_id, "sha256": blob["sha256"], "cached": cached})
+
+        try:
+            if cached:
+                yield sse_event("pages", {"first_page": 1, "last_page": None, "text": text})
+            else:
+                parts = []
+                with STAGE_SECONDS.time(stage="ocr"):
+                    try:
+                        file_bytes = await run_in_threadpool(document_service.read_file_bytes, file_id)
+                        mime_type = blob.get("mime_type") or "application/pdf"
+
+                        async for first, last, part in ocr_service.iter_document_async(file_bytes, mime_type, blob):
+                            parts.append((first, part))
+                            if last is not None:
+                                await run_in_threadpool(document_service.save_page_text, file_id, first, last, part)
+                            yield sse_event("pages", {"first_page": first, "last_page": last, "text": part})
+                    except OCRQueueFull as e:
+                        yield sse_event("error", {"detail": str(e)})
+                        return
+                    except Exception as e:
+                        yield sse_event("error", {"detail": f"Document AI OCR failed: {str(e)}"})
+                        return
+
+                parts.sort(key=lambda part: part[0])
+                text = join_page_texts(part for _, part in parts)
+                ocr_service.cache_blob_text(blob, text)
+
+            await run_in_threadpool(document_service.save_text, file_id, text)
+        finally:
+            # Also on error or disconnect. Called directly: once the client
+            # is gone this generator is cancelled, and so would an await be
+            document_service.clear_pages(file_id)
+
+        yield sse_event("done", {
+            "file_id": file_id,
+            "sha256": blob["sha256"],
+            "chars": len(text),
+            "cached": cached,
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/{file_id}", response_model=OCRResponse)
 async def perform_ocr(file_id: str):
+    """
+    OCR an uploaded file. Results are cached per file content (SHA-256),
+    so a file whose bytes were OCR'd before returns immediately.
+    """
 
-    try:
-        raw_bytes = document_service.read_file_bytes(file_id)
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    blob = await run_in_threadpool(document_service.get_blob, file_id)
+    if blob is None:
+        raise HTTPException(status_code=404, detail=f"File not found in uploads/: {file_id}")
 
     try:
-        text = ocr_service.extract_text(raw_bytes)
+        text, cached = await ocr_service.extract_blob_async(
+            blob, document_service.blob_path(blob["sha256"])
+        )
+    except OCRQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Document AI OCR failed: {str(e)}"
         )
 
-    document_service.save_text(file_id, text)
+    await run_in_threadpool(document_service.save_text, file_id, text)
 
-    return OCRResponse(file_id=file_id, text=text)
+    return OCRResponse(file_id=file_id, text=text, sha256=blob["sha256"], cached=cached)
@@ -0,0 +1,69 @@
+# app/api/search_router.py
+
+import time
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.llm.gemini_client import async_gemini
+from app.services.document_service import document_service
+from app.services.embedding_store import embedding_store
+from app.services.vector_index import embedding_search
+from app.models.search_response import SimilarSearchRequest, SimilarSearchResponse
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.post("/similar", response_model=SimilarSearchResponse)
+async def search_similar(request: SimilarSearchRequest):
+    """
+    Top-k documents most similar to a file or a piece of text, by cosine
+    similarity of their embeddings.
+
+    Body:
+        - file_id: an OCR'd document; it is embedded first if needed and
+          left out of its own results
+        - text: free text to embed and search with
+        - top_k: number of results (default 10)
+    """
+
+    if bool(request.file_id) == bool(request.text):
+        raise HTTPException(status_code=400, detail="Provide exactly one of file_id or text.")
+
+    exclude_key = None
+
+    if request.file_id:
+        exclude_key = embedding_store.key_for_label(request.file_id)
+        vector = embedding_store.get(exclude_key) if exclude_key else None
+
+        if vector is None:
+            text = document_service.get_text(request.file_id)
+            if not text:
+                raise HTTPException(status_code=400, detail="OCR missing. Run /api/ocr first.")
+            exclude_key = document_service.get_fingerprint(request.file_id)
+            vector = await async_gemini.generate_embeddings(text, exclude_key, request.file_id)
+        query = f"file_id:{request.file_id}"
+    else:
+        vector = await async_gemini.embed_query(request.text)
+        query = "text"
+
+    if vector is None or not len(vector):
+        raise HTTPException(status_code=502, detail="Embedding unavailable for query.")
+
+    started = time.perf_counter()
+    results = await run_in_threadpool(
+        embedding_search.similar, vector, request.top_k, exclude_key
+    )
+    took_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    return SimilarSearchResponse(
+        query=query,
+        results=results,
+        index=embedding_search.index.stats(),
+        took_ms=took_ms,
+    )
+
+
+@router.get("/stats")
+def search_stats():
+    """Size and mode (brute_force / ivf) of the similarity index."""
+    return {"status": "ok", "index": embedding_search.stats()}
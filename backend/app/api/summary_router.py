@@ -0,0 +1,73 @@
+# app/api/summary_router.py
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.services.document_service import document_service
+from app.llm.gemini_client import async_gemini
+from app.utils.logger import get_logger
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.sse import SSE_HEADERS, sse_event
+
+router = APIRouter(prefix="/api/summary", tags=["Summary"])
+
+logger = get_logger("summary")
+
+
+def _load_text(file_id: str):
+    text = document_service.get_text(file_id)
+    if not text:
+        raise HTTPException(status_code=400, detail="OCR missing. Run /api/ocr first.")
+    return text, document_service.get_fingerprint(file_id)
+
+
+@router.api_route("/{file_id}/stream", methods=["GET", "POST"])
+async def stream_summary(file_id: str):
+    """
+    Summarize an OCR'd document, streaming the summary as server-sent
+    events while Gemini generates it:
+
+        event: start  {"file_id", "cached"}
+        event: delta  {"text"}            (append in order)
+        event: done   {"file_id", "chars", "cached"}
+        event: error  {"detail"}
+
+    `start` goes out before Gemini is called, so the first byte does not
+    wait on the model. A cached summary is replayed as one delta. The
+    finished summary is cached under the same key as
+    /api/extract?include_summary=true, so each one reuses the other.
+    """
+
+    text, fingerprint = await run_in_threadpool(_load_text, file_id)
+
+    async def events():
+        cached = async_gemini.cached_summary(text, fingerprint) is not None
+        yield sse_event("start", {"file_id": file_id, "cached": cached})
+
+        chars = 0
+        try:
+            with STAGE_SECONDS.time(stage="summarize"):
+                async for chunk in async_gemini.summarize_stream(text, fingerprint):
+                    chars += len(chunk)
+                    yield sse_event("delta", {"text": chunk})
+        except Exception as e:
+            logger.warning("gemini call failed", extra={"operation": "summarize_stream", "error": str(e)})
+            yield sse_event("error", {"detail": f"Summary failed: {str(e)}"})
+            return
+
+        yield sse_event("done", {"file_id": file_id, "chars": chars, "cached": cached})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/{file_id}")
+async def summarize_document(file_id: str):
+    """
+    Summary of an OCR'd document in one response (cached like the stream).
+    """
+
+    text, fingerprint = await run_in_threadpool(_load_text, file_id)
+    cached = async_gemini.cached_summary(text, fingerprint) is not None
+    summary = await async_gemini.summarize(text, fingerprint)
+
+    return {"file_id": file_id, "summary": summary, "cached": cached}
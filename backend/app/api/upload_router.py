@@ -1,17 +1,72 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from app.models.upload_response import UploadResponse
 from app.services.document_service import document_service
+from app.services.upload_stream import UploadError, receive_upload
+from app.utils.metrics import timed_stage
 
 router = APIRouter(prefix="/api/upload", tags=["Upload"])
 
-@router.post("")
-async def upload(file: UploadFile = File(...)):
-    # Read raw bytes
-    file_bytes = await file.read()
+# The body is parsed by receive_upload, not FastAPI, so describe the form here
+UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
-    # Save raw bytes into service
-    file_id = document_service.save_file(file_bytes)
 
-    return {
-        "file_id": file_id,
-        "filename": file.filename
-    }
+@router.post("", response_model=UploadResponse, openapi_extra=UPLOAD_FORM)
+async def upload(request: Request):
+    """
+    Upload a document (multipart field "file").
+
+    The file is streamed to disk in chunks while its SHA-256 and MIME type
+    are computed, so memory use does not grow with file size. Oversized
+    files get 413 as soon as the limit is crossed (or straight away from
+    Content-Length), unsupported types 415 after the first bytes.
+
+    Storage is content-addressed: a file whose bytes were uploaded before
+    gets a new file_id pointing at the stored blob (deduplicated=true),
+    and its OCR is answered from cache.
+    """
+    return await accept_upload(request)
+
+
+@timed_stage("upload")
+async def accept_upload(request: Request) -> UploadResponse:
+    """Store the multipart upload of `request` (shared with /api/jobs)."""
+    file_id = document_service.new_file_id()
+    incoming = document_service.incoming_path(file_id)
+
+    try:
+        result = await receive_upload(request, incoming)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    deduplicated = await run_in_threadpool(
+        document_service.commit_upload,
+        file_id,
+        incoming,
+        result.sha256,
+        result.mime_type,
+        result.size,
+        result.filename,
+    )
+
+    return UploadResponse(
+        file_id=file_id,
+        filename=result.filename,
+        mime_type=result.mime_type,
+        size=result.size,
+        sha256=result.sha256,
+        deduplicated=deduplicated,
+    )
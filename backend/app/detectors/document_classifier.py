@@ -1,34 +1,280 @@
+# app/detectors/document_classifier.py
+
 import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from app.llm.gemini_prompts import DOCUMENT_TYPES
+from app.utils.config import CLASSIFIER_RULES_ENABLED, CLASSIFIER_RULES_THRESHOLD
+from app.utils.logger import get_logger
+
+
+logger = get_logger("classifier")
+
+
+# Keyword -> weight per document type. A keyword counts once per document
+# however often it appears, and only on word boundaries ("pos" does not
+# fire inside "purpose"). Keywords may be shared between types.
+KEYWORDS: Dict[str, Dict[str, float]] = {
+    "invoice": {
+        "invoice": 2.0, "tax invoice": 1.0, "invoice no": 1.0, "invoice number": 1.0,
+        "bill to": 1.0, "due date": 1.0, "payment terms": 1.0, "gstin": 0.5,
+        "hsn": 0.5, "qty": 0.5, "quantity": 0.3, "subtotal": 0.5, "total amount": 0.5,
+        "vat no": 0.5,
+    },
+    "receipt": {
+        "receipt": 2.0, "cashier": 1.0, "cash": 0.5, "change due": 1.0, "store": 0.5,
+        "pos": 0.5, "thank you": 0.5, "subtotal": 0.5, "transaction": 0.5,
+    },
+    "purchase_order": {
+        "purchase order": 2.5, "po no": 1.5, "po number": 1.5, "vendor": 0.5,
+        "ship to": 0.5, "delivery date": 0.5, "order date": 0.5,
+    },
+    "id_card": {
+        "identity card": 2.0, "date of birth": 1.5, "blood group": 1.5, "dob": 1.0,
+        "id no": 1.0, "nationality": 0.5, "gender": 0.5,
+    },
+    "resume": {
+        "resume": 2.0, "curriculum vitae": 2.5, "work experience": 1.0,
+        "education": 0.5, "skills": 0.5, "certifications": 0.5,
+    },
+    "report": {
+        "report": 2.0, "introduction": 1.0, "overview": 0.5, "objectives": 0.5,
+        "conclusion": 1.0, "recommendations": 0.5, "summary": 0.5,
+    },
+}
+
+AMOUNT_RE = re.compile(r"\d{1,3}\.\d{2}")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+
+    The goto/fail structure is compiled into a full transition table at
+    build time, so scanning is one dict lookup per character regardless of
+    how many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        self._delta: List[Dict[str, int]] = [{}]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for ch in keyword:
+                nxt = self._delta[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._delta)
+                    self._delta.append({})
+                    self._output.append([])
+                    self._delta[state][ch] = nxt
+                state = nxt
+            self._output[state].append(keyword)
+
+        # BFS: resolve fail links and fold them into the transition table
+        alphabet = {ch for keyword in keywords for ch in keyword}
+        fail = [0] * len(self._delta)
+        queue = deque()
+        for ch in alphabet:
+            nxt = self._delta[0].get(ch)
+            if nxt is None:
+                self._delta[0][ch] = 0
+            else:
+                queue.append(nxt)
+
+        while queue:
+            state = queue.popleft()
+            self._output[state].extend(self._output[fail[state]])
+            for ch in alphabet:
+                nxt = self._delta[state].get(ch)
+                if nxt is None:
+                    self._delta[state][ch] = self._delta[fail[state]][ch]
+                else:
+                    fail[nxt] = self._delta[fail[state]][ch]
+                    queue.append(nxt)
+
+    def find(self, text: str) -> Dict[str, int]:
+        """
+        Keywords found in `text` on word boundaries (text must already be
+        lowercased), mapped to their number of occurrences.
+        """
+        delta, output = self._delta, self._output
+        found: Dict[str, int] = {}
+        state = 0
+        end = len(text)
+
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not output[state]:
+                continue
+            if i + 1 < end and text[i + 1].isalnum():
+                continue
+            for keyword in output[state]:
+                start = i - len(keyword) + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    found[keyword] = found.get(keyword, 0) + 1
+
+        return found
+
 
 class DocumentClassifier:
-    def __init__(self):
-        pass  # No Gemini initialization for now
+    """
+    Rule-based classifier: one pass over the text with a KeywordAutomaton,
+    then weighted scores per type.
+
+    Confidence combines how much evidence the winner has and how far ahead
+    of the runner-up it is:
+
+        strength = 1 - 0.5 ** top_score
+        margin   = (top_score - runner_up) / top_score
+        confidence = strength * margin
+
+    So a single "invoice" mention in a report about invoices stays low,
+    while "invoice" + "bill to" + "due date" with nothing competing is ~0.94.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Dict[str, float]]] = None):
+        self.keywords = keywords or KEYWORDS
+
+        self._weights: Dict[str, List[Tuple[str, float]]] = {}
+        for doc_type, table in self.keywords.items():
+            for keyword, weight in table.items():
+                self._weights.setdefault(keyword, []).append((doc_type, weight))
+
+        self._automaton = KeywordAutomaton(self._weights)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Weighted keyword score per document type (types with no hits omitted)."""
+        scores: Dict[str, float] = {}
+        for keyword in self._automaton.find(text.lower()):
+            for doc_type, weight in self._weights[keyword]:
+                scores[doc_type] = scores.get(doc_type, 0.0) + weight
+        return scores
+
+    def classify(self, text: str) -> dict:
+        """
+        Returns:
+            {"document_type", "confidence", "scores"}
+        """
+        scores = self.scores(text)
+
+        if not scores:
+            # Long prose without any amounts reads as notes
+            if len(text.split()) > 80 and not AMOUNT_RE.search(text):
+                return {"document_type": "notes", "confidence": 0.70, "scores": {}}
+            return {"document_type": "unknown", "confidence": 0.40, "scores": {}}
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        doc_type, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        confidence = (1 - 0.5 ** top) * (top - runner_up) / top
+
+        return {
+            "document_type": doc_type,
+            "confidence": round(confidence, 4),
+            "scores": {k: round(v, 2) for k, v in ranked},
+        }
+
+
+document_classifier = DocumentClassifier()
+
+
+class ClassificationGate:
+    """
+    First classification tier in front of Gemini.
+
+    check() returns the rule-based answer when its confidence clears the
+    threshold, or None to send the document on to the LLM. Labels Gemini
+    never produces (id_card, notes) are always sent on, so everything
+    downstream of classification sees one label set (DOCUMENT_TYPES).
+    Every decision is counted and logged at DEBUG (logger
+    "docai.classifier"), so the threshold can be tuned against how many
+    Gemini calls it saves.
+
+    Args:
+        threshold: Minimum rule confidence to skip the LLM
+        enabled: When False, check() always returns None
+    """
+
+    def __init__(
+        self,
+        classifier: DocumentClassifier = document_classifier,
+        threshold: float = CLASSIFIER_RULES_THRESHOLD,
+        enabled: bool = CLASSIFIER_RULES_ENABLED,
+    ):
+        self.classifier = classifier
+        self.threshold = threshold
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._accepted: Dict[str, int] = {}
+        self._escalated = 0
+
+    def check(self, text: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        result = self.classifier.classify(text)
+        accepted = self._accepts(result)
+
+        with self._lock:
+            if accepted:
+                doc_type = result["document_type"]
+                self._accepted[doc_type] = self._accepted.get(doc_type, 0) + 1
+            else:
+                self._escalated += 1
+
+        logger.debug(
+            "rules classification",
+            extra={
+                "document_type": result["document_type"],
+                "confidence": result["confidence"],
+                "threshold": self.threshold,
+                "decision": "accept" if accepted else "escalate",
+                "scores": result["scores"],
+            },
+        )
+
+        if not accepted:
+            return None
+
+        return _answer(result)
+
+    def peek(self, text: str) -> Optional[dict]:
+        """check() without counting or logging the decision, for lookups."""
+        if not self.enabled:
+            return None
 
-    def classify(self, text: str):
-        text_lower = text.lower()
+        result = self.classifier.classify(text)
+        if not self._accepts(result):
+            return None
+        return _answer(result)
 
-        # Invoice rules
-        invoice_keywords = ["invoice", "bill to", "qty", "subtotal", "gst", "total amount"]
-        if any(k in text_lower for k in invoice_keywords):
-            return {"type": "invoice", "confidence": 0.90}
+    def _accepts(self, result: dict) -> bool:
+        return result["document_type"] in DOCUMENT_TYPES and result["confidence"] >= self.threshold
 
-        # Receipt rules
-        receipt_keywords = ["subtotal", "store", "cash", "pos", "thank you"]
-        if any(k in text_lower for k in receipt_keywords):
-            return {"type": "receipt", "confidence": 0.85}
+    def stats(self) -> dict:
+        with self._lock:
+            accepted = sum(self._accepted.values())
+            total = accepted + self._escalated
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "answered_by_rules": accepted,
+                "escalated_to_llm": self._escalated,
+                "rules_ratio": round(accepted / total, 4) if total else 0.0,
+                "answered_by_type": dict(self._accepted),
+            }
 
-        # Notes rules
-        if len(text.split()) > 80 and not re.search(r"\d{1,3}\.\d{2}", text):
-            return {"type": "notes", "confidence": 0.70}
 
-        # PO rules
-        if "purchase order" in text_lower or "po no" in text_lower:
-            return {"type": "purchase_order", "confidence": 0.88}
+def _answer(result: dict) -> dict:
+    return {
+        "document_type": result["document_type"],
+        "confidence": result["confidence"],
+        "tier": "rules",
+    }
 
-        # ID card rules
-        id_keywords = ["date of birth", "dob", "id no", "blood group"]
-        if any(k in text_lower for k in id_keywords):
-            return {"type": "id_card", "confidence": 0.80}
 
-        # Default fallback
-        return {"type": "unknown", "confidence": 0.40}
+classification_gate = ClassificationGate()
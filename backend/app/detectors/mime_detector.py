@@ -0,0 +1,52 @@
+# app/detectors/mime_detector.py
+
+from typing import Optional
+
+
+# Bytes needed to recognise every signature below
+SNIFF_BYTES = 16
+
+# File types Document AI's OCR processor accepts
+SUPPORTED_MIME_TYPES = {
+    "application/pdf",
+    "image/png",
+    "image/jpeg",
+    "image/tiff",
+    "image/gif",
+    "image/bmp",
+    "image/webp",
+}
+
+# (offset, magic bytes, mime type), checked in order
+_SIGNATURES = (
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (8, b"WEBP", "image/webp"),     # RIFF....WEBP
+    (0, b"PK\x03\x04", "application/zip"),
+)
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """
+    MIME type from a file's leading bytes (magic numbers), or None.
+
+    Only the first SNIFF_BYTES bytes are looked at, so this can run on the
+    first chunk of an upload before the rest has arrived. A PDF preceded
+    by a little junk (some scanners emit a BOM or whitespace) still counts.
+    """
+    for offset, magic, mime in _SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            if mime == "image/webp" and not head.startswith(b"RIFF"):
+                continue
+            return mime
+
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return "application/pdf"
+
+    return None
@@ -1,9 +1,10 @@
 # app/extractors/id_extractor.py
 
-import re
 from typing import Optional
 from pydantic import BaseModel, Field
 
+from app.extractors.field_scanner import MultiFieldScanner
+
 
 class IDExtractionResult(BaseModel):
     document_type: str = Field(default="id_card")
@@ -17,90 +18,59 @@ class IDExtractionResult(BaseModel):
     raw_text: str = ""
 
 
+DATE = r"([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})"
+
+# id_type patterns in priority order, and the type each one means
+ID_TYPES = {
+    r"passport": "passport",
+    r"driving\s*licence|driver's\s*license": "driving_license",
+    r"aadhar|aadhaar": "aadhaar",
+    r"pan\s*card": "pan_card",
+}
+
+
 class IDExtractor:
     """
     Rule-based ID card extractor.
+
+    Patterns are compiled once into a MultiFieldScanner.
     """
 
-    def _find_first(self, patterns, text: str) -> Optional[str]:
-        for p in patterns:
-            m = re.search(p, text, re.IGNORECASE)
-            if m:
-                return m.group(1).strip()
-        return None
+    # Very generic – you can add country-specific patterns
+    scanner = MultiFieldScanner({
+        "id_number": [
+            r"id\s*no\.?[:\s]*([a-z0-9\-]+)",
+            r"id\s*number[:\s]*([a-z0-9\-]+)",
+            r"number[:\s]*([a-z0-9\-]{6,})",
+        ],
+        "full_name": [r"name[:\s]*([^\n]+)", r"full\s*name[:\s]*([^\n]+)"],
+        "date_of_birth": [r"dob[:\s]*" + DATE, r"date\s*of\s*birth[:\s]*" + DATE],
+        "issue_date": [r"issue\s*date[:\s]*" + DATE, r"issued\s*on[:\s]*" + DATE],
+        "expiry_date": [r"expiry\s*date[:\s]*" + DATE, r"valid\s*till[:\s]*" + DATE],
+        "address": [r"address[:\s]*([^\n]+)"],
+        "id_type": list(ID_TYPES),
+    })
 
     def extract(self, text: str) -> IDExtractionResult:
         if not text:
             return IDExtractionResult(raw_text="")
 
-        # Very generic – you can add country-specific patterns
-        id_number = self._find_first(
-            [
-                r"ID\s*No\.?[:\s]*([A-Z0-9\-]+)",
-                r"ID\s*Number[:\s]*([A-Z0-9\-]+)",
-                r"Number[:\s]*([A-Z0-9\-]{6,})",
-            ],
-            text,
-        )
-
-        full_name = self._find_first(
-            [
-                r"Name[:\s]*([^\n]+)",
-                r"Full\s*Name[:\s]*([^\n]+)",
-            ],
-            text,
-        )
-
-        date_of_birth = self._find_first(
-            [
-                r"DOB[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-                r"Date\s*of\s*Birth[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-            ],
-            text,
-        )
-
-        issue_date = self._find_first(
-            [
-                r"Issue\s*Date[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-                r"Issued\s*On[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-            ],
-            text,
-        )
-
-        expiry_date = self._find_first(
-            [
-                r"Expiry\s*Date[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-                r"Valid\s*Till[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-            ],
-            text,
-        )
-
-        address = self._find_first(
-            [
-                r"Address[:\s]*([^\n]+)",
-            ],
-            text,
-        )
+        hits = self.scanner.scan(text)
+        first = self.scanner.first
 
         # Guess ID type
         id_type = None
-        if re.search(r"Passport", text, re.IGNORECASE):
-            id_type = "passport"
-        elif re.search(r"Driving\s*Licence|Driver's\s*License", text, re.IGNORECASE):
-            id_type = "driving_license"
-        elif re.search(r"Aadhar|Aadhaar", text, re.IGNORECASE):
-            id_type = "aadhaar"
-        elif re.search(r"PAN\s*Card", text, re.IGNORECASE):
-            id_type = "pan_card"
+        if "id_type" in hits:
+            id_type = list(ID_TYPES.values())[hits["id_type"].priority]
 
         return IDExtractionResult(
             id_type=id_type,
-            full_name=full_name,
-            id_number=id_number,
-            date_of_birth=date_of_birth,
-            issue_date=issue_date,
-            expiry_date=expiry_date,
-            address=address,
+            full_name=first(hits, "full_name"),
+            id_number=first(hits, "id_number"),
+            date_of_birth=first(hits, "date_of_birth"),
+            issue_date=first(hits, "issue_date"),
+            expiry_date=first(hits, "expiry_date"),
+            address=first(hits, "address"),
             raw_text=text,
         )
 
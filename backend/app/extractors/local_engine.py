@@ -0,0 +1,74 @@
+# app/extractors/local_engine.py
+
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.extractors.id_extractor import id_extractor
+from app.extractors.invoice_extractor import invoice_extractor
+from app.extractors.po_extractor import po_extractor
+from app.extractors.receipt_extractor import receipt_extractor
+
+
+class UnsupportedDocumentType(ValueError):
+    """No local extractor is registered for the requested document type."""
+
+
+class LocalExtractionEngine:
+    """
+    Registry of rule-based extractors, keyed by document type.
+
+    Extraction runs entirely in-process (no Gemini call), so it suits
+    high-volume, well-formatted documents. Results have the same shape as
+    the Gemini extraction: a flat dict of fields, without the raw text.
+    """
+
+    def __init__(self):
+        self._extractors: Dict[str, Callable[[str], BaseModel]] = {}
+        self._aliases: Dict[str, str] = {}
+
+    def register(self, doc_type: str, extract: Callable[[str], BaseModel], aliases: List[str] = ()):
+        """
+        Args:
+            doc_type: Canonical type name (as produced by the classifiers)
+            extract: Callable taking OCR text and returning a pydantic model
+            aliases: Other names accepted for the same type
+        """
+        self._extractors[doc_type] = extract
+        for alias in aliases:
+            self._aliases[alias] = doc_type
+
+    def resolve(self, doc_type: Optional[str]) -> Optional[str]:
+        """Canonical registered type for a name or alias, or None."""
+        if not doc_type:
+            return None
+        key = doc_type.strip().lower()
+        key = self._aliases.get(key, key)
+        return key if key in self._extractors else None
+
+    def supports(self, doc_type: Optional[str]) -> bool:
+        return self.resolve(doc_type) is not None
+
+    @property
+    def types(self) -> List[str]:
+        return sorted(self._extractors)
+
+    def extract(self, text: str, doc_type: str) -> dict:
+        resolved = self.resolve(doc_type)
+        if resolved is None:
+            raise UnsupportedDocumentType(
+                f"No local extractor for document type {doc_type!r} "
+                f"(supported: {', '.join(self.types)})"
+            )
+
+        result = self._extractors[resolved](text)
+        return result.model_dump(exclude={"raw_text"})
+
+
+local_engine = LocalExtractionEngine()
+
+# NotesExtractor is left out: it depends on NLP helpers that do not exist
+local_engine.register("invoice", invoice_extractor.extract)
+local_engine.register("receipt", receipt_extractor.extract)
+local_engine.register("id_card", id_extractor.extract, aliases=["id"])
+local_engine.register("purchase_order", po_extractor.extract, aliases=["po"])
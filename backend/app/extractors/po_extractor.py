@@ -4,6 +4,7 @@ import re
 from typing import List, Optional
 from pydantic import BaseModel
 
+from app.extractors.field_scanner import MultiFieldScanner
 from app.utils.text_utils import basic_clean_text
 
 
@@ -30,8 +31,24 @@ class POExtractionResult(BaseModel):
 # Extractor Class
 # --------------------------------------------
 
+LETTER_RE = re.compile(r"[A-Za-z]")
+
+# Basic heuristic: look for numerical patterns
+LINE_ITEM_RE = re.compile(
+    r"(?P<desc>[A-Za-z0-9 ,.\-/]+)\s+"
+    r"(?P<qty>\d+(?:\.\d+)?)\s+"
+    r"(?P<unit>\d+(?:\.\d+)?)\s+"
+    r"(?P<total>\d+(?:\.\d+)?)"
+)
+
+
 class POExtractor:
 
+    scanner = MultiFieldScanner({
+        "po_number": [r"(po|p\.o)\s*[:\-]?\s*(\w+)"],
+        "date": [r"\d{2}[\/\-]\d{2}[\/\-]\d{4}|\d{4}[\/\-]\d{2}[\/\-]\d{2}"],
+    })
+
     def extract(self, text: str) -> POExtractionResult:
         """
         Extracts purchase order fields from OCR text.
@@ -47,43 +64,28 @@ class POExtractor:
         lines = cleaned.split("\n")
 
         for line in lines[:5]:
-            if len(line.strip()) > 3 and re.search(r"[A-Za-z]", line):
+            if len(line.strip()) > 3 and LETTER_RE.search(line):
                 vendor = line.strip()
                 break
 
+        hits = self.scanner.scan(cleaned)
+
         # ------------------------------------------------------
         # 2. PO NUMBER
         # ------------------------------------------------------
-        po_number = None
-        po_match = re.search(r"(PO|P\.O)\s*[:\-]?\s*(\w+)", cleaned, re.IGNORECASE)
-        if po_match:
-            po_number = po_match.group(2).strip()
+        po_number = self.scanner.first(hits, "po_number", 1)
 
         # ------------------------------------------------------
         # 3. DATE
         # ------------------------------------------------------
-        date = None
-        date_match = re.search(
-            r"(\d{2}[\/\-]\d{2}[\/\-]\d{4})|(\d{4}[\/\-]\d{2}[\/\-]\d{2})",
-            cleaned
-        )
-        if date_match:
-            date = date_match.group(0)
+        date = self.scanner.first(hits, "date")
 
         # ------------------------------------------------------
         # 4. LINE ITEMS (Regex block extraction)
         # ------------------------------------------------------
         line_items: List[POLineItem] = []
 
-        # Basic heuristic: look for numerical patterns
-        line_regex = re.compile(
-            r"(?P<desc>[A-Za-z0-9 ,.\-/]+)\s+"
-            r"(?P<qty>\d+(?:\.\d+)?)\s+"
-            r"(?P<unit>\d+(?:\.\d+)?)\s+"
-            r"(?P<total>\d+(?:\.\d+)?)"
-        )
-
-        for match in line_regex.finditer(cleaned):
+        for match in LINE_ITEM_RE.finditer(cleaned):
             line_items.append(
                 POLineItem(
                     description=match.group("desc").strip(),
@@ -1,9 +1,10 @@
 # app/extractors/receipt_extractor.py
 
-import re
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+from app.extractors.field_scanner import MultiFieldScanner, parse_amount
+
 
 class ReceiptItem(BaseModel):
     description: Optional[str] = None
@@ -25,83 +26,52 @@ class ReceiptExtractionResult(BaseModel):
     raw_text: str = ""
 
 
+DATE = r"([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})"
+TIME = r"([0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?\s*(?:am|pm)?)"
+
+
 class ReceiptExtractor:
     """
     Rule-based receipt extractor.
-    """
 
-    def __init__(self):
-        self.money_pattern = re.compile(r"(\d{1,3}(?:[,\d]{3})*(?:\.\d+)?)")
+    Patterns are compiled once into a MultiFieldScanner.
+    """
 
-    def _find_first(self, patterns, text: str) -> Optional[str]:
-        for p in patterns:
-            m = re.search(p, text, re.IGNORECASE)
-            if m:
-                return m.group(1).strip()
-        return None
+    scanner = MultiFieldScanner(
+        {
+            "receipt_date": [r"date[:\s]*" + DATE, DATE],
+            "receipt_time": [r"time[:\s]*" + TIME, TIME],
+            "payment_method": [
+                r"payment\s*method[:\s]*([a-z ]+)",
+                r"(cash|card|upi|debit|credit)",
+            ],
+            "total": [r"total\s*(?:amount)?[:\s]*([a-z]{3})?\s?(\d{1,3}(?:[,\d]{3})*(?:\.\d+)?)"],
+            "currency": [r"\b(INR|USD|EUR|GBP|JPY|AUD|CAD)\b"],
+        },
+        exact_case=["currency"],
+    )
 
     def extract(self, text: str) -> ReceiptExtractionResult:
         if not text:
             return ReceiptExtractionResult(raw_text="")
 
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-
-        merchant_name = lines[0] if lines else None
-
-        # Date & time
-        receipt_date = self._find_first(
-            [
-                r"Date[:\s]*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-                r"([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})",
-            ],
-            text,
-        )
-
-        receipt_time = self._find_first(
-            [
-                r"Time[:\s]*([0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?\s*(?:AM|PM)?)",
-                r"([0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?\s*(?:AM|PM)?)",
-            ],
-            text,
-        )
+        hits = self.scanner.scan(text)
+        first = self.scanner.first
 
-        # Payment method
-        payment_method = self._find_first(
-            [
-                r"Payment\s*Method[:\s]*([A-Za-z ]+)",
-                r"(CASH|CARD|UPI|DEBIT|CREDIT)",
-            ],
-            text,
-        )
+        merchant_name = next(filter(None, (ln.strip() for ln in text.splitlines())), None)
 
-        # Total amount
-        total_amount = None
-        total_match = re.search(
-            r"Total\s*(?:Amount)?[:\s]*([A-Z]{3})?\s?(\d{1,3}(?:[,\d]{3})*(?:\.\d+)?)",
-            text,
-            re.IGNORECASE,
-        )
-        currency = None
-        if total_match:
-            currency = total_match.group(1)
-            try:
-                total_amount = float(total_match.group(2).replace(",", ""))
-            except ValueError:
-                total_amount = None
-
-        if not currency:
-            c_match = re.search(r"\b(INR|USD|EUR|GBP|JPY|AUD|CAD)\b", text)
-            currency = c_match.group(1) if c_match else None
+        # Currency printed next to the total wins over one found elsewhere
+        currency = first(hits, "total", 0) or first(hits, "currency")
 
         # TODO: parse items – for now we leave as empty.
         items: List[ReceiptItem] = []
 
         return ReceiptExtractionResult(
             merchant_name=merchant_name,
-            receipt_date=receipt_date,
-            receipt_time=receipt_time,
-            payment_method=payment_method,
-            total_amount=total_amount,
+            receipt_date=first(hits, "receipt_date"),
+            receipt_time=first(hits, "receipt_time"),
+            payment_method=first(hits, "payment_method"),
+            total_amount=parse_amount(first(hits, "total", 1)),
             currency=currency,
             items=items,
             raw_text=text,
@@ -1,169 +1,505 @@
 import os
 import json
-from google import genai
-from google.genai.types import GenerateContentConfig
+import asyncio
+import threading
+import numpy as np
+from typing import AsyncIterator, Optional
+from app.detectors.document_classifier import classification_gate
 from app.services.cache_service import cache_service
+from app.services.embedding_store import embedding_store
+from app.llm.gemini_prompts import (
+    classify_prompt,
+    extract_prompt,
+    summarize_prompt,
+    classify_extract_prompt,
+)
+from app.utils.config import GEMINI_BACKEND, GEMINI_MAX_CONCURRENCY
+from app.utils.logger import get_logger
+from app.utils.metrics import record_tokens, timed_stage, upstream_call
+from app.utils.text_utils import text_fingerprint
+from app.llm.singleflight import SingleFlight
 
 
-class GeminiClient:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("Missing GEMINI_API_KEY environment variable")
+MODEL = "models/gemini-2.5-flash"
+EMBED_MODEL = "models/text-embedding-004"
 
-        self.client = genai.Client(api_key=api_key)
-        self.model = "models/gemini-2.5-flash"
-        self.embed_model = "models/text-embedding-004"
+logger = get_logger("gemini")
 
-    def classify_document(self, text: str) -> dict:
+
+def _build_client():
+    if GEMINI_BACKEND == "fake":
+        from app.llm.gemini_fake import FakeGenAIClient
+        logger.info("using FakeGenAIClient (GEMINI_BACKEND=fake)")
+        return FakeGenAIClient.from_env()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing GEMINI_API_KEY environment variable")
+
+    # google.genai takes ~0.25s to import; only pay for it on first use
+    from google import genai
+
+    return genai.Client(api_key=api_key)
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def shared_client():
+    """
+    The process-wide genai client (or fake), built on first use.
+
+    Importing this module stays cheap and works without an API key; a
+    missing key only surfaces on the first Gemini call.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = _build_client()
+    return _shared_client
+
+
+def _json_config():
+    from google.genai.types import GenerateContentConfig
+    return GenerateContentConfig(response_mime_type="application/json")
+
+
+class _LazyClient:
+    """`client` is the one passed in, else the shared client on first access."""
+
+    _client = None
+
+    @property
+    def client(self):
+        return self._client or shared_client()
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+
+def _stored_embedding(fp: str, label: Optional[str]):
+    vector = embedding_store.get(fp)
+    if vector is not None and label and label not in embedding_store.labels(fp):
+        embedding_store.add(fp, vector, label)
+    return vector
+
+
+class GeminiClient(_LazyClient):
+    def __init__(self, client=None):
+        self._client = client
+        self.model = MODEL
+        self.embed_model = EMBED_MODEL
+
+    @timed_stage("classify")
+    def classify_document(self, text: str, fingerprint: Optional[str] = None) -> dict:
         """
         Classify document with intelligent caching.
         Checks cache first, only calls API if needed.
         """
 
+        fp = fingerprint or text_fingerprint(text)
+
         # ✅ CHECK CACHE FIRST
-        cached = cache_service.get(text, "classify")
+        cached = cache_service.get(text, "classify", fp)
         if cached:
             return cached
 
-        # ❌ CACHE MISS - Call Gemini API
-        prompt = f"""
-        Classify this document into:
-        - invoice
-        - receipt
-        - purchase_order
-        - resume
-        - report
-        - unknown
-
-        Respond ONLY in JSON including:
-        {{
-            "document_type": "...",
-            "confidence": 0.xx
-        }}
-
-        TEXT:
-        {text}
-        """
+        # ✅ CONFIDENT RULE MATCH - no LLM call needed
+        ruled = classification_gate.check(text)
+        if ruled:
+            return ruled
 
+        # ❌ CACHE MISS - Call Gemini API
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[prompt],
-                config=GenerateContentConfig(
-                    response_mime_type="application/json"
+            with upstream_call("gemini", "classify"):
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=[classify_prompt(text)],
+                    config=_json_config()
                 )
-            )
+            record_tokens("classify", response)
 
             result = json.loads(response.text)
 
             # ✅ SAVE TO CACHE
-            cache_service.set(text, "classify", result)
+            cache_service.set(text, "classify", result, fp)
 
             return result
 
         except Exception as e:
-            print(f"⚠️ Gemini API error: {e}")
+            logger.warning("gemini call failed", extra={"operation": "classify", "error": str(e)})
             return {"document_type": "unknown", "confidence": 0.0}
 
-    def summarize(self, text: str) -> str:
+    @timed_stage("summarize")
+    def summarize(self, text: str, fingerprint: Optional[str] = None) -> str:
         """
         Summarize text with caching support.
         """
 
+        fp = fingerprint or text_fingerprint(text)
+
         # ✅ CHECK CACHE FIRST
-        cached = cache_service.get(text, "summarize")
+        cached = cache_service.get(text, "summarize", fp)
         if cached:
             return cached.get("summary", "")
 
         # ❌ CACHE MISS - Call API
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[f"Summarize this document concisely:\n{text}"]
-            )
+            with upstream_call("gemini", "summarize"):
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=[summarize_prompt(text)]
+                )
+            record_tokens("summarize", response)
 
             summary = response.text
 
             # ✅ SAVE TO CACHE
-            cache_service.set(text, "summarize", {"summary": summary})
+            cache_service.set(text, "summarize", {"summary": summary}, fp)
 
             return summary
 
         except Exception as e:
-            print(f"⚠️ Gemini API error: {e}")
+            logger.warning("gemini call failed", extra={"operation": "summarize", "error": str(e)})
             return "Summary unavailable"
 
-    def generate_embeddings(self, text: str):
+    @timed_stage("embed")
+    def generate_embeddings(self, text: str, fingerprint: Optional[str] = None, label: Optional[str] = None):
         """
         Generate embeddings with caching.
+        Vectors live in the binary embedding store, tagged with label
+        (the file_id) when given, and come back as float32 arrays.
         """
 
+        fp = fingerprint or text_fingerprint(text)
+
         # ✅ CHECK CACHE FIRST
-        cached = cache_service.get(text, "embeddings")
-        if cached:
-            return cached.get("values", [])
+        cached = _stored_embedding(fp, label)
+        if cached is not None:
+            return cached
 
         # ❌ CACHE MISS - Call API
         try:
-            resp = self.client.models.embed_content(
-                model=self.embed_model,
-                contents=[text]
-            )
-
-            values = resp.embeddings[0].values
+            with upstream_call("gemini", "embed"):
+                resp = self.client.models.embed_content(
+                    model=self.embed_model,
+                    contents=[text]
+                )
 
             # ✅ SAVE TO CACHE
-            cache_service.set(text, "embeddings", {"values": values})
-
-            return values
+            return embedding_store.add(fp, resp.embeddings[0].values, label)
 
         except Exception as e:
-            print(f"⚠️ Gemini API error: {e}")
+            logger.warning("gemini call failed", extra={"operation": "embed", "error": str(e)})
             return []
 
-    def extract_structured(self, text: str, doc_type: str):
+    @timed_stage("extract")
+    def extract_structured(self, text: str, doc_type: str, fingerprint: Optional[str] = None):
         """
         Extract structured data with caching.
         Cache key includes both text AND doc_type.
         """
 
-        # Create composite cache key
-        cache_text = f"{doc_type}|{text}"
+        # Composite cache key: doc_type + text fingerprint
+        fp = f"{doc_type}|{fingerprint or text_fingerprint(text)}"
 
         # ✅ CHECK CACHE FIRST
-        cached = cache_service.get(cache_text, "extract")
+        cached = cache_service.get(text, "extract", fp)
         if cached:
             return cached
 
         # ❌ CACHE MISS - Call API
-        prompt = f"""
-Extract structured fields from this {doc_type} document.
-Return ONLY valid JSON. No explanations.
-
-Document:
-{text}
-"""
-
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[prompt],
-                config=genai.types.GenerateContentConfig(
-                    response_mime_type="application/json"
+            with upstream_call("gemini", "extract"):
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=[extract_prompt(text, doc_type)],
+                    config=_json_config()
                 )
-            )
+            record_tokens("extract", response)
 
             result = json.loads(response.text)
 
             # ✅ SAVE TO CACHE
-            cache_service.set(cache_text, "extract", result)
+            cache_service.set(text, "extract", result, fp)
 
             return result
 
         except Exception as e:
-            print(f"⚠️ Gemini API error: {e}")
+            logger.warning("gemini call failed", extra={"operation": "extract", "error": str(e)})
             return {"raw_text": text}
 
 
-gemini = GeminiClient()
\ No newline at end of file
+class AsyncGeminiClient(_LazyClient):
+    """
+    Async twin of GeminiClient built on the genai `client.aio` surface.
+
+    Upstream calls are awaited instead of blocking the event loop, and a
+    per-process semaphore caps how many Gemini requests are in flight at
+    once (GEMINI_MAX_CONCURRENCY). Pass `client=` to run against a fake.
+
+    Cache misses go through a SingleFlight keyed by (operation, cache key),
+    so concurrent requests for the same document share one upstream call.
+    """
+
+    def __init__(self, client=None, max_concurrency: int = GEMINI_MAX_CONCURRENCY):
+        self._client = client
+        self.model = MODEL
+        self.embed_model = EMBED_MODEL
+        self.max_concurrency = max_concurrency
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self.flight = SingleFlight()
+
+    async def _generate(self, prompt: str, operation: str, json_output: bool = False):
+        config = None
+        if json_output:
+            config = _json_config()
+
+        async with self._limit:
+            with upstream_call("gemini", operation):
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=[prompt],
+                    config=config
+                )
+
+        record_tokens(operation, response)
+        return response
+
+    @timed_stage("classify")
+    async def classify_document(
+        self, text: str, fingerprint: Optional[str] = None, use_rules: bool = True
+    ) -> dict:
+        """
+        Classify document with intelligent caching.
+
+        use_rules=False skips the rule-based tier, so a cache miss always
+        asks Gemini and caches its answer (used to warm the cache).
+        """
+
+        fp = fingerprint or text_fingerprint(text)
+
+        cached = cache_service.get(text, "classify", fp)
+        if cached:
+            return cached
+
+        ruled = classification_gate.check(text) if use_rules else None
+        if ruled:
+            return ruled
+
+        async def call():
+            try:
+                response = await self._generate(classify_prompt(text), "classify", json_output=True)
+                result = json.loads(response.text)
+                cache_service.set(text, "classify", result, fp)
+                return result
+
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "classify", "error": str(e)})
+                return {"document_type": "unknown", "confidence": 0.0}
+
+        return await self.flight.do(("classify", fp), call)
+
+    @timed_stage("summarize")
+    async def summarize(self, text: str, fingerprint: Optional[str] = None) -> str:
+        """
+        Summarize text with caching support.
+        """
+
+        fp = fingerprint or text_fingerprint(text)
+
+        cached = cache_service.get(text, "summarize", fp)
+        if cached:
+            return cached.get("summary", "")
+
+        async def call():
+            try:
+                response = await self._generate(summarize_prompt(text), "summarize")
+                summary = response.text
+                cache_service.set(text, "summarize", {"summary": summary}, fp)
+                return summary
+
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "summarize", "error": str(e)})
+                return "Summary unavailable"
+
+        return await self.flight.do(("summarize", fp), call)
+
+    # ------------------------------------------
+    # STREAMING SUMMARY
+    # ------------------------------------------
+    def cached_summary(self, text: str, fingerprint: Optional[str] = None) -> Optional[str]:
+        """Summary cached for this text, or None."""
+        cached = cache_service.get(text, "summarize", fingerprint or text_fingerprint(text))
+        return cached.get("summary", "") if cached else None
+
+    async def summarize_stream(self, text: str, fingerprint: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Summarize text, yielding chunks as Gemini generates them.
+
+        The assembled summary is cached under the same key as summarize(),
+        so either one answers from the other's result. A cached summary is
+        yielded in one piece. Errors are raised, not swallowed, and a
+        stream that fails part-way is not cached.
+        """
+
+        fp = fingerprint or text_fingerprint(text)
+
+        cached = self.cached_summary(text, fp)
+        if cached is not None:
+            yield cached
+            return
+
+        parts, last = [], None
+        async with self._limit:
+            with upstream_call("gemini", "summarize_stream"):
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=[summarize_prompt(text)],
+                )
+                async for chunk in stream:
+                    last = chunk
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+
+        # The final chunk carries the usage totals for the whole response
+        record_tokens("summarize_stream", last)
+        cache_service.set(text, "summarize", {"summary": "".join(parts)}, fp)
+
+    @timed_stage("embed")
+    async def generate_embeddings(self, text: str, fingerprint: Optional[str] = None, label: Optional[str] = None):
+        """
+        Generate embeddings with caching (see GeminiClient.generate_embeddings).
+        """
+
+        fp = fingerprint or text_fingerprint(text)
+
+        cached = _stored_embedding(fp, label)
+        if cached is not None:
+            return cached
+
+        async def call():
+            try:
+                async with self._limit:
+                    with upstream_call("gemini", "embed"):
+                        resp = await self.client.aio.models.embed_content(
+                            model=self.embed_model,
+                            contents=[text]
+                        )
+
+                return embedding_store.add(fp, resp.embeddings[0].values, label)
+
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "embed", "error": str(e)})
+                return []
+
+        values = await self.flight.do(("embeddings", fp), call)
+
+        # Coalesced callers still tag the vector with their own file_id
+        if label and len(values):
+            _stored_embedding(fp, label)
+
+        return values
+
+    async def embed_query(self, text: str):
+        """
+        Embed a search query. Not stored, so queries never show up as
+        documents in similarity results.
+        """
+
+        async def call():
+            try:
+                async with self._limit:
+                    with upstream_call("gemini", "embed_query"):
+                        resp = await self.client.aio.models.embed_content(
+                            model=self.embed_model,
+                            contents=[text]
+                        )
+                return np.asarray(resp.embeddings[0].values, dtype=np.float32)
+
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "embed_query", "error": str(e)})
+                return []
+
+        return await self.flight.do(("query", text_fingerprint(text)), call)
+
+    @timed_stage("extract")
+    async def extract_structured(self, text: str, doc_type: str, fingerprint: Optional[str] = None):
+        """
+        Extract structured data with caching.
+        Cache key includes both text AND doc_type.
+        """
+
+        fp = f"{doc_type}|{fingerprint or text_fingerprint(text)}"
+
+        cached = cache_service.get(text, "extract", fp)
+        if cached:
+            return cached
+
+        async def call():
+            try:
+                response = await self._generate(extract_prompt(text, doc_type), "extract", json_output=True)
+                result = json.loads(response.text)
+                cache_service.set(text, "extract", result, fp)
+                return result
+
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "extract", "error": str(e)})
+                return {"raw_text": text}
+
+        return await self.flight.do(("extract", fp), call)
+
+    @timed_stage("classify_extract")
+    async def classify_and_extract(self, text: str, fingerprint: Optional[str] = None) -> tuple[dict, dict]:
+        """
+        Classify and extract in a single generation.
+
+        Falls back to the separate cached calls when the classification is
+        already cached or the rule-based tier is confident. On a fused call
+        both the classify entry and the extract entry for the detected type
+        are written to the cache.
+
+        Returns:
+            (classification, extraction)
+        """
+
+        fp = fingerprint or text_fingerprint(text)
+
+        cached = cache_service.get(text, "classify", fp)
+        if cached:
+            doc_type = cached.get("document_type")
+            return cached, await self.extract_structured(text, doc_type, fp)
+
+        ruled = classification_gate.check(text)
+        if ruled:
+            return ruled, await self.extract_structured(text, ruled["document_type"], fp)
+
+        async def call():
+            try:
+                response = await self._generate(classify_extract_prompt(text), "classify_extract", json_output=True)
+                result = json.loads(response.text)
+            except Exception as e:
+                logger.warning("gemini call failed", extra={"operation": "classify_extract", "error": str(e)})
+                return {"document_type": "unknown", "confidence": 0.0}, {"raw_text": text}
+
+            classification = {
+                "document_type": result.get("document_type", "unknown"),
+                "confidence": result.get("confidence", 0.0),
+            }
+            extraction = result.get("fields") or {}
+
+            cache_service.set(text, "classify", classification, fp)
+            cache_service.set(text, "extract", extraction, f"{classification['document_type']}|{fp}")
+
+            return classification, extraction
+
+        return await self.flight.do(("classify+extract", fp), call)
+
+
+# Both share one genai client, created on the first Gemini call
+gemini = GeminiClient()
+async_gemini = AsyncGeminiClient()
@@ -0,0 +1,151 @@
+# app/llm/gemini_fake.py
+#
+# Local stand-in for genai.Client. Mirrors the small part of the SDK
+# surface GeminiClient / AsyncGeminiClient use, so both can be exercised
+# without an API key or network access.
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+
+class FakeGeminiError(RuntimeError):
+    """Injected failure (see FakeGenAIClient error_rate)."""
+
+
+class _FakeModels:
+    def __init__(self, fake):
+        self._fake = fake
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self._fake.latency)
+        self._fake._maybe_fail()
+        return self._fake._response(contents, config)
+
+    def embed_content(self, model, contents):
+        time.sleep(self._fake.latency)
+        self._fake._maybe_fail()
+        return self._fake._embedding(contents)
+
+
+class _FakeAsyncModels:
+    def __init__(self, fake):
+        self._fake = fake
+
+    async def generate_content(self, model, contents, config=None):
+        await asyncio.sleep(self._fake.latency)
+        self._fake._maybe_fail()
+        return self._fake._response(contents, config)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        # Like the SDK: awaiting the call gives an async iterator of chunks
+        self._fake._maybe_fail()
+        text = self._fake._response(contents, config).text
+        return self._chunks(text)
+
+    async def _chunks(self, text: str):
+        # Word by word, with the latency spread over the whole response
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self._fake.latency / len(words))
+            yield SimpleNamespace(text=word if i == len(words) - 1 else word + " ")
+
+    async def embed_content(self, model, contents):
+        await asyncio.sleep(self._fake.latency)
+        self._fake._maybe_fail()
+        return self._fake._embedding(contents)
+
+
+class FakeGenAIClient:
+    """
+    Drop-in fake for genai.Client.
+
+    Args:
+        latency: Seconds each call takes (sleep, or asyncio.sleep on .aio)
+        embedding_dim: Length of the vectors returned by embed_content
+        error_rate: Fraction of calls that raise FakeGeminiError
+        recordings: Path to a JSON list of {"match", "response"} entries.
+            A generate_content call whose prompt contains "match" returns
+            "response" (objects are JSON-encoded); first match wins.
+        seed: Seed for the error injection, for repeatable runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        embedding_dim: int = 768,
+        error_rate: float = 0.0,
+        recordings: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.embedding_dim = embedding_dim
+        self.error_rate = error_rate
+        self.recordings = _load_recordings(recordings) if recordings else []
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = _FakeModels(self)
+        self.aio = SimpleNamespace(models=_FakeAsyncModels(self))
+
+    @classmethod
+    def from_env(cls) -> "FakeGenAIClient":
+        """Fake configured by the FAKE_GEMINI_* settings (GEMINI_BACKEND=fake)."""
+        from app.utils.config import (
+            FAKE_GEMINI_LATENCY,
+            FAKE_GEMINI_ERROR_RATE,
+            FAKE_GEMINI_RECORDINGS,
+        )
+
+        return cls(
+            latency=FAKE_GEMINI_LATENCY,
+            error_rate=FAKE_GEMINI_ERROR_RATE,
+            recordings=FAKE_GEMINI_RECORDINGS or None,
+        )
+
+    def _maybe_fail(self):
+        with self._lock:
+            self.calls += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                raise FakeGeminiError("429 RESOURCE_EXHAUSTED (injected by FakeGenAIClient)")
+
+    def _response(self, contents, config):
+        wants_json = config is not None and getattr(config, "response_mime_type", None) == "application/json"
+
+        prompt = str(contents[0])
+        for recording in self.recordings:
+            if recording["match"] in prompt:
+                response = recording["response"]
+                text = response if isinstance(response, str) else json.dumps(response)
+                return SimpleNamespace(text=text)
+
+        if wants_json:
+            text = json.dumps({"document_type": "unknown", "confidence": 0.5})
+        else:
+            text = "Fake summary."
+
+        return SimpleNamespace(text=text)
+
+    def _embedding(self, contents):
+        # Deterministic per text, so identical documents get identical vectors
+        seed = hashlib.md5(str(contents[0]).encode("utf-8")).hexdigest()
+        rng = random.Random(seed)
+        values = [rng.uniform(-1.0, 1.0) for _ in range(self.embedding_dim)]
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=values)])
+
+
+def _load_recordings(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        recordings = json.load(f)
+
+    for entry in recordings:
+        if "match" not in entry or "response" not in entry:
+            raise ValueError(f"{path}: every recording needs 'match' and 'response'")
+    return recordings
@@ -0,0 +1,59 @@
+# app/llm/gemini_prompts.py
+#
+# Prompt templates shared by the sync and async Gemini clients.
+
+# Labels Gemini is asked to choose from; anything that routes on
+# document_type (extractors, the rules tier) works within this set
+DOCUMENT_TYPES = ("invoice", "receipt", "purchase_order", "resume", "report", "unknown")
+
+
+def _type_list(indent: str) -> str:
+    return "\n".join(f"{indent}- {doc_type}" for doc_type in DOCUMENT_TYPES)
+
+
+def classify_prompt(text: str) -> str:
+    return f"""
+        Classify this document into:
+{_type_list("        ")}
+
+        Respond ONLY in JSON including:
+        {{
+            "document_type": "...",
+            "confidence": 0.xx
+        }}
+
+        TEXT:
+        {text}
+        """
+
+
+def extract_prompt(text: str, doc_type: str) -> str:
+    return f"""
+Extract structured fields from this {doc_type} document.
+Return ONLY valid JSON. No explanations.
+
+Document:
+{text}
+"""
+
+
+def summarize_prompt(text: str) -> str:
+    return f"Summarize this document concisely:\n{text}"
+
+
+def classify_extract_prompt(text: str) -> str:
+    return f"""
+Classify this document into one of:
+{_type_list("")}
+
+Then extract its structured fields.
+Return ONLY valid JSON. No explanations. Use this shape:
+{{
+    "document_type": "...",
+    "confidence": 0.xx,
+    "fields": {{ ... }}
+}}
+
+Document:
+{text}
+"""
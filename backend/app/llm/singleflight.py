@@ -0,0 +1,67 @@
+# app/llm/singleflight.py
+
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical async calls.
+
+    The first caller for a key starts the call as its own task; callers
+    that arrive while it is in flight await the same task and share its
+    result (or error). Once it settles the key is released, so later
+    callers go through the normal cache path again.
+
+    A caller that is cancelled (client disconnect, wait_for timeout) only
+    stops waiting: the call keeps running for the others, and is only
+    cancelled when its last caller has gone.
+
+    Cache lookups and `do()` run on the event loop without awaiting in
+    between, so a caller either sees the cached result or joins the
+    in-flight call; there is no window where it starts a duplicate.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        call = self._calls.get(key)
+        if call is not None:
+            self._coalesced += 1
+        else:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            self._leaders += 1
+            call.task.add_done_callback(lambda _: self._release(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _release(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        total = self._leaders + self._coalesced
+        return {
+            "in_flight": len(self._calls),
+            "upstream_calls": self._leaders,
+            "coalesced": self._coalesced,
+            "coalesced_ratio": round(self._coalesced / total, 4) if total else 0.0,
+        }
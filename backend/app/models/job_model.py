@@ -0,0 +1,23 @@
+# app/models/job_model.py
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class JobResponse(BaseModel):
+    job_id: str
+    file_id: str
+    status: str                 # "queued" | "running" | "completed" | "failed" | "cancelled"
+    stage: Optional[str] = None # stage running, or the one the job stopped at
+    options: dict = Field(default_factory=dict)
+    stages: Dict[str, dict] = Field(default_factory=dict)   # finished stage -> summary
+    result: Optional[dict] = None   # /api/extract response once completed
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str] = None
+
+
+class JobListResponse(BaseModel):
+    total: int
+    jobs: List[JobResponse]
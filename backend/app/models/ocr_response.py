@@ -1,7 +1,31 @@
 # app/models/ocr_response.py
 
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 class OCRResponse(BaseModel):
     file_id: str
     text: str
+    sha256: Optional[str] = None
+    cached: bool = False        # answered from the per-blob OCR cache
+
+
+class OCRBatchRequest(BaseModel):
+    file_ids: List[str] = Field(..., min_length=1)
+    include_text: bool = False
+
+
+class OCRBatchItem(BaseModel):
+    file_id: str
+    status: str                 # "ok" | "cached" | "error"
+    chars: int = 0
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+class OCRBatchResponse(BaseModel):
+    total: int
+    processed: int
+    cached: int
+    failed: int
+    results: List[OCRBatchItem]
@@ -0,0 +1,23 @@
+# app/models/search_response.py
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class SimilarSearchRequest(BaseModel):
+    file_id: Optional[str] = None
+    text: Optional[str] = None
+    top_k: int = Field(default=10, ge=1, le=1000)
+
+
+class SimilarDocument(BaseModel):
+    fingerprint: str
+    file_ids: List[str]
+    score: float
+
+
+class SimilarSearchResponse(BaseModel):
+    query: str
+    results: List[SimilarDocument]
+    index: dict
+    took_ms: float
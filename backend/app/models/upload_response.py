@@ -1,7 +1,12 @@
 # app/models/upload_response.py
 
+from typing import Optional
 from pydantic import BaseModel
 
 class UploadResponse(BaseModel):
     file_id: str
-    filename: str
+    filename: Optional[str] = None
+    mime_type: Optional[str] = None
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    deduplicated: bool = False
@@ -0,0 +1,110 @@
+# app/services/cache_files.py
+
+import json
+import os
+from typing import List, Optional
+
+from app.services.cache_manifest import CacheManifest
+from app.utils.logger import get_logger
+
+
+logger = get_logger("cache")
+
+
+class FileCacheBackend:
+    """
+    Disk tier that stores one pretty-printed JSON file per key.
+
+    This is the original cache/gemini layout, indexed by CacheManifest.
+    """
+
+    name = "files"
+
+    def __init__(self, cache_dir: str = "cache/gemini"):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.manifest = CacheManifest(
+            os.path.join(self.cache_dir, "_manifest.sqlite"), self.cache_dir
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def read(self, key: str) -> Optional[tuple]:
+        """
+        Returns:
+            (result, size_bytes) or None if the key is not cached
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning("cache read failed", extra={"backend": "files", "key": key[:8], "error": str(e)})
+            return None
+
+        return data.get("result"), len(raw)
+
+    def write(self, key: str, cache_data: dict) -> int:
+        """
+        Returns:
+            Stored size in bytes
+        """
+        payload = json.dumps(cache_data, indent=2)
+
+        with open(self._path(key), 'w', encoding='utf-8') as f:
+            f.write(payload)
+        self.manifest.record(key, cache_data["operation"], len(payload), cache_data["cached_at"])
+
+        return len(payload)
+
+    def keys(self, operation: Optional[str] = None) -> List[str]:
+        return self.manifest.keys(operation)
+
+    def delete(self, keys: List[str]) -> int:
+        deleted = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+                deleted += 1
+            except FileNotFoundError:
+                continue
+        self.manifest.remove(keys)
+        return deleted
+
+    def clear(self, operation: Optional[str] = None) -> int:
+        deleted = 0
+
+        if operation:
+            # Only the keys the manifest lists for this operation
+            keys = self.manifest.keys(operation)
+            for key in keys:
+                try:
+                    os.remove(self._path(key))
+                    deleted += 1
+                except FileNotFoundError:
+                    continue
+            self.manifest.remove(keys)
+        else:
+            # Delete all
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    os.remove(entry.path)
+                    deleted += 1
+            self.manifest.clear()
+
+        return deleted
+
+    def totals(self) -> dict:
+        return self.manifest.totals()
+
+    def reindex(self) -> int:
+        return self.manifest.rebuild()
+
+    def flush(self):
+        pass
@@ -0,0 +1,161 @@
+# app/services/cache_manifest.py
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+
+ENTRIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    operation  TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    cached_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_operation ON entries(operation);
+"""
+
+# Shared with SQLiteCacheBackend: works on any `entries` table that has
+# `operation` and `size` columns
+TOTALS_SCHEMA = """
+-- Running totals per operation, kept in step with `entries` by triggers
+CREATE TABLE IF NOT EXISTS totals (
+    operation  TEXT PRIMARY KEY,
+    entries    INTEGER NOT NULL DEFAULT 0,
+    bytes      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO totals(operation, entries, bytes) VALUES (NEW.operation, 1, NEW.size)
+    ON CONFLICT(operation) DO UPDATE SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size
+    WHERE operation = OLD.operation;
+END;
+
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size
+    WHERE operation = OLD.operation;
+    INSERT INTO totals(operation, entries, bytes) VALUES (NEW.operation, 1, NEW.size)
+    ON CONFLICT(operation) DO UPDATE SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+"""
+
+
+class CacheManifest:
+    """
+    SQLite index of the entries in a cache directory.
+
+    Records operation, size and timestamp for every key as it is written,
+    and keeps per-operation totals up to date, so stats are a read of a
+    handful of rows and per-operation clears only touch matching keys.
+
+    Args:
+        path: Location of the manifest database
+        cache_dir: Directory of <key>.json entries, scanned once to seed a
+            new manifest
+    """
+
+    def __init__(self, path: str, cache_dir: str):
+        self.path = path
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+        is_new = not os.path.exists(path)
+
+        # WAL lets several uvicorn workers read while one writes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(ENTRIES_SCHEMA + TOTALS_SCHEMA)
+
+        if is_new:
+            self.rebuild()
+
+    def record(self, key: str, operation: str, size: int, cached_at: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO entries(key, operation, size, cached_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    operation = excluded.operation,
+                    size = excluded.size,
+                    cached_at = excluded.cached_at
+                """,
+                (key, operation, size, cached_at),
+            )
+
+    def keys(self, operation: Optional[str] = None) -> List[str]:
+        with self._lock:
+            if operation is None:
+                rows = self._conn.execute("SELECT key FROM entries")
+            else:
+                rows = self._conn.execute(
+                    "SELECT key FROM entries WHERE operation = ?", (operation,)
+                )
+            return [r[0] for r in rows]
+
+    def remove(self, keys: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM entries WHERE key = ?", ((k,) for k in keys)
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM totals")
+
+    def totals(self) -> dict:
+        """
+        Returns:
+            {"total_entries": int, "total_bytes": int, "by_operation": {op: count}}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT operation, entries, bytes FROM totals WHERE entries > 0"
+            ).fetchall()
+
+        return {
+            "total_entries": sum(r[1] for r in rows),
+            "total_bytes": sum(r[2] for r in rows),
+            "by_operation": {r[0]: r[1] for r in rows},
+        }
+
+    def rebuild(self) -> int:
+        """
+        Re-index every <key>.json in cache_dir. Only needed for entries
+        written before the manifest existed or changed behind its back.
+
+        Returns:
+            Number of entries indexed
+        """
+        records = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                records.append((
+                    entry.name[:-len(".json")],
+                    data.get("operation", "unknown"),
+                    entry.stat().st_size,
+                    data.get("cached_at"),
+                ))
+            except (json.JSONDecodeError, OSError):
+                continue
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM totals")
+            self._conn.executemany(
+                "INSERT INTO entries(key, operation, size, cached_at) VALUES (?, ?, ?, ?)",
+                records,
+            )
+
+        return len(records)
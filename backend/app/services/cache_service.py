@@ -1,58 +1,141 @@
+import argparse
 import hashlib
 import json
 import os
-from typing import Optional
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional
 from datetime import datetime
 
+from app.services.memory_cache import MemoryLRU
+from app.services.cache_files import FileCacheBackend
+from app.services.cache_sqlite import SQLiteCacheBackend
+from app.llm.gemini_prompts import DOCUMENT_TYPES
+from app.utils.logger import get_logger
+from app.utils.metrics import CACHE_LOOKUPS
+from app.utils.text_utils import text_fingerprint
+from app.utils.tracing import record, span
+from app.utils.config import (
+    CACHE_BACKEND,
+    CACHE_MEMORY_MAX_ENTRIES,
+    CACHE_MEMORY_MAX_BYTES,
+    CACHE_MEMORY_TTL_SECONDS,
+)
+
+
+logger = get_logger("cache")
+
+# Counter key -> result label on docai_cache_lookups_total
+_RESULT = {"hits": "hit", "misses": "miss"}
+
+# Operations keyed by document text (see rekey); "embeddings" entries
+# predate EmbeddingStore and are no longer read
+_TEXT_OPERATIONS = ("classify", "summarize", "extract", "embeddings")
+
+
+def _build_backend(name: str):
+    if name == "files":
+        return FileCacheBackend("cache/gemini")
+    if name == "sqlite":
+        return SQLiteCacheBackend()
+    raise RuntimeError(f"Unknown CACHE_BACKEND: {name!r} (expected 'files' or 'sqlite')")
+
 
 class CacheService:
     """
     Smart caching layer for Gemini API responses.
     Reduces API calls by 50-90% by caching OCR text and LLM results.
+
+    Two tiers: a bounded in-process LRU (memory) that reads and writes
+    through to a disk backend chosen by CACHE_BACKEND:
+        - files:  one JSON file per key under cache/gemini (default)
+        - sqlite: one compressed SQLite database (cache/gemini.sqlite)
     """
 
-    def __init__(self):
-        self.cache_dir = "cache/gemini"
-        os.makedirs(self.cache_dir, exist_ok=True)
+    TIERS = ("memory", "disk")
+
+    def __init__(self, backend: Optional[str] = None):
+        self.disk = _build_backend(backend or CACHE_BACKEND)
+
+        self.memory = MemoryLRU(
+            max_entries=CACHE_MEMORY_MAX_ENTRIES,
+            max_bytes=CACHE_MEMORY_MAX_BYTES,
+            ttl_seconds=CACHE_MEMORY_TTL_SECONDS,
+        )
+
+        self._counter_lock = threading.Lock()
+        self._counters = {tier: {"hits": 0, "misses": 0} for tier in self.TIERS}
 
-    def _get_cache_key(self, text: str, operation: str) -> str:
+    def _count(self, tier: str, outcome: str, operation: str):
+        with self._counter_lock:
+            self._counters[tier][outcome] += 1
+        CACHE_LOOKUPS.inc(operation=operation, tier=tier, result=_RESULT[outcome])
+
+    def _get_cache_key(self, text: str, operation: str, fingerprint: Optional[str] = None) -> str:
         """
-        Generate unique cache key from text content + operation type.
-        Uses MD5 hash to handle long texts.
+        Generate unique cache key from the text fingerprint + operation type.
+
+        Pass the fingerprint saved with the OCR text to skip normalizing and
+        hashing the whole document again; it is computed from text otherwise.
         """
-        # Normalize text to avoid cache misses from whitespace differences
-        normalized = " ".join(text.split())
-        content = f"{operation}:{normalized}"
+        if fingerprint is None:
+            fingerprint = text_fingerprint(text)
+        content = f"{operation}:{fingerprint}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
-    def get(self, text: str, operation: str) -> Optional[dict]:
+    @staticmethod
+    def _legacy_cache_key(text: str, operation: str) -> str:
+        """Key used before fingerprints: a hash of "operation:normalized text"."""
+        normalized = " ".join(text.split())
+        return hashlib.md5(f"{operation}:{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, text: str, operation: str, fingerprint: Optional[str] = None) -> Optional[dict]:
         """
         Retrieve cached result if it exists.
 
         Args:
             text: The document text (OCR output)
             operation: Type of operation ('classify', 'extract', 'summarize')
+            fingerprint: Precomputed text_fingerprint(text), if known
 
         Returns:
             Cached result dict or None if not found
         """
-        key = self._get_cache_key(text, operation)
-        path = os.path.join(self.cache_dir, f"{key}.json")
-
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    print(f"✅ CACHE HIT [{operation}] - Saved 1 API call! (key: {key[:8]}...)")
-                    return data.get("result")
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"⚠️ Cache read error: {e}")
-                return None
+        started = time.perf_counter()
+        key = self._get_cache_key(text, operation, fingerprint)
+
+        # Tier 1: memory
+        result = self.memory.get(key)
+        if result is not None:
+            self._count("memory", "hits", operation)
+            record(f"cache.{operation}", time.perf_counter() - started, "memory hit")
+            return result
+        self._count("memory", "misses", operation)
 
-        print(f"❌ CACHE MISS [{operation}] - Will call Gemini API")
+        # Tier 2: disk
+        found = self.disk.read(key)
+
+        if found is not None:
+            result, size = found
+            if result is not None:
+                self.memory.set(key, result, size, operation)
+            self._count("disk", "hits", operation)
+            record(f"cache.{operation}", time.perf_counter() - started, "disk hit")
+            logger.debug("cache hit", extra={"operation": operation, "tier": "disk", "key": key[:8]})
+            return result
+
+        self._count("disk", "misses", operation)
+        record(f"cache.{operation}", time.perf_counter() - started, "miss")
+        logger.debug("cache miss", extra={"operation": operation, "key": key[:8]})
         return None
 
-    def set(self, text: str, operation: str, result: dict):
+    def contains(self, text: str, operation: str, fingerprint: Optional[str] = None) -> bool:
+        """Whether an entry exists, without counting a hit or miss."""
+        key = self._get_cache_key(text, operation, fingerprint)
+        return self.memory.get(key) is not None or self.disk.read(key) is not None
+
+    def set(self, text: str, operation: str, result: dict, fingerprint: Optional[str] = None):
         """
         Save result to cache with metadata.
 
@@ -60,9 +143,9 @@ class CacheService:
             text: The document text
             operation: Type of operation
             result: The API response to cache
+            fingerprint: Precomputed text_fingerprint(text), if known
         """
-        key = self._get_cache_key(text, operation)
-        path = os.path.join(self.cache_dir, f"{key}.json")
+        key = self._get_cache_key(text, operation, fingerprint)
 
         cache_data = {
             "operation": operation,
@@ -72,11 +155,14 @@ class CacheService:
         }
 
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
-            print(f"💾 CACHED [{operation}] (key: {key[:8]}...)")
-        except IOError as e:
-            print(f"⚠️ Cache write error: {e}")
+            with span(f"cache.{operation}", "write"):
+                size = self.disk.write(key, cache_data)
+            logger.debug("cached", extra={"operation": operation, "key": key[:8], "bytes": size})
+        except (IOError, sqlite3.Error) as e:
+            logger.warning("cache write failed", extra={"operation": operation, "key": key[:8], "error": str(e)})
+            size = len(json.dumps(result))
+
+        self.memory.set(key, result, size, operation)
 
     def clear(self, operation: Optional[str] = None):
         """
@@ -85,60 +171,140 @@ class CacheService:
         Args:
             operation: If specified, only clear caches for this operation type
         """
-        if not os.path.exists(self.cache_dir):
-            return
-
-        deleted = 0
-        for filename in os.listdir(self.cache_dir):
-            if not filename.endswith('.json'):
-                continue
-
-            filepath = os.path.join(self.cache_dir, filename)
-
-            if operation:
-                # Only delete if operation matches
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        if data.get("operation") == operation:
-                            os.remove(filepath)
-                            deleted += 1
-                except:
-                    continue
-            else:
-                # Delete all
-                os.remove(filepath)
-                deleted += 1
-
-        print(f"🗑️ Cleared {deleted} cache entries")
+        self.memory.clear(operation)
+        deleted = self.disk.clear(operation)
 
-    def stats(self) -> dict:
-        """Get cache statistics."""
-        if not os.path.exists(self.cache_dir):
-            return {"total_entries": 0}
+        logger.info("cache cleared", extra={"operation": operation or "all", "entries": deleted})
 
-        files = [f for f in os.listdir(self.cache_dir) if f.endswith('.json')]
+    def rekey(self, texts: Iterable[str], purge: bool = False) -> dict:
+        """
+        Move entries written under the old text-hash keys to the current
+        fingerprint keys. Those entries are otherwise never looked up
+        again, yet still counted in stats() and never evicted.
 
-        ops = {}
-        total_size = 0
+        For each document text, its classify, summarize and extract
+        entries (for every type in DOCUMENT_TYPES and the one it was
+        classified as) are rewritten under the current key, unless that
+        key already has an entry, and the old entry is deleted.
 
-        for filename in files:
-            filepath = os.path.join(self.cache_dir, filename)
-            try:
-                total_size += os.path.getsize(filepath)
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    op = data.get("operation", "unknown")
-                    ops[op] = ops.get(op, 0) + 1
-            except:
-                continue
+        With purge=True, entries of the text-keyed operations that none of
+        the texts maps to under the current keys are deleted as well:
+        leftovers of documents no longer on disk, old embeddings, warm-up
+        samples and extractions for override types outside that set.
+
+        Returns:
+            {"rekeyed", "unmatched", "purged"} entry counts
+        """
+        current, moved = set(), set()
+
+        def move(text: str, operation: str, legacy_text: str, fingerprint: str):
+            key = self._get_cache_key(text, operation, fingerprint)
+            current.add(key)
+
+            legacy = self._legacy_cache_key(legacy_text, operation)
+            found = self.disk.read(legacy)
+            if found is None or found[0] is None:
+                return None
+
+            if self.disk.read(key) is None:
+                self.disk.write(key, {
+                    "operation": operation,
+                    "cached_at": datetime.now().isoformat(),
+                    "text_length": len(text),
+                    "result": found[0],
+                })
+            moved.add(legacy)
+            return found[0]
+
+        for text in texts:
+            fp = text_fingerprint(text)
+            move(text, "summarize", text, fp)
+
+            classification = move(text, "classify", text, fp)
+            if classification is None:
+                found = self.disk.read(self._get_cache_key(text, "classify", fp))
+                classification = found[0] if found else None
+            doc_types = set(DOCUMENT_TYPES)
+            if isinstance(classification, dict) and classification.get("document_type"):
+                doc_types.add(classification["document_type"])
+            for doc_type in doc_types:
+                move(text, "extract", f"{doc_type}|{text}", f"{doc_type}|{fp}")
+
+        self.disk.delete(list(moved))
+
+        unmatched = [
+            key
+            for operation in _TEXT_OPERATIONS
+            for key in self.disk.keys(operation)
+            if key not in current
+        ]
+        purged = self.disk.delete(unmatched) if purge and unmatched else 0
+
+        logger.info(
+            "cache rekeyed",
+            extra={"rekeyed": len(moved), "unmatched": len(unmatched), "purged": purged},
+        )
+        return {"rekeyed": len(moved), "unmatched": len(unmatched), "purged": purged}
+
+    def reindex(self) -> int:
+        """Rebuild the disk tier's index (manifest or totals) from its entries."""
+        return self.disk.reindex()
+
+    def tier_stats(self) -> dict:
+        """Hit/miss counters per tier since process start."""
+        with self._counter_lock:
+            counters = {tier: dict(c) for tier, c in self._counters.items()}
+
+        for c in counters.values():
+            lookups = c["hits"] + c["misses"]
+            c["hit_ratio"] = round(c["hits"] / lookups, 4) if lookups else 0.0
+
+        counters["memory"].update(self.memory.stats())
+        return counters
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        totals = self.disk.totals()
 
         return {
-            "total_entries": len(files),
-            "total_size_kb": round(total_size / 1024, 2),
-            "by_operation": ops
+            "backend": self.disk.name,
+            "total_entries": totals["total_entries"],
+            "total_size_kb": round(totals["total_bytes"] / 1024, 2),
+            "by_operation": totals["by_operation"],
+            "tiers": self.tier_stats()
         }
 
 
 # Singleton instance
-cache_service = CacheService()
\ No newline at end of file
+cache_service = CacheService()
+
+
+def _saved_texts(cache_dir: str) -> Iterator[str]:
+    """OCR texts saved by DocumentService.save_text (<file_id>.txt)."""
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".txt") and entry.is_file():
+            with open(entry.path, "r", encoding="utf-8") as f:
+                yield f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance for the Gemini response cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rekey = sub.add_parser("rekey", help="move entries from text-hash keys to fingerprint keys")
+    rekey.add_argument("--texts", default="cache", help="directory with the saved <file_id>.txt OCR texts")
+    rekey.add_argument("--purge", action="store_true", help="delete entries no saved text maps to")
+
+    args = parser.parse_args()
+
+    counts = cache_service.rekey(_saved_texts(args.texts), purge=args.purge)
+    cache_service.disk.flush()
+    print(f"Rekeyed {counts['rekeyed']} entries ({cache_service.disk.name} backend)")
+    if args.purge:
+        print(f"Purged {counts['purged']} entries no saved text maps to")
+    elif counts["unmatched"]:
+        print(f"{counts['unmatched']} entries match no saved text; rerun with --purge to delete them")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
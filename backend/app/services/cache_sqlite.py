@@ -0,0 +1,316 @@
+# app/services/cache_sqlite.py
+
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import List, Optional
+
+from app.services.cache_manifest import TOTALS_SCHEMA
+from app.utils.config import (
+    CACHE_SQLITE_PATH,
+    CACHE_SQLITE_BATCH_SIZE,
+    CACHE_SQLITE_FLUSH_SECONDS,
+)
+from app.utils.logger import get_logger
+
+
+logger = get_logger("cache")
+
+ENTRIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key          TEXT PRIMARY KEY,
+    operation    TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    cached_at    TEXT,
+    text_length  INTEGER,
+    payload      BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_operation ON entries(operation);
+"""
+
+UPSERT = """
+INSERT INTO entries(key, operation, size, cached_at, text_length, payload)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    operation = excluded.operation,
+    size = excluded.size,
+    cached_at = excluded.cached_at,
+    text_length = excluded.text_length,
+    payload = excluded.payload
+"""
+
+
+def _pack(result) -> bytes:
+    return zlib.compress(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(payload: bytes):
+    return json.loads(zlib.decompress(payload))
+
+
+class SQLiteCacheBackend:
+    """
+    Disk tier that keeps every entry in one SQLite file.
+
+    - payloads are compact JSON, zlib-compressed
+    - writes are buffered and committed in batches, either every
+      CACHE_SQLITE_BATCH_SIZE entries or after CACHE_SQLITE_FLUSH_SECONDS
+    - WAL journal, one connection per thread, so readers in any worker
+      never wait on a writer
+
+    Buffered writes are visible to reads in this process straight away and
+    are flushed at exit. Entries from a cache/gemini directory can be
+    imported with `import_directory` (see `python -m app.services.cache_sqlite`).
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = CACHE_SQLITE_PATH,
+        batch_size: int = CACHE_SQLITE_BATCH_SIZE,
+        flush_seconds: float = CACHE_SQLITE_FLUSH_SECONDS,
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._timer = None
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(ENTRIES_SCHEMA + TOTALS_SCHEMA)
+
+        atexit.register(self.flush)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------
+    # READ / WRITE
+    # ------------------------------------------
+    def read(self, key: str) -> Optional[tuple]:
+        """
+        Returns:
+            (result, size_bytes) or None if the key is not cached
+        """
+        with self._pending_lock:
+            row = self._pending.get(key)
+
+        if row is not None:
+            payload = row[5]
+        else:
+            found = self._conn().execute(
+                "SELECT payload FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if found is None:
+                return None
+            payload = found[0]
+
+        try:
+            return _unpack(payload), len(payload)
+        except (zlib.error, json.JSONDecodeError) as e:
+            logger.warning("cache read failed", extra={"backend": "sqlite", "key": key[:8], "error": str(e)})
+            return None
+
+    def write(self, key: str, cache_data: dict) -> int:
+        """
+        Buffer one entry for the next batch.
+
+        Returns:
+            Stored (compressed) size in bytes
+        """
+        payload = _pack(cache_data["result"])
+        row = (
+            key,
+            cache_data["operation"],
+            len(payload),
+            cache_data.get("cached_at"),
+            cache_data.get("text_length"),
+            payload,
+        )
+
+        with self._pending_lock:
+            self._pending[key] = row
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None and self.flush_seconds > 0:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full or self.flush_seconds <= 0:
+            self.flush()
+
+        return len(payload)
+
+    def flush(self):
+        """Commit every buffered write in one transaction."""
+        with self._pending_lock:
+            rows = list(self._pending.values())
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not rows:
+            return
+
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany(UPSERT, rows)
+
+        # Drop only the rows we committed; newer writes to the same key stay
+        with self._pending_lock:
+            for row in rows:
+                if self._pending.get(row[0]) is row:
+                    del self._pending[row[0]]
+
+    # ------------------------------------------
+    # MAINTENANCE
+    # ------------------------------------------
+    def keys(self, operation: Optional[str] = None) -> List[str]:
+        self.flush()
+
+        if operation is None:
+            rows = self._conn().execute("SELECT key FROM entries")
+        else:
+            rows = self._conn().execute("SELECT key FROM entries WHERE operation = ?", (operation,))
+        return [r[0] for r in rows]
+
+    def delete(self, keys: List[str]) -> int:
+        self.flush()
+
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                cur = conn.executemany("DELETE FROM entries WHERE key = ?", ((k,) for k in keys))
+            return cur.rowcount
+
+    def clear(self, operation: Optional[str] = None) -> int:
+        self.flush()
+
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                if operation:
+                    cur = conn.execute("DELETE FROM entries WHERE operation = ?", (operation,))
+                else:
+                    cur = conn.execute("DELETE FROM entries")
+                    conn.execute("DELETE FROM totals")
+            return cur.rowcount
+
+    def totals(self) -> dict:
+        self.flush()
+
+        rows = self._conn().execute(
+            "SELECT operation, entries, bytes FROM totals WHERE entries > 0"
+        ).fetchall()
+
+        return {
+            "total_entries": sum(r[1] for r in rows),
+            "total_bytes": sum(r[2] for r in rows),
+            "by_operation": {r[0]: r[1] for r in rows},
+        }
+
+    def reindex(self) -> int:
+        """Recompute the per-operation totals from the entries table."""
+        self.flush()
+
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM totals")
+                conn.execute(
+                    """
+                    INSERT INTO totals(operation, entries, bytes)
+                    SELECT operation, COUNT(*), SUM(size) FROM entries GROUP BY operation
+                    """
+                )
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def import_directory(self, cache_dir: str, chunk_size: int = 500) -> int:
+        """
+        Copy every <key>.json entry of a FileCacheBackend directory into this
+        database. Existing keys are overwritten; the directory is left as is.
+
+        Returns:
+            Number of entries imported
+        """
+        self.flush()
+        imported = 0
+        rows = []
+
+        def commit():
+            with self._write_lock:
+                conn = self._conn()
+                with conn:
+                    conn.executemany(UPSERT, rows)
+
+        for entry in os.scandir(cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                continue
+
+            payload = _pack(data.get("result"))
+            rows.append((
+                entry.name[:-len(".json")],
+                data.get("operation", "unknown"),
+                len(payload),
+                data.get("cached_at"),
+                data.get("text_length"),
+                payload,
+            ))
+
+            if len(rows) >= chunk_size:
+                commit()
+                imported += len(rows)
+                rows = []
+
+        if rows:
+            commit()
+            imported += len(rows)
+
+        return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate a cache/gemini JSON directory into the SQLite cache backend."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="import <key>.json entries")
+    migrate.add_argument("--source", default="cache/gemini")
+    migrate.add_argument("--target", default=CACHE_SQLITE_PATH)
+
+    args = parser.parse_args()
+
+    backend = SQLiteCacheBackend(path=args.target)
+    imported = backend.import_directory(args.source)
+    print(f"Imported {imported} entries from {args.source} into {args.target}")
+    print("Set CACHE_BACKEND=sqlite to use it.")
+
+
+if __name__ == "__main__":
+    main()
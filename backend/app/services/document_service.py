@@ -1,50 +1,172 @@
+import hashlib
+import json
 import os
+import shutil
 import uuid
-from typing import Optional
+from typing import Optional, Tuple
+
+from app.detectors.mime_detector import SNIFF_BYTES, sniff_mime
+from app.services.near_duplicate import near_duplicate_index
+from app.utils.config import NEAR_DUP_ENABLED
+from app.utils.text_utils import join_page_texts, text_fingerprint
 
 class DocumentService:
     def __init__(self):
         self.upload_dir = "uploads"
+        self.blob_dir = os.path.join(self.upload_dir, "blobs")
         self.cache_dir = "cache"
 
-        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.blob_dir, exist_ok=True)
         os.makedirs(self.cache_dir, exist_ok=True)
 
     # ------------------------------------------
-    # SAVE FILE
+    # SAVE FILE (content-addressed)
     # ------------------------------------------
-    def save_file(self, file) -> str:
-        file_id = str(uuid.uuid4())
-        filename = f"{file_id}.pdf"
+    # Bytes live once per content hash in uploads/blobs/<sha256>; each
+    # file_id is a small uploads/<file_id>.ref JSON pointing at its blob.
+    # Re-uploading the same file costs one ref, and everything keyed by
+    # the blob hash (OCR above all) is shared between the two file_ids.
 
-        path = os.path.join(self.upload_dir, filename)
+    def save_file(self, file) -> str:
+        file_id = self.new_file_id()
+        incoming = self.incoming_path(file_id)
 
-        with open(path, "wb") as f:
+        with open(incoming, "wb") as f:
             f.write(file)
 
+        self.commit_upload(
+            file_id,
+            incoming,
+            sha256=hashlib.sha256(file).hexdigest(),
+            mime_type=sniff_mime(file[:SNIFF_BYTES]) or "application/octet-stream",
+            size=len(file),
+        )
         return file_id
 
+    def new_file_id(self) -> str:
+        return str(uuid.uuid4())
+
+    def incoming_path(self, file_id: str) -> str:
+        """Temporary path an upload is streamed to before commit_upload."""
+        return os.path.join(self.blob_dir, f"incoming-{file_id}")
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256)
+
+    def commit_upload(
+        self,
+        file_id: str,
+        incoming: str,
+        sha256: str,
+        mime_type: str,
+        size: int,
+        filename: Optional[str] = None,
+    ) -> bool:
+        """
+        Move a fully written upload into the blob store and record its ref.
+
+        Returns:
+            True if identical bytes were already stored (the upload is
+            dropped and the existing blob shared)
+        """
+        blob = self.blob_path(sha256)
+        deduplicated = os.path.exists(blob)
+
+        if deduplicated:
+            os.remove(incoming)
+        else:
+            os.replace(incoming, blob)
+
+        self._write_ref(file_id, {
+            "sha256": sha256,
+            "mime_type": mime_type,
+            "size": size,
+            "filename": filename,
+        })
+        return deduplicated
+
+    # ------------------------------------------
+    # FILE_ID -> BLOB
+    # ------------------------------------------
+    def get_blob(self, file_id: str) -> Optional[dict]:
+        """
+        Blob ref of an upload: {"sha256", "mime_type", "size", "filename"}.
+
+        Uploads stored before the blob store (uploads/<file_id>.pdf) are
+        hashed and moved into it on first access.
+        """
+        path = self._ref_path(file_id)
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        legacy = os.path.join(self.upload_dir, f"{file_id}.pdf")
+        if not os.path.exists(legacy):
+            return None
+
+        hasher = hashlib.sha256()
+        with open(legacy, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            hasher.update(head)
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+
+        self.commit_upload(
+            file_id,
+            legacy,
+            sha256=hasher.hexdigest(),
+            mime_type=sniff_mime(head) or "application/pdf",
+            size=os.path.getsize(legacy),
+        )
+        return self.get_blob(file_id)
+
     # ------------------------------------------
     # READ RAW BYTES FOR OCR
     # ------------------------------------------
     def read_file_bytes(self, file_id: str) -> bytes:
-        path = os.path.join(self.upload_dir, f"{file_id}.pdf")
+        blob = self.get_blob(file_id)
 
-        if not os.path.exists(path):
+        if blob is None:
             raise FileNotFoundError(f"File not found in uploads/: {file_id}")
 
-        with open(path, "rb") as f:
+        with open(self.blob_path(blob["sha256"]), "rb") as f:
             return f.read()
 
+    def _ref_path(self, file_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{file_id}.ref")
+
+    def _write_ref(self, file_id: str, ref: dict):
+        tmp = f"{self._ref_path(file_id)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ref, f)
+        os.replace(tmp, self._ref_path(file_id))
+
     # ------------------------------------------
     # SAVE OCR TEXT TO CACHE
     # ------------------------------------------
-    def save_text(self, file_id: str, text: str):
+    def save_text(self, file_id: str, text: str) -> str:
+        """
+        Save OCR text plus its fingerprint (cache/{file_id}.fp), which
+        the Gemini cache uses as its key for this document, and add it to
+        the near-duplicate index.
+
+        Returns:
+            The text fingerprint
+        """
         path = os.path.join(self.cache_dir, f"{file_id}.txt")
 
         with open(path, "w", encoding="utf-8") as f:
             f.write(text)
 
+        fingerprint = text_fingerprint(text)
+        self._write_fingerprint(file_id, fingerprint)
+
+        if NEAR_DUP_ENABLED:
+            near_duplicate_index.add(fingerprint, text)
+
+        return fingerprint
+
     # ------------------------------------------
     # GET OCR TEXT FROM CACHE
     # ------------------------------------------
@@ -57,6 +179,85 @@ class DocumentService:
         with open(path, "r", encoding="utf-8") as f:
             return f.read()
 
+    # ------------------------------------------
+    # PARTIAL OCR TEXT (streaming OCR)
+    # ------------------------------------------
+    # While a document is OCR'd range by range, every finished range is
+    # kept in cache/{file_id}.pages/<first>-<last>.txt until the full text
+    # is saved, so later stages can start on the pages already done.
+
+    def save_page_text(self, file_id: str, first_page: int, last_page: int, text: str):
+        pages_dir = self._pages_dir(file_id)
+        os.makedirs(pages_dir, exist_ok=True)
+
+        path = os.path.join(pages_dir, f"{first_page:05d}-{last_page:05d}.txt")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(f"{path}.tmp", path)
+
+    def get_partial_text(self, file_id: str) -> Optional[Tuple[str, int]]:
+        """
+        Text of the pages OCR'd so far, from page 1 up to the first gap.
+
+        Returns:
+            (text, last_page) or None if page 1 isn't done yet
+        """
+        pages_dir = self._pages_dir(file_id)
+        if not os.path.isdir(pages_dir):
+            return None
+
+        ranges = []
+        for name in os.listdir(pages_dir):
+            if name.endswith(".txt"):
+                first, last = name[:-4].split("-")
+                ranges.append((int(first), int(last), name))
+
+        texts, last_page = [], 0
+        for first, last, name in sorted(ranges):
+            if first != last_page + 1:
+                break
+            with open(os.path.join(pages_dir, name), "r", encoding="utf-8") as f:
+                texts.append(f.read())
+            last_page = last
+
+        if not texts:
+            return None
+        return join_page_texts(texts), last_page
+
+    def clear_pages(self, file_id: str):
+        shutil.rmtree(self._pages_dir(file_id), ignore_errors=True)
+
+    def _pages_dir(self, file_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_id}.pages")
+
+    # ------------------------------------------
+    # GET TEXT FINGERPRINT
+    # ------------------------------------------
+    def get_fingerprint(self, file_id: str) -> Optional[str]:
+        """
+        Fingerprint saved with the OCR text. Text saved before fingerprints
+        existed is fingerprinted once here and the result stored.
+        """
+        path = os.path.join(self.cache_dir, f"{file_id}.fp")
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+
+        text = self.get_text(file_id)
+        if text is None:
+            return None
+
+        fingerprint = text_fingerprint(text)
+        self._write_fingerprint(file_id, fingerprint)
+        return fingerprint
+
+    def _write_fingerprint(self, file_id: str, fingerprint: str):
+        path = os.path.join(self.cache_dir, f"{file_id}.fp")
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+
 
 # Singleton instance
 document_service = DocumentService()
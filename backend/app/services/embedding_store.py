@@ -0,0 +1,299 @@
+# app/services/embedding_store.py
+
+import base64
+import fcntl
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.utils.config import EMBEDDING_STORE_DIR, EMBEDDING_STORE_DTYPE
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped store of embedding vectors.
+
+    Layout of the store directory:
+        meta.json    {"dim": 768, "dtype": "float32" | "int8"}
+        vectors.bin  packed rows, dim values each
+        scales.bin   one float32 per row (int8 only): row = q * scale
+        index.tsv    "<key>\\t<row>\\t<label>" per line
+
+    Keys are text fingerprints, labels are file_ids. A key has exactly one
+    row; extra labels for it are extra index lines pointing at that row.
+    index.tsv is written last, so a row only becomes visible once its
+    vector is fully on disk. Appends take an flock, so several workers can
+    share one store; each picks up the others' rows on its next miss.
+    """
+
+    DTYPES = ("float32", "int8")
+
+    def __init__(self, directory: str = EMBEDDING_STORE_DIR, dtype: str = EMBEDDING_STORE_DTYPE):
+        if dtype not in self.DTYPES:
+            raise RuntimeError(f"Unknown EMBEDDING_STORE_DTYPE: {dtype!r}")
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._scales_path = os.path.join(directory, "scales.bin")
+        self._index_path = os.path.join(directory, "index.tsv")
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._labels: Dict[str, List[str]] = {}
+        self._label_keys: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._count = 0
+        self._index_offset = 0
+        self._vectors = None
+        self._scales = None
+
+        self.dim: Optional[int] = None
+        self.dtype = dtype
+        self._load_meta()
+        self._refresh()
+
+    # ------------------------------------------
+    # READ
+    # ------------------------------------------
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Vector for a key as float32. For a float32 store this is a read-only
+        view into the memory map (no copy); int8 rows are dequantized.
+        """
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self._refresh()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+
+            vectors = self._vectors
+            if self.dtype == "float32":
+                return vectors[row]
+            return vectors[row].astype(np.float32) * self._scales[row]
+
+    def matrix(self, start: int = 0):
+        """
+        Stored rows from `start` on, for bulk similarity work.
+
+        Returns:
+            (vectors, scales, keys) where vectors is the (n, dim) memory map
+            (float32 or int8), scales is the (n,) float32 array for int8
+            stores and None otherwise, and keys[i] is the key of row i.
+            vectors is None while the store is empty.
+        """
+        with self._lock:
+            self._refresh()
+            if self._vectors is None:
+                return None, None, []
+
+            scales = self._scales[start:] if self._scales is not None else None
+            return self._vectors[start:], scales, self._keys[start:]
+
+    def labels(self, key: str) -> List[str]:
+        with self._lock:
+            return list(self._labels.get(key, ()))
+
+    def key_for_label(self, label: str) -> Optional[str]:
+        with self._lock:
+            if label not in self._label_keys:
+                self._refresh()
+            return self._label_keys.get(label)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    # ------------------------------------------
+    # WRITE
+    # ------------------------------------------
+    def add(self, key: str, values, label: Optional[str] = None) -> np.ndarray:
+        """
+        Append a vector (no-op if the key is stored) and tag it with label.
+
+        Returns:
+            The stored vector, as get() would return it
+        """
+        vector = np.asarray(values, dtype=np.float32).ravel()
+
+        with self._lock, self._file_lock():
+            self._refresh()
+
+            if key not in self._rows:
+                if self.dim is None:
+                    self._write_meta(vector.shape[0])
+                if vector.shape[0] != self.dim:
+                    raise ValueError(
+                        f"Embedding has {vector.shape[0]} dims, store holds {self.dim}"
+                    )
+                self._append_row(key, vector, label)
+            elif label and label not in self._labels.get(key, ()):
+                self._append_index(key, self._rows[key], label)
+
+            self._refresh()
+
+        return self.get(key)
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            for path in (self._meta_path, self._vectors_path, self._scales_path, self._index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+            self._reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            size = sum(
+                os.path.getsize(p)
+                for p in (self._vectors_path, self._scales_path, self._index_path)
+                if os.path.exists(p)
+            )
+            return {
+                "vectors": self._count,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "size_kb": round(size / 1024, 2),
+            }
+
+    # ------------------------------------------
+    # INTERNALS
+    # ------------------------------------------
+    def _file_lock(self):
+        return _FileLock(self._lock_path)
+
+    def _load_meta(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        # An existing store keeps the dtype it was created with
+        self.dtype = meta.get("dtype", "float32")
+
+    def _write_meta(self, dim: int):
+        self.dim = dim
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "dtype": self.dtype}, f)
+
+    def _append_row(self, key: str, vector: np.ndarray, label: Optional[str]):
+        row = os.path.getsize(self._vectors_path) // self._row_bytes() if os.path.exists(self._vectors_path) else 0
+
+        if self.dtype == "int8":
+            peak = float(np.abs(vector).max())
+            scale = peak / 127 if peak else 1.0
+            packed = np.round(vector / scale).astype(np.int8)
+            with open(self._scales_path, "ab") as f:
+                f.write(np.float32(scale).tobytes())
+        else:
+            packed = vector
+
+        with open(self._vectors_path, "ab") as f:
+            f.write(packed.tobytes())
+
+        self._append_index(key, row, label)
+
+    def _append_index(self, key: str, row: int, label: Optional[str]):
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.write(f"{key}\t{row}\t{label or ''}\n")
+
+    def _row_bytes(self) -> int:
+        return self.dim * np.dtype(self.dtype).itemsize
+
+    def _reset(self):
+        self._rows, self._labels, self._label_keys = {}, {}, {}
+        self._keys = []
+        self._count = self._index_offset = 0
+        self._vectors = self._scales = None
+        self.dim = None
+
+    def _refresh(self):
+        """Pick up index lines appended since the last read (by any worker)."""
+        if not os.path.exists(self._index_path):
+            if self._count:
+                self._reset()  # cleared by another worker
+            return
+
+        if os.path.getsize(self._index_path) < self._index_offset:
+            self._reset()
+
+        if self.dim is None:
+            self._load_meta()
+
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            chunk = f.read()
+
+        # Only consume complete lines
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        self._index_offset += end
+
+        for line in chunk[:end].decode("utf-8").splitlines():
+            key, row, label = line.split("\t")
+            row = int(row)
+            if key not in self._rows:
+                self._rows[key] = row
+                self._keys.append(key)  # new keys arrive in row order
+            if label:
+                self._labels.setdefault(key, []).append(label)
+                self._label_keys[label] = key
+            self._count = max(self._count, row + 1)
+
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=self.dtype, mode="r", shape=(self._count, self.dim)
+        )
+        if self.dtype == "int8":
+            self._scales = np.memmap(
+                self._scales_path, dtype=np.float32, mode="r", shape=(self._count,)
+            )
+
+
+def encode_vector(vector, fmt: str = "list"):
+    """
+    JSON-friendly form of a vector for API responses.
+
+    Args:
+        fmt: "list" for a float array, "base64" for packed little-endian
+            float32 bytes (~4 bytes per value instead of ~20)
+    """
+    if vector is None:
+        return None
+
+    array = np.asarray(vector, dtype="<f4")
+    if fmt == "base64":
+        return {
+            "dtype": "float32",
+            "dim": int(array.shape[0]),
+            "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        }
+    return array.tolist()
+
+
+class _FileLock:
+    """Exclusive flock held while a worker appends to the store."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        self._fd = open(self.path, "a")
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._fd.close()
+
+
+embedding_store = EmbeddingStore()
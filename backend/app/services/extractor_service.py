@@ -0,0 +1,321 @@
+# app/services/extractor_service.py
+
+import asyncio
+import re
+import time
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.detectors.document_classifier import classification_gate, document_classifier
+from app.extractors.local_engine import local_engine
+from app.llm.gemini_client import async_gemini
+from app.services.cache_service import cache_service
+from app.services.embedding_store import encode_vector
+from app.services.near_duplicate import near_duplicate_index
+from app.services.nlp_service import nlp_service
+from app.utils.config import NEAR_DUP_ENABLED
+from app.utils.text_utils import text_fingerprint
+from app.utils.tracing import record, span
+
+
+class ExtractorService:
+    """
+    Runs the classify → extract → summarize → embed pipeline for one document.
+
+    Modes:
+        - sequential: every stage waits for the previous one (original behaviour)
+        - concurrent: summary and embeddings run alongside classification, and
+          extraction only waits for classification when it needs its result
+
+    With fused=True and no override_type, classification and extraction are
+    answered by a single Gemini generation instead of two.
+
+    With near_duplicates=True, a document with no cached results of its own
+    first borrows them from its closest near-duplicate (see
+    reuse_near_duplicate), so a rescan of a known template skips Gemini.
+    Borrowed results are reported under "near_duplicate" and never cached
+    as this document's own.
+
+    run_local() is the zero-LLM alternative: rule-based classification and
+    the registered local extractors only.
+    """
+
+    MODES = ("sequential", "concurrent")
+
+    async def run(
+        self,
+        text: str,
+        fingerprint: Optional[str] = None,
+        file_id: Optional[str] = None,
+        override_type: Optional[str] = None,
+        include_summary: bool = False,
+        include_embeddings: bool = False,
+        mode: str = "sequential",
+        fused: bool = False,
+        near_duplicates: bool = False,
+    ) -> dict:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+
+        timings = {}
+        fuse = fused and override_type is None
+        fp = fingerprint or text_fingerprint(text)
+        started = time.perf_counter()
+
+        async def timed(stage: str, coro):
+            t0 = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = round((time.perf_counter() - t0) * 1000, 2)
+
+        near_duplicate, borrowed = None, {}
+        if near_duplicates:
+            with span("near_duplicate"):
+                near_duplicate, borrowed = await timed(
+                    "near_duplicate",
+                    run_in_threadpool(self.reuse_near_duplicate, text, fp, override_type),
+                )
+
+        async def classify():
+            if "classify" in borrowed:
+                return borrowed["classify"]
+            return await timed("classify", async_gemini.classify_document(text, fp))
+
+        async def extract(doc_type: Optional[str]):
+            borrowed_type, extraction = borrowed.get("extract", (None, None))
+            if doc_type is not None and doc_type == borrowed_type:
+                return extraction
+            return await timed("extract", async_gemini.extract_structured(text, doc_type, fp))
+
+        async def classify_and_extract():
+            if fuse and not borrowed:
+                return await timed("classify+extract", async_gemini.classify_and_extract(text, fp))
+
+            if override_type and mode == "concurrent":
+                # Extraction does not need the classifier's answer
+                return await asyncio.gather(classify(), extract(override_type))
+
+            detected = await classify()
+            return detected, await extract(override_type or detected.get("document_type"))
+
+        async def summarize():
+            if not include_summary:
+                return None
+            return await timed("summarize", async_gemini.summarize(text, fp))
+
+        async def embed():
+            if not include_embeddings:
+                return None
+            return await timed("embed", nlp_service.embed_text_async(text, fp, file_id))
+
+        if mode == "concurrent":
+            (detected, extraction), summary, embeddings = await asyncio.gather(
+                classify_and_extract(), summarize(), embed()
+            )
+        else:
+            detected, extraction = await classify_and_extract()
+            summary = await summarize()
+            embeddings = await embed()
+
+        detected_type = detected.get("document_type")
+
+        return {
+            "detected_type": detected_type,
+            "used_type": override_type or detected_type,
+            "detection_confidence": detected.get("confidence", 0.0),
+            "detection_tier": detected.get("tier", "gemini"),
+            "extraction": extraction,
+            "summary": summary,
+            "embeddings": embeddings,
+            "near_duplicate": near_duplicate,
+            "pipeline": {
+                "engine": "gemini",
+                "mode": mode,
+                "fused": fuse,
+                "timings_ms": timings,
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        }
+
+    def run_local(self, text: str, override_type: Optional[str] = None) -> dict:
+        """
+        Classify and extract without calling Gemini.
+
+        The rule-based classifier's answer is used as-is (no threshold),
+        unless override_type is given.
+
+        Raises:
+            UnsupportedDocumentType: no local extractor for the used type
+        """
+        timings = {}
+        started = time.perf_counter()
+
+        detected = document_classifier.classify(text)
+        classified = time.perf_counter()
+        timings["classify"] = round((classified - started) * 1000, 2)
+        record("classify", classified - started, "local")
+
+        used_type = override_type or detected["document_type"]
+
+        extraction = local_engine.extract(text, used_type)
+        timings["extract"] = round((time.perf_counter() - classified) * 1000, 2)
+        record("extract", time.perf_counter() - classified, "local")
+
+        return {
+            "detected_type": detected["document_type"],
+            "used_type": used_type,
+            "detection_confidence": detected["confidence"],
+            "detection_tier": "rules",
+            "extraction": extraction,
+            "summary": None,
+            "embeddings": None,
+            "near_duplicate": None,
+            "pipeline": {
+                "engine": "local",
+                "mode": "sequential",
+                "fused": False,
+                "timings_ms": timings,
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        }
+
+    def reuse_near_duplicate(
+        self, text: str, fingerprint: str, doc_type: Optional[str] = None
+    ) -> Tuple[Optional[dict], dict]:
+        """
+        Classification and extraction borrowed from the most similar
+        already-seen document (MinHash estimate >= NEAR_DUP_THRESHOLD), for
+        whichever of the two this document has no exact cache entry for.
+
+        Nothing is written to the cache: borrowed results live only in the
+        response that reports them, so a later call with near_duplicates
+        off gets this document's own results.
+
+        The neighbour's extraction is looked up for doc_type, else this
+        document's cached classification, else the rules tier's answer
+        (which is never cached), else the borrowed classification. It is
+        only borrowed when every field value in it also appears in this
+        document's text (_fields_in_text): word 3-gram similarity barely
+        moves when an invoice differs only in its number or total.
+
+        Returns:
+            (provenance, borrowed). provenance is {"source_fingerprint",
+            "score", "reused", "rejected"}, or None when no neighbour was
+            consulted. borrowed maps "classify" to a classification and
+            "extract" to a (doc_type, extraction) pair.
+        """
+        if not NEAR_DUP_ENABLED:
+            return None, {}
+
+        own_classify = cache_service.get(text, "classify", fingerprint)
+        ruled = None if own_classify else classification_gate.peek(text)
+        used_type = doc_type or (own_classify or ruled or {}).get("document_type")
+
+        need_classify = not (own_classify or ruled)
+        need_extract = not (used_type and cache_service.get(text, "extract", f"{used_type}|{fingerprint}"))
+        if not (need_classify or need_extract):
+            return None, {}
+
+        match = near_duplicate_index.match(fingerprint, text)
+        if match is None:
+            return None, {}
+
+        match_fp, score = match
+        borrowed, reused, rejected = {}, [], []
+
+        if need_classify:
+            classification = cache_service.get(text, "classify", match_fp)
+            if classification:
+                borrowed["classify"] = {**classification, "tier": "near_duplicate"}
+                used_type = used_type or classification.get("document_type")
+                reused.append("classify")
+
+        if need_extract and used_type:
+            extraction = cache_service.get(text, "extract", f"{used_type}|{match_fp}")
+            if extraction is not None:
+                if _fields_in_text(extraction, text):
+                    borrowed["extract"] = (used_type, extraction)
+                    reused.append("extract")
+                else:
+                    rejected.append("extract")
+
+        provenance = {
+            "source_fingerprint": match_fp,
+            "score": score,
+            "reused": reused,
+            "rejected": rejected,
+        }
+        return provenance, borrowed
+
+
+# ------------------------------------------
+# FIELD CHECK FOR BORROWED EXTRACTIONS
+# ------------------------------------------
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _field_values(value, key: Optional[str] = None):
+    """Scalar leaves of an extraction, minus its document_type label."""
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _field_values(v, k)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _field_values(v, key)
+    elif key != "document_type" and value is not None and not isinstance(value, bool) and value != "":
+        yield value
+
+
+def _as_number(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return round(abs(float(value)), 2)
+    if _NUMBER.fullmatch(value.strip()):
+        return round(float(value.strip().replace(",", "")), 2)
+    return None
+
+
+def _fields_in_text(extraction: dict, text: str) -> bool:
+    """
+    True when every field value of an extraction appears in text: as a
+    whole word or phrase (case and whitespace insensitive), or for numbers
+    as any number in the text with the same value (1,250.00 == 1250).
+    Values the model reformatted (dates, for one) fail the check, which
+    only means Gemini is asked again.
+    """
+    values = list(_field_values(extraction))
+    if not values:
+        return False
+
+    normalized = " ".join(text.lower().split())
+    numbers = {round(float(n.replace(",", "")), 2) for n in _NUMBER.findall(text)}
+
+    for value in values:
+        number = _as_number(value) if isinstance(value, (int, float, str)) else None
+        if number is not None and number in numbers:
+            continue
+        phrase = " ".join(str(value).lower().split())
+        if not re.search(r"(?<!\w)" + re.escape(phrase) + r"(?!\w)", normalized):
+            return False
+    return True
+
+
+def extraction_response(file_id: str, override_type: Optional[str], result: dict, embeddings_format: str) -> dict:
+    """/api/extract response body for a run() or run_local() result."""
+    return {
+        "file_id": file_id,
+        "detected_type": result["detected_type"],
+        "used_type": result["used_type"],
+        "override_used": override_type is not None,
+        "detection_confidence": result["detection_confidence"],
+        "detection_tier": result["detection_tier"],
+        "extraction": result["extraction"],
+        "summary": result["summary"],
+        "embeddings": encode_vector(result["embeddings"], embeddings_format),
+        "near_duplicate": result["near_duplicate"],
+        "pipeline": result["pipeline"],
+    }
+
+
+extractor_service = ExtractorService()
@@ -0,0 +1,511 @@
+# app/services/job_queue.py
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.detectors.document_classifier import document_classifier
+from app.extractors.local_engine import UnsupportedDocumentType
+from app.llm.gemini_client import async_gemini
+from app.services.document_service import document_service
+from app.services.extractor_service import extraction_response, extractor_service
+from app.services.ocr_service import ocr_service
+from app.utils.config import (
+    JOBS_DB_PATH,
+    JOB_WORKERS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF,
+    JOB_POLL_SECONDS,
+    JOB_LEASE_SECONDS,
+)
+from app.utils.logger import get_logger
+
+
+logger = get_logger("jobs")
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    file_id      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    stage        TEXT,
+    options      TEXT NOT NULL,
+    stages       TEXT NOT NULL,
+    result       TEXT,
+    error        TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    run_after    REAL NOT NULL DEFAULT 0,
+    worker_id    TEXT,
+    lease_expires_at REAL,
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    finished_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs(status, run_after, created_at);
+"""
+
+# Pipeline stages, in order; the upload happens before the job is queued
+STAGES = ("ocr", "detect", "extract")
+
+TERMINAL = {"completed", "failed", "cancelled"}
+
+_JSON_COLUMNS = ("options", "stages", "result")
+
+
+class JobError(Exception):
+    """A job failure that retrying won't fix (missing file, bad options)."""
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    for column in _JSON_COLUMNS:
+        job[column] = json.loads(job[column]) if job[column] else None
+    for column in ("run_after", "worker_id", "lease_expires_at"):
+        job.pop(column)
+    return job
+
+
+def new_worker_id() -> str:
+    """Identifies one JobQueue (host, process, instance) as a lease owner."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobStore:
+    """
+    Jobs table in a local SQLite file (WAL, one connection per thread).
+
+    Every state change is committed before it is acted on, so a restarted
+    process finds each job where the last one left it: queued jobs are
+    still queued, and jobs that were running resume after their last
+    finished stage once they are back in the queue.
+
+    A running job is leased: `worker_id` owns it until `lease_expires_at`,
+    and the owner renews the lease while it works. Several processes
+    (uvicorn --workers N) can share one database: `claim` is a single
+    conditional UPDATE, writes by a worker that lost its lease are
+    refused (see `owner=` on `update`), and only jobs whose lease ran out
+    are put back in the queue (`requeue_expired`).
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(JOBS_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, file_id: str, options: dict) -> dict:
+        job_id = str(uuid.uuid4())
+        now = _now()
+
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO jobs(id, file_id, status, stage, options, stages, created_at, updated_at)"
+                " VALUES (?, ?, 'queued', ?, ?, '{}', ?, ?)",
+                (job_id, file_id, STAGES[0], json.dumps(options), now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> list:
+        if status:
+            rows = self._conn().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            )
+        else:
+            rows = self._conn().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [_row_to_job(row) for row in rows]
+
+    def claim(self, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[dict]:
+        """
+        Lease the oldest runnable queued job to `worker_id` and return it.
+
+        The UPDATE only matches a row that is still queued, so when two
+        processes pick the same job only one of them gets it back.
+        """
+        now = time.time()
+        with self._claim_lock, self._conn() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?,"
+                "   worker_id = ?, lease_expires_at = ?"
+                " WHERE id = ("
+                "   SELECT id FROM jobs WHERE status = 'queued' AND run_after <= ?"
+                "   ORDER BY created_at LIMIT 1"
+                " ) AND status = 'queued'"
+                " RETURNING *",
+                (_now(), worker_id, now + lease_seconds, now),
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extend a lease; False if `worker_id` no longer holds the job."""
+        with self._conn() as conn:
+            changed = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?"
+                " WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, worker_id),
+            ).rowcount
+        return changed == 1
+
+    def update(self, job_id: str, owner: Optional[str] = None, **fields) -> bool:
+        """
+        Set columns of a job; dict/list values are stored as JSON.
+
+        With `owner`, only while that worker still holds the job's lease.
+        Leaving the running state (queued, completed, failed) releases it.
+
+        Returns:
+            Whether the job was updated
+        """
+        for column in _JSON_COLUMNS:
+            if column in fields and fields[column] is not None:
+                fields[column] = json.dumps(fields[column])
+        fields["updated_at"] = _now()
+        if fields.get("status") in TERMINAL:
+            fields["finished_at"] = fields["updated_at"]
+        if "status" in fields and fields["status"] != "running":
+            fields["worker_id"] = None
+            fields["lease_expires_at"] = None
+
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        where, params = "id = ?", [job_id]
+        if owner is not None:
+            where += " AND worker_id = ? AND status = 'running'"
+            params.append(owner)
+
+        with self._conn() as conn:
+            changed = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE {where}", (*fields.values(), *params)
+            ).rowcount
+        return changed == 1
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that hasn't started yet."""
+        now = _now()
+        with self._conn() as conn:
+            changed = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ?, finished_at = ?"
+                " WHERE id = ? AND status = 'queued'",
+                (now, now, job_id),
+            ).rowcount
+        return changed == 1
+
+    def requeue_expired(self) -> int:
+        """Put running jobs whose lease ran out (their worker died) back in the queue."""
+        with self._conn() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires_at = NULL, updated_at = ?"
+                " WHERE status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (_now(), time.time()),
+            ).rowcount
+
+    def release(self, worker_id: str) -> int:
+        """Put the jobs `worker_id` is running back in the queue (clean shutdown)."""
+        with self._conn() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires_at = NULL, updated_at = ?"
+                " WHERE status = 'running' AND worker_id = ?",
+                (_now(), worker_id),
+            ).rowcount
+
+    def counts(self) -> dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+
+class JobQueue:
+    """
+    Runs queued jobs through OCR -> detect -> extract on a pool of
+    JOB_WORKERS asyncio workers.
+
+    The stages are the same service calls the HTTP endpoints make, so
+    jobs share the OCR and Gemini caches with them. A failed stage is
+    retried by requeueing the job with exponential backoff, up to
+    JOB_MAX_ATTEMPTS attempts; it resumes at that stage, since each
+    finished stage is recorded in the job before the next one starts
+    (the extract stage together with the job's result).
+
+    Each queue holds its jobs under its own worker id and renews their
+    leases in the background; idle workers requeue jobs whose lease ran
+    out, so a crashed process's jobs are picked up by the others.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_backoff: float = JOB_RETRY_BACKOFF,
+        poll_seconds: float = JOB_POLL_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+    ):
+        self.store = store
+        self.worker_id = new_worker_id()
+        self.lease_seconds = lease_seconds
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.poll_seconds = poll_seconds
+        self._tasks = []
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._busy = 0
+
+    # ------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------
+    async def start(self):
+        if self._tasks:
+            return
+        await self._requeue_expired()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("job queue started", extra={"workers": self.workers, "worker_id": self.worker_id})
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Interrupted jobs go straight back to the queue instead of
+        # waiting for their leases to run out
+        released = await run_in_threadpool(self.store.release, self.worker_id)
+        if released:
+            logger.info("released interrupted jobs", extra={"jobs": released})
+
+    async def _requeue_expired(self):
+        requeued = await run_in_threadpool(self.store.requeue_expired)
+        if requeued:
+            logger.info("requeued jobs with expired leases", extra={"jobs": requeued})
+            self._notify()
+
+    # ------------------------------------------
+    # SUBMIT / OBSERVE
+    # ------------------------------------------
+    async def submit(self, file_id: str, options: dict) -> dict:
+        job = await run_in_threadpool(self.store.submit, file_id, options)
+        self._wake.set()
+        self._notify()
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        cancelled = await run_in_threadpool(self.store.cancel, job_id)
+        if cancelled:
+            self._notify()
+        return cancelled
+
+    async def wait_for_change(self, timeout: float):
+        """Return after any job changes in this process, or after `timeout`."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "worker_id": self.worker_id,
+            "busy": self._busy,
+            "running": bool(self._tasks),
+            "jobs": self.store.counts(),
+        }
+
+    # ------------------------------------------
+    # WORKERS
+    # ------------------------------------------
+    async def _worker(self):
+        while True:
+            # A store or stage error must not end the worker; cancellation
+            # (stop()) is not an Exception and still does
+            try:
+                job = await run_in_threadpool(self.store.claim, self.worker_id, self.lease_seconds)
+                if job is None:
+                    await self._requeue_expired()
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._busy += 1
+                self._notify()
+                heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+                try:
+                    await self._run(job)
+                finally:
+                    heartbeat.cancel()
+                    self._busy -= 1
+                    self._notify()
+            except Exception:
+                logger.exception("job worker error, backing off", extra={"worker_id": self.worker_id})
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await run_in_threadpool(self.store.renew, job_id, self.worker_id, self.lease_seconds):
+                return
+
+    async def _save(self, job: dict, **fields) -> bool:
+        """Write job fields while we still hold its lease; False (and logged) if we lost it."""
+        saved = await run_in_threadpool(self.store.update, job["id"], owner=self.worker_id, **fields)
+        if not saved:
+            logger.warning("job lease lost, abandoning it", extra={"job_id": job["id"]})
+        self._notify()
+        return saved
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+        stages = job["stages"] or {}
+
+        for stage in STAGES:
+            # Finished before a retry or restart (extract only counts with its result)
+            if stage in stages and (stage != "extract" or job["result"] is not None):
+                continue
+
+            if not await self._save(job, stage=stage):
+                return
+
+            started = time.perf_counter()
+            try:
+                summary = await getattr(self, f"_stage_{stage}")(job)
+            except Exception as e:
+                await self._fail(job, stage, e)
+                return
+
+            summary["ms"] = round((time.perf_counter() - started) * 1000, 2)
+            stages[stage] = summary
+
+            # The result is saved in the same write that marks extract done
+            fields = {"stages": stages}
+            if stage == "extract":
+                fields["result"] = job["result"]
+            if not await self._save(job, **fields):
+                return
+
+        if await self._save(job, status="completed", result=job["result"], error=None):
+            logger.info("job completed", extra={"job_id": job_id})
+
+    async def _fail(self, job: dict, stage: str, error: Exception):
+        permanent = isinstance(error, JobError) or job["attempts"] >= self.max_attempts
+        detail = f"{stage}: {error}"
+
+        if permanent:
+            logger.error("job failed", extra={"job_id": job["id"], "stage": stage, "error": error})
+            await self._save(job, status="failed", error=detail)
+        else:
+            delay = self.retry_backoff * 2 ** (job["attempts"] - 1)
+            logger.warning(
+                "job stage failed, retrying",
+                extra={"job_id": job["id"], "stage": stage, "attempt": job["attempts"], "delay_s": round(delay, 1), "error": error},
+            )
+            await self._save(job, status="queued", error=detail, run_after=time.time() + delay)
+
+    # ------------------------------------------
+    # STAGES
+    # ------------------------------------------
+    async def _stage_ocr(self, job: dict) -> dict:
+        file_id = job["file_id"]
+        text = await run_in_threadpool(document_service.get_text, file_id)
+        if text:
+            return {"chars": len(text), "cached": True}
+
+        blob = await run_in_threadpool(document_service.get_blob, file_id)
+        if blob is None:
+            raise JobError(f"File not found in uploads/: {file_id}")
+
+        text, cached = await ocr_service.extract_blob_async(blob, document_service.blob_path(blob["sha256"]))
+        await run_in_threadpool(document_service.save_text, file_id, text)
+        return {"chars": len(text), "cached": cached}
+
+    async def _stage_detect(self, job: dict) -> dict:
+        text, fingerprint = await self._text(job)
+
+        if job["options"].get("engine") == "local":
+            result = await run_in_threadpool(document_classifier.classify, text)
+            tier = "rules"
+        else:
+            result = await async_gemini.classify_document(text, fingerprint)
+            tier = result.get("tier", "gemini")
+
+        return {
+            "document_type": result.get("document_type", "unknown"),
+            "confidence": result.get("confidence", 0.0),
+            "tier": tier,
+        }
+
+    async def _stage_extract(self, job: dict) -> dict:
+        text, fingerprint = await self._text(job)
+        options = job["options"]
+        override_type = options.get("override_type")
+
+        if options.get("engine") == "local":
+            try:
+                result = await run_in_threadpool(extractor_service.run_local, text, override_type)
+            except UnsupportedDocumentType as e:
+                raise JobError(str(e))
+        else:
+            result = await extractor_service.run(
+                text,
+                fingerprint=fingerprint,
+                file_id=job["file_id"],
+                override_type=override_type,
+                include_summary=options.get("include_summary", False),
+                include_embeddings=options.get("include_embeddings", False),
+                mode=options.get("pipeline", "sequential"),
+                fused=options.get("fused", False),
+                near_duplicates=options.get("near_duplicates", False),
+            )
+
+        job["result"] = extraction_response(
+            job["file_id"], override_type, result, options.get("embeddings_format", "list")
+        )
+        return {"used_type": result["used_type"]}
+
+    async def _text(self, job: dict):
+        text = await run_in_threadpool(document_service.get_text, job["file_id"])
+        if not text:
+            raise JobError("OCR text missing")
+        fingerprint = await run_in_threadpool(document_service.get_fingerprint, job["file_id"])
+        return text, fingerprint
+
+
+# Singleton instance (workers are started by the app's lifespan)
+job_queue = JobQueue(JobStore())
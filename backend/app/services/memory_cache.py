@@ -0,0 +1,91 @@
+# app/services/memory_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class MemoryLRU:
+    """
+    Bounded in-process LRU used as the first tier of CacheService.
+
+    Entries are evicted least-recently-used first once either limit is
+    exceeded. Sizes are supplied by the caller (the serialized JSON length),
+    so no extra serialization happens here.
+
+    Args:
+        max_entries: Max number of entries (0 = no limit)
+        max_bytes: Max total size of entries (0 = no limit)
+        ttl_seconds: Entry lifetime; 0 keeps entries until evicted
+    """
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, size, operation, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                self._remove(key)
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, operation: str):
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size, operation, expires_at)
+            self._bytes += size
+
+            while self._data and (
+                (self.max_entries and len(self._data) > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def clear(self, operation: Optional[str] = None):
+        with self._lock:
+            if operation is None:
+                self._data.clear()
+                self._bytes = 0
+                return
+
+            for key in [k for k, e in self._data.items() if e[2] == operation]:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "size_kb": round(self._bytes / 1024, 2),
+                "max_entries": self.max_entries,
+                "max_kb": round(self.max_bytes / 1024, 2),
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self._evictions,
+            }
+
+    def _remove(self, key: str):
+        _, size, _, _ = self._data.pop(key)
+        self._bytes -= size
@@ -0,0 +1,155 @@
+# app/services/near_duplicate.py
+
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.config import NEAR_DUP_DIR, NEAR_DUP_THRESHOLD
+
+
+# MinHash over word 3-grams: 128 hash functions, split into 16 LSH bands
+# of 8 rows. Two documents share a band (and become candidates) with
+# probability ~ 1 - (1 - J^8)^16: ~1.0 at J=0.9, ~0.27 at J=0.6.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+PRIME = np.uint64((1 << 31) - 1)
+CHUNK = 8192
+
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, int(PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(PRIME), NUM_PERM, dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of a text's word 3-grams."""
+    words = text.lower().split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    ) % PRIME
+
+    signature = np.full(NUM_PERM, PRIME, dtype=np.uint64)
+    for lo in range(0, hashes.shape[0], CHUNK):
+        block = hashes[lo:lo + CHUNK, None]
+        np.minimum(signature, ((block * _A + _B) % PRIME).min(axis=0), out=signature)
+
+    return signature.astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index of OCR'd documents, keyed by text fingerprint.
+
+    Signatures are appended to <directory>/signatures.tsv as
+    "<fingerprint>\\t<hex signature>" lines and shared by all workers; each
+    worker loads lines it has not seen before answering a query.
+
+    Args:
+        threshold: Minimum estimated Jaccard similarity for a match
+    """
+
+    def __init__(self, directory: str = NEAR_DUP_DIR, threshold: float = NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "signatures.tsv")
+
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(BANDS)]
+        self._offset = 0
+
+    def add(self, fingerprint: str, text: str) -> np.ndarray:
+        """Index a document (no-op if its fingerprint is already indexed)."""
+        with self._lock:
+            self._refresh()
+            signature = self._signatures.get(fingerprint)
+            if signature is not None:
+                return signature
+
+        signature = minhash_signature(text)
+
+        with self._lock:
+            if fingerprint not in self._signatures:
+                with open(self._path, "a", encoding="utf-8") as f:
+                    f.write(f"{fingerprint}\t{signature.tobytes().hex()}\n")
+                self._insert(fingerprint, signature)
+
+        return signature
+
+    def match(self, fingerprint: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Most similar other indexed document, if it clears the threshold.
+        The query document is indexed as a side effect.
+
+        Returns:
+            (fingerprint, estimated_similarity) or None
+        """
+        signature = self.add(fingerprint, text)
+
+        with self._lock:
+            candidates = set()
+            for band, buckets in enumerate(self._buckets):
+                candidates |= buckets.get(self._band_key(signature, band), set())
+            candidates.discard(fingerprint)
+
+            best, best_score = None, 0.0
+            for candidate in candidates:
+                score = float(np.mean(self._signatures[candidate] == signature))
+                if score > best_score:
+                    best, best_score = candidate, score
+
+        if best is None or best_score < self.threshold:
+            return None
+        return best, round(best_score, 4)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {"documents": len(self._signatures), "threshold": self.threshold}
+
+    def _band_key(self, signature: np.ndarray, band: int) -> bytes:
+        return signature[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def _insert(self, fingerprint: str, signature: np.ndarray):
+        self._signatures[fingerprint] = signature
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(self._band_key(signature, band), set()).add(fingerprint)
+
+    def _refresh(self):
+        """Load signature lines appended since the last call."""
+        if not os.path.exists(self._path):
+            return
+
+        with open(self._path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+
+        # Our own appends are re-read here as well; _insert is idempotent
+        self._offset += end
+        for line in chunk[:end].decode("utf-8").splitlines():
+            fingerprint, hex_signature = line.split("\t")
+            if fingerprint not in self._signatures:
+                signature = np.frombuffer(bytes.fromhex(hex_signature), dtype=np.uint32)
+                self._insert(fingerprint, signature)
+
+
+near_duplicate_index = NearDuplicateIndex()
@@ -1,14 +1,22 @@
-from app.llm.gemini_client import GeminiClient
+from typing import Optional
+from app.llm.gemini_client import gemini, async_gemini
 
 class NLPService:
     def __init__(self):
-        self.gemini = GeminiClient()
+        self.gemini = gemini
+        self.async_gemini = async_gemini
 
     def summarize(self, text: str) -> str:
         return self.gemini.summarize(text)
 
-    def embed_text(self, text: str):
-        return self.gemini.generate_embeddings(text)
+    def embed_text(self, text: str, fingerprint: Optional[str] = None, label: Optional[str] = None):
+        return self.gemini.generate_embeddings(text, fingerprint, label)
+
+    async def summarize_async(self, text: str, fingerprint: Optional[str] = None) -> str:
+        return await self.async_gemini.summarize(text, fingerprint)
+
+    async def embed_text_async(self, text: str, fingerprint: Optional[str] = None, label: Optional[str] = None):
+        return await self.async_gemini.generate_embeddings(text, fingerprint, label)
 
 
 # ✅ Add this line so extract_router can import it
@@ -0,0 +1,128 @@
+# app/services/ocr_fake.py
+#
+# Local stand-in for documentai.DocumentProcessorServiceClient, so OCR and
+# everything downstream of it can run (and be load-tested) without GCP
+# credentials or quota.
+
+import glob
+import hashlib
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+from app.utils.pdf_utils import count_pages
+
+
+class FakeDocumentAIError(RuntimeError):
+    """Injected failure (see FakeDocumentAIClient error_rate)."""
+
+
+_DEFAULT_TEXT = """ACME Supplies Ltd
+12 Industrial Road, Springfield
+Tax Invoice
+Invoice No: INV-{ref}
+Invoice Date: 05/03/2024
+Due Date: 04/04/2024
+Bill To:
+Globex Corporation
+Description Qty Rate Amount
+Widgets 10 12.50 125.00
+Gaskets 4 3.25 13.00
+Sub Total: 138.00
+GST: 24.84
+Total Amount: INR 162.84
+"""
+
+
+class FakeDocumentAIClient:
+    """
+    Drop-in fake for the Document AI client used by OCRService.
+
+    The returned text depends only on the file's bytes:
+        1. <recordings>/<sha256 of bytes>.txt, if it exists
+        2. otherwise one of <recordings>/*.txt picked by that hash, plus a
+           reference line so different files still get different text
+        3. with no recordings, a built-in invoice with the hash as its number
+
+    Args:
+        latency: Seconds each process_document call blocks for
+        page_latency: Extra seconds per page of a PDF request
+        error_rate: Fraction of calls that raise FakeDocumentAIError
+        recordings: Directory of recorded OCR texts (e.g. backend/cache)
+        seed: Seed for the error injection, for repeatable runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        page_latency: float = 0.0,
+        error_rate: float = 0.0,
+        recordings: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.page_latency = page_latency
+        self.error_rate = error_rate
+        self.recordings = recordings
+        self._corpus = sorted(glob.glob(os.path.join(recordings, "*.txt"))) if recordings else []
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeDocumentAIClient":
+        """Fake configured by the FAKE_OCR_* settings (OCR_BACKEND=fake)."""
+        from app.utils.config import (
+            FAKE_OCR_LATENCY,
+            FAKE_OCR_PAGE_LATENCY,
+            FAKE_OCR_ERROR_RATE,
+            FAKE_OCR_RECORDINGS,
+        )
+
+        return cls(
+            latency=FAKE_OCR_LATENCY,
+            page_latency=FAKE_OCR_PAGE_LATENCY,
+            error_rate=FAKE_OCR_ERROR_RATE,
+            recordings=FAKE_OCR_RECORDINGS or None,
+        )
+
+    def processor_path(self, project: str, location: str, processor: str) -> str:
+        return f"projects/{project}/locations/{location}/processors/{processor}"
+
+    def process_document(self, request):
+        raw = request.raw_document
+        delay = self.latency
+        if self.page_latency and raw.mime_type == "application/pdf":
+            delay += self.page_latency * (count_pages(raw.content) or 1)
+        time.sleep(delay)
+
+        with self._lock:
+            self.calls += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                raise FakeDocumentAIError("503 UNAVAILABLE (injected by FakeDocumentAIClient)")
+
+        text = self._text(raw.content)
+        return SimpleNamespace(document=SimpleNamespace(text=text))
+
+    def _text(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+
+        if self.recordings:
+            exact = os.path.join(self.recordings, f"{digest}.txt")
+            if os.path.exists(exact):
+                return _read(exact)
+            if self._corpus:
+                path = self._corpus[int(digest, 16) % len(self._corpus)]
+                return _read(path) + f"\nDocument ref: {digest[:12]}\n"
+
+        return _DEFAULT_TEXT.format(ref=digest[:8].upper())
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
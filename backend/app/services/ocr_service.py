@@ -1,58 +1,372 @@
 import os
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
-from google.cloud import documentai_v1 as documentai
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.llm.singleflight import SingleFlight
+from app.services.cache_service import cache_service
+from app.utils.config import (
+    OCR_BACKEND,
+    OCR_MAX_WORKERS,
+    OCR_MAX_QUEUE,
+    OCR_SPLIT_MIN_PAGES,
+    OCR_PAGES_PER_REQUEST,
+    OCR_PAGE_CONCURRENCY,
+    OCR_RANGE_RETRIES,
+    OCR_RANGE_RETRY_BACKOFF,
+)
+from app.utils.logger import get_logger
+from app.utils.metrics import OCR_PAGES, timed_stage, upstream_call
+from app.utils.pdf_utils import split_pages
+from app.utils.text_utils import join_page_texts
 
 load_dotenv()
 
+logger = get_logger("ocr")
+
+
+class OCRQueueFull(RuntimeError):
+    """Raised when more OCR jobs are waiting than OCR_MAX_QUEUE allows."""
+
+
 class OCRService:
-    def __init__(self):
+    def __init__(self, client=None):
         # Load environment variables
         self.project_id = os.getenv("GCP_PROJECT_ID")
         self.location = os.getenv("GCP_LOCATION")
         self.processor_id = os.getenv("GCP_PROCESSOR_ID")
 
-        print(f"[OCR DEBUG] PROJECT = {self.project_id}")
-        print(f"[OCR DEBUG] LOCATION = {self.location}")
-        print(f"[OCR DEBUG] PROCESSOR = {self.processor_id}")
+        # The Document AI client (credential lookup included) is built on
+        # the first OCR call, so importing this module is cheap and works
+        # without GCP credentials
+        self._client = client
+        self._processor_path = None
+        self._client_lock = threading.Lock()
+
+        # Bounded pool for the blocking process_document calls, so OCR
+        # never runs on the event loop or starves the shared threadpool
+        self.max_workers = OCR_MAX_WORKERS
+        self.max_queue = OCR_MAX_QUEUE
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ocr"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0   # submitted and not yet finished
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
 
-        if not self.project_id or not self.processor_id:
-            raise RuntimeError("Missing GCP_PROJECT_ID or GCP_PROCESSOR_ID")
+        # Large PDFs are OCR'd as parallel page ranges
+        self.split_min_pages = OCR_SPLIT_MIN_PAGES
+        self.pages_per_request = max(1, OCR_PAGES_PER_REQUEST)
+        self.page_concurrency = max(1, OCR_PAGE_CONCURRENCY)
+        self.range_retries = OCR_RANGE_RETRIES
+        self.retry_backoff = OCR_RANGE_RETRY_BACKOFF
+        self._split_documents = 0
+        self._page_ranges = 0
+        self._range_retries = 0
 
-        self.client = documentai.DocumentProcessorServiceClient()
+        # Concurrent OCR requests for the same blob share one Document AI call
+        self.flight = SingleFlight()
 
-        self.processor_path = self.client.processor_path(
-            self.project_id, self.location, self.processor_id
-        )
+    # ------------------------------------------
+    # DOCUMENT AI CLIENT (built on first use)
+    # ------------------------------------------
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    @property
+    def processor_path(self) -> str:
+        if self._processor_path is None:
+            client = self.client
+
+            logger.debug(
+                "document ai processor",
+                extra={"project": self.project_id, "location": self.location, "processor": self.processor_id},
+            )
+
+            if not self.project_id or not self.processor_id:
+                raise RuntimeError("Missing GCP_PROJECT_ID or GCP_PROCESSOR_ID")
+
+            self._processor_path = client.processor_path(
+                self.project_id, self.location, self.processor_id
+            )
+        return self._processor_path
+
+    def _build_client(self):
+        # OCR_BACKEND=fake: local stand-in, no GCP project needed
+        if OCR_BACKEND == "fake":
+            from app.services.ocr_fake import FakeDocumentAIClient
+            logger.info("using FakeDocumentAIClient (OCR_BACKEND=fake)")
+            self.project_id = self.project_id or "fake-project"
+            self.location = self.location or "us"
+            self.processor_id = self.processor_id or "fake-processor"
+            return FakeDocumentAIClient.from_env()
+
+        from google.cloud import documentai_v1 as documentai
+        return documentai.DocumentProcessorServiceClient()
 
     # ✨ NEW — The function your router expects
-    def extract_text(self, file_bytes: bytes) -> str:
+    def extract_text(self, file_bytes: bytes, mime_type: str = "application/pdf") -> str:
         """
         Sends a document to Google Document AI and returns extracted text.
         """
 
         try:
-            raw_document = documentai.RawDocument(
-                content=file_bytes,
-                mime_type="application/pdf"
-            )
-
-            request = documentai.ProcessRequest(
-                name=self.processor_path,
-                raw_document=raw_document
-            )
+            request = self._process_request(file_bytes, mime_type)
 
-            result = self.client.process_document(request=request)
+            with upstream_call("documentai", "process"):
+                result = self.client.process_document(request=request)
             document = result.document
+            OCR_PAGES.inc(len(getattr(document, "pages", None) or []))
 
             text = document.text if document.text else ""
-
-            print("[OCR DEBUG] Extracted text:")
-            print(text[:500])
+            logger.debug("ocr done", extra={"chars": len(text), "bytes": len(file_bytes)})
 
             return text
 
         except Exception as e:
             raise RuntimeError(f"Document AI OCR failed: {e}")
 
+    def _process_request(self, file_bytes: bytes, mime_type: str):
+        """
+        ProcessRequest for the client. The fake gets a plain stand-in, so
+        OCR_BACKEND=fake runs without the Document AI SDK installed.
+        """
+        if OCR_BACKEND == "fake":
+            return SimpleNamespace(
+                name=self.processor_path,
+                raw_document=SimpleNamespace(content=file_bytes, mime_type=mime_type),
+            )
+
+        from google.cloud import documentai_v1 as documentai
+
+        return documentai.ProcessRequest(
+            name=self.processor_path,
+            raw_document=documentai.RawDocument(content=file_bytes, mime_type=mime_type),
+        )
+
+    # ------------------------------------------
+    # NON-BLOCKING OCR
+    # ------------------------------------------
+    async def extract_text_async(self, file_bytes: bytes, mime_type: str = "application/pdf") -> str:
+        """
+        Run extract_text on the OCR worker pool and await the result.
+
+        Cancelling the await withdraws a job that is still waiting for a
+        worker. A job already running can't be interrupted: its Document
+        AI call finishes on its thread and the result is dropped.
+
+        Raises:
+            OCRQueueFull: if OCR_MAX_QUEUE jobs are already waiting
+        """
+        with self._lock:
+            if self.max_queue and self._pending >= self.max_workers + self.max_queue:
+                raise OCRQueueFull(
+                    f"OCR queue is full ({self._pending - self._running} jobs waiting)"
+                )
+            self._pending += 1
+
+        # Carry the request's trace into the worker thread
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._run_job, file_bytes, mime_type)
+        future.add_done_callback(self._withdrawn)
+        return await asyncio.wrap_future(future)
+
+    def _withdrawn(self, future: Future):
+        # Cancelled before a worker picked it up, so _run_job never ran
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+
+    def _run_job(self, file_bytes: bytes, mime_type: str) -> str:
+        with self._lock:
+            self._running += 1
+
+        ok = False
+        try:
+            text = self.extract_text(file_bytes, mime_type)
+            ok = True
+            return text
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._running -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    # ------------------------------------------
+    # PAGE-PARALLEL OCR (large PDFs)
+    # ------------------------------------------
+    async def extract_document_async(
+        self, file_bytes: bytes, mime_type: str = "application/pdf", blob: Optional[dict] = None
+    ) -> str:
+        """
+        OCR a whole document.
+
+        PDFs longer than OCR_SPLIT_MIN_PAGES are split into ranges of
+        OCR_PAGES_PER_REQUEST pages, OCR'd in parallel (at most
+        OCR_PAGE_CONCURRENCY ranges at once) and stitched back together in
+        page order. A failed range is retried on its own.
+
+        With blob (the document's ref from DocumentService.get_blob), each
+        range goes through self.flight, so concurrent OCR of the same blob
+        (this or iter_document_async) shares its Document AI calls.
+
+        Raises:
+            OCRQueueFull: if OCR_MAX_QUEUE jobs are already waiting
+            RuntimeError: if a page range still fails after its retries
+        """
+        parts = [part async for part in self.iter_document_async(file_bytes, mime_type, blob)]
+        parts.sort(key=lambda part: part[0])
+        return join_page_texts(text for _, _, text in parts)
+
+    async def iter_document_async(
+        self, file_bytes: bytes, mime_type: str = "application/pdf", blob: Optional[dict] = None
+    ) -> AsyncIterator[Tuple[int, Optional[int], str]]:
+        """
+        Same as extract_document_async, but yields (first_page, last_page,
+        text) for each page range as soon as it is done, in completion
+        order. A document OCR'd in one request yields once, with last_page
+        None.
+
+        If the caller stops early (or a range gives up), ranges not yet
+        handed to a worker are cancelled; ranges already being OCR'd run
+        to completion on their threads (see extract_text_async) and their
+        text is discarded.
+        """
+        ranges = []
+        if mime_type == "application/pdf" and self.split_min_pages:
+            ranges = await run_in_threadpool(
+                split_pages, file_bytes, self.pages_per_request, self.split_min_pages
+            )
+        if len(ranges) <= 1:
+            yield 1, None, await self._shared(
+                blob, 1, None, lambda: self.extract_text_async(file_bytes, mime_type)
+            )
+            return
+
+        limit = asyncio.Semaphore(self.page_concurrency)
+
+        async def run(first: int, last: int, chunk: bytes) -> Tuple[int, int, str]:
+            async with limit:
+                return first, last, await self._shared(
+                    blob, first, last, lambda: self._extract_range(first, last, chunk)
+                )
+
+        tasks = [asyncio.ensure_future(run(*r)) for r in ranges]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # A range gave up or the caller went away: don't start the rest
+            for task in tasks:
+                task.cancel()
+
+        with self._lock:
+            self._split_documents += 1
+            self._page_ranges += len(ranges)
+
+    def _shared(self, blob: Optional[dict], first: int, last: Optional[int], fn):
+        """fn(), shared with concurrent OCR of the same pages of the same blob."""
+        if blob is None:
+            return fn()
+        return self.flight.do(("ocr", _blob_key(blob), first, last), fn)
+
+    async def _extract_range(self, first: int, last: int, chunk: bytes) -> str:
+        attempt = 0
+        while True:
+            try:
+                return await self.extract_text_async(chunk, "application/pdf")
+            except OCRQueueFull:
+                raise
+            except Exception as e:
+                if attempt >= self.range_retries:
+                    raise RuntimeError(f"pages {first}-{last}: {e}")
+                attempt += 1
+                with self._lock:
+                    self._range_retries += 1
+                logger.warning(
+                    "ocr page range failed, retrying",
+                    extra={"first": first, "last": last, "attempt": attempt, "retries": self.range_retries, "error": str(e)},
+                )
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+    # ------------------------------------------
+    # OCR PER BLOB (content-addressed)
+    # ------------------------------------------
+    @timed_stage("ocr")
+    async def extract_blob_async(self, blob: dict, path: str) -> Tuple[str, bool]:
+        """
+        OCR text of a stored blob, cached in CacheService under its SHA-256
+        (operation "ocr"), so identical files are only ever OCR'd once.
+
+        Args:
+            blob: Ref from DocumentService.get_blob
+            path: Where the blob's bytes are stored
+
+        Returns:
+            (text, cached)
+
+        Raises:
+            OCRQueueFull: on a cache miss with the queue full
+        """
+        cached = self.cached_blob_text(blob)
+        if cached is not None:
+            return cached, True
+
+        async def call():
+            file_bytes = await run_in_threadpool(_read_bytes, path)
+            text = await self.extract_document_async(
+                file_bytes, blob.get("mime_type") or "application/pdf", blob
+            )
+            self.cache_blob_text(blob, text)
+            return text
+
+        return await self.flight.do(("ocr", _blob_key(blob)), call), False
+
+    def cached_blob_text(self, blob: dict) -> Optional[str]:
+        """OCR text cached for a blob, or None."""
+        cached = cache_service.get("", "ocr", _blob_key(blob))
+        return cached["text"] if cached is not None else None
+
+    def cache_blob_text(self, blob: dict, text: str):
+        cache_service.set(text, "ocr", {"text": text}, _blob_key(blob))
+
+    def queue_stats(self) -> dict:
+        """Snapshot of the OCR worker pool."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "split_documents": self._split_documents,
+                "page_ranges": self._page_ranges,
+                "range_retries": self._range_retries,
+            }
+
+def _blob_key(blob: dict) -> str:
+    return f"blob:{blob['sha256']}"
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 # Export singleton
 ocr_service = OCRService()
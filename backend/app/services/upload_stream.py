@@ -0,0 +1,238 @@
+# app/services/upload_stream.py
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.detectors.mime_detector import SNIFF_BYTES, SUPPORTED_MIME_TYPES, sniff_mime
+from app.utils.config import UPLOAD_CHUNK_BYTES, UPLOAD_MAX_BYTES
+
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+# Non-file form fields are kept in memory; cap them
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadError(Exception):
+    """Upload rejected; `status_code` is the HTTP status to answer with."""
+
+    status_code = 400
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UnsupportedUpload(UploadError):
+    status_code = 415
+
+
+class MissingUpload(UploadError):
+    status_code = 422
+
+
+@dataclass
+class UploadResult:
+    filename: Optional[str]
+    size: int
+    sha256: str
+    mime_type: str
+
+
+class _FileSink:
+    """
+    Receives one file part: hashes, sniffs and size-checks bytes as they
+    arrive and writes them to <path>.part in UPLOAD_CHUNK_BYTES blocks.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self._hasher = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = open(f"{path}.part", "wb")
+
+    def feed(self, data: bytes):
+        """Called from the parser callbacks; no I/O here."""
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge(f"File exceeds the upload limit of {self.max_bytes:,} bytes")
+
+        self._buffer += data
+        if self.mime_type is None and len(self._buffer) >= SNIFF_BYTES:
+            self._sniff()
+
+    def _sniff(self):
+        self.mime_type = sniff_mime(bytes(self._buffer[:SNIFF_BYTES])) or "application/octet-stream"
+        if self.mime_type not in SUPPORTED_MIME_TYPES:
+            raise UnsupportedUpload(
+                f"Unsupported file type ({self.mime_type}); "
+                f"expected one of: {', '.join(sorted(SUPPORTED_MIME_TYPES))}"
+            )
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self._buffer) >= UPLOAD_CHUNK_BYTES
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        block, self._buffer = bytes(self._buffer), bytearray()
+        await run_in_threadpool(self._write, block)
+
+    def _write(self, block: bytes):
+        # hashlib releases the GIL on large blocks, so this runs off-loop
+        self._hasher.update(block)
+        self._file.write(block)
+
+    async def finish(self) -> str:
+        if self.mime_type is None:
+            self._sniff()
+        await self.flush()
+        self._file.close()
+        os.replace(f"{self.path}.part", self.path)
+        return self._hasher.hexdigest()
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(f"{self.path}.part")
+        except FileNotFoundError:
+            pass
+
+
+class _MultipartReceiver:
+    """python-multipart callbacks that route the target file part to a _FileSink."""
+
+    def __init__(self, path: str, field: str, max_bytes: int):
+        self.path = path
+        self.field = field.encode()
+        self.max_bytes = max_bytes
+        self.sink: Optional[_FileSink] = None
+        self.filename: Optional[str] = None
+        self.ended = False          # target part fully parsed
+        self._headers = {}
+        self._name = b""
+        self._value = b""
+        self._skip = False
+        self._skipped_bytes = 0
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._headers, self._skip, self._skipped_bytes = {}, False, 0
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._name.lower()] = self._value
+        self._name, self._value = b"", b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        is_target = options.get(b"name") == self.field and b"filename" in options
+
+        # Only the first matching file part is stored; everything else is skipped
+        if is_target and self.sink is None:
+            self.sink = _FileSink(self.path, self.max_bytes)
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+        else:
+            self._skip = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._skip:
+            self._skipped_bytes += end - start
+            if self._skipped_bytes > MAX_FIELD_BYTES:
+                raise UploadError("Form field too large")
+            return
+        self.sink.feed(data[start:end])
+
+    def on_part_end(self):
+        if not self._skip:
+            self.ended = True
+
+
+async def receive_upload(
+    request: Request,
+    path: str,
+    field: str = "file",
+    max_bytes: int = UPLOAD_MAX_BYTES,
+) -> UploadResult:
+    """
+    Stream the `field` file of a multipart request straight to `path`.
+
+    Memory per upload stays at about one UPLOAD_CHUNK_BYTES block however
+    large the file is. The request is refused before its body is read when
+    Content-Length already exceeds the limit, and otherwise as soon as the
+    limit is crossed or the first bytes show an unsupported file type.
+
+    Raises:
+        UploadError: 400 malformed, 413 too large, 415 unsupported type,
+            422 no `field` file part
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadTooLarge(f"File exceeds the upload limit of {max_bytes:,} bytes")
+
+    receiver = _MultipartReceiver(path, field, max_bytes)
+    parser = MultipartParser(params[b"boundary"], receiver.callbacks())
+    sha256 = None
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+
+            sink = receiver.sink
+            if sink is None or sha256 is not None:
+                continue
+            if receiver.ended:
+                sha256 = await sink.finish()
+            elif sink.needs_flush:
+                await sink.flush()
+
+        parser.finalize()
+        if sha256 is None and receiver.ended:
+            sha256 = await receiver.sink.finish()
+    except Exception as e:
+        if receiver.sink is not None and sha256 is None:
+            receiver.sink.abort()
+        if isinstance(e, UploadError):
+            raise
+        raise UploadError(f"Malformed multipart upload: {e}")
+
+    if sha256 is None:
+        if receiver.sink is not None:
+            receiver.sink.abort()
+        raise MissingUpload(f"No file in form field '{field}'")
+
+    return UploadResult(
+        filename=receiver.filename,
+        size=receiver.sink.size,
+        sha256=sha256,
+        mime_type=receiver.sink.mime_type,
+    )
@@ -0,0 +1,225 @@
+# app/services/vector_index.py
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.embedding_store import EmbeddingStore, embedding_store
+from app.utils.config import VECTOR_INDEX_ANN_THRESHOLD, VECTOR_INDEX_NPROBE
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    In-memory cosine-similarity index over row-numbered vectors.
+
+    Below `ann_threshold` rows every query is one matrix-vector product
+    over the whole corpus (exact). From there on an IVF index is used:
+    rows are bucketed by nearest k-means centroid (~4*sqrt(n) buckets, at
+    most n) and a query only scores the rows in its `nprobe` closest
+    buckets. New rows are appended and bucketed incrementally; the
+    centroids are retrained once the corpus has doubled since the last
+    training.
+    """
+
+    def __init__(
+        self,
+        ann_threshold: int = VECTOR_INDEX_ANN_THRESHOLD,
+        nprobe: int = VECTOR_INDEX_NPROBE,
+        seed: int = 0,
+    ):
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self._rng = np.random.default_rng(seed)
+
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def mode(self) -> str:
+        return "ivf" if self._centroids is not None else "brute_force"
+
+    # ------------------------------------------
+    # BUILD
+    # ------------------------------------------
+    def add(self, vectors: np.ndarray):
+        """Append rows; their ids continue from len(self)."""
+        vectors = _normalize(np.atleast_2d(vectors))
+        n, dim = vectors.shape
+        if n == 0:
+            return
+
+        if self._size == 0:
+            self._matrix = np.empty((max(n, 1024), dim), dtype=np.float32)
+        elif self._size + n > self._matrix.shape[0]:
+            grown = np.empty((max(self._size + n, 2 * self._matrix.shape[0]), dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+        start = self._size
+        self._matrix[start:start + n] = vectors
+        self._size += n
+
+        if self._size < self.ann_threshold:
+            return
+
+        if self._centroids is None or self._size >= 2 * self._trained_size:
+            self._train()
+        else:
+            self._assign(start, self._size)
+
+    def _train(self, iterations: int = 8):
+        data = self._matrix[:self._size]
+        # 4*sqrt(n) exceeds n below 16 rows; there can't be more buckets than rows
+        nlist = min(self._size, max(1, int(4 * np.sqrt(self._size))))
+
+        sample_size = min(self._size, nlist * 16)
+        sample = data[self._rng.choice(self._size, sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, nlist, replace=False)].copy()
+
+        # Spherical k-means on the sample
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            used, starts = np.unique(labels[order], return_index=True)
+            sums = centroids.copy()  # empty buckets keep their centroid
+            sums[used] = np.add.reduceat(sample[order], starts, axis=0)
+            centroids = _normalize(sums)
+
+        self._centroids = centroids
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(nlist)]
+        self._trained_size = self._size
+        self._assign(0, self._size)
+
+    def _assign(self, start: int, end: int, chunk: int = 8192):
+        for lo in range(start, end, chunk):
+            hi = min(end, lo + chunk)
+            labels = np.argmax(self._matrix[lo:hi] @ self._centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            bounds = np.searchsorted(labels[order], np.arange(len(self._lists) + 1))
+            for bucket in np.flatnonzero(np.diff(bounds)):
+                rows = order[bounds[bucket]:bounds[bucket + 1]] + lo
+                self._lists[bucket] = np.concatenate([self._lists[bucket], rows])
+
+    # ------------------------------------------
+    # QUERY
+    # ------------------------------------------
+    def search(self, query, k: int = 10, exclude: Optional[int] = None):
+        """
+        Returns:
+            (rows, scores): up to k row ids and cosine similarities, best first
+        """
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        q = _normalize(np.asarray(query, dtype=np.float32).ravel())
+
+        if self._centroids is None:
+            candidates = None
+            scores = self._matrix[:self._size] @ q
+        else:
+            probe = min(self.nprobe, len(self._lists))
+            nearest = np.argpartition(-(self._centroids @ q), probe - 1)[:probe]
+            candidates = np.concatenate([self._lists[b] for b in nearest])
+            scores = self._matrix[candidates] @ q
+
+        if exclude is not None:
+            if candidates is None:
+                scores[exclude] = -np.inf
+            else:
+                scores[candidates == exclude] = -np.inf
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+
+        rows = top if candidates is None else candidates[top]
+        return rows, scores[top]
+
+    def stats(self) -> dict:
+        return {
+            "vectors": self._size,
+            "mode": self.mode,
+            "lists": len(self._lists),
+            "nprobe": self.nprobe if self._centroids is not None else None,
+            "ann_threshold": self.ann_threshold,
+        }
+
+
+class EmbeddingSearch:
+    """
+    Keeps a VectorIndex in step with the embedding store and maps rows
+    back to fingerprints and file_ids. Each query first pulls in any rows
+    appended since the last one, by this worker or another.
+    """
+
+    def __init__(self, store: EmbeddingStore):
+        self.store = store
+        self.index = VectorIndex()
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def sync(self):
+        start = len(self._keys)
+        vectors, scales, keys = self.store.matrix(start)
+
+        if len(self.store) < start:
+            # Store was cleared; start over
+            self.index = VectorIndex()
+            self._keys, self._rows = [], {}
+            start = 0
+            vectors, scales, keys = self.store.matrix(0)
+
+        if vectors is None or not keys:
+            return
+
+        new = np.asarray(vectors, dtype=np.float32)
+        if scales is not None:
+            new = new * np.asarray(scales)[:, None]
+
+        self.index.add(new)
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+        self._keys.extend(keys)
+
+    def similar(self, query, k: int = 10, exclude_key: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            self.sync()
+
+            exclude = self._rows.get(exclude_key) if exclude_key else None
+
+            rows, scores = self.index.search(query, k, exclude)
+            keys = [self._keys[r] for r in rows]
+
+        return [
+            {
+                "fingerprint": key,
+                "file_ids": self.store.labels(key),
+                "score": round(float(score), 6),
+            }
+            for key, score in zip(keys, scores)
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self.sync()
+            return self.index.stats()
+
+
+embedding_search = EmbeddingSearch(embedding_store)
@@ -0,0 +1,188 @@
+# app/utils/config.py
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# ------------------------------------------
+# ENV HELPERS
+# ------------------------------------------
+def env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip()
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise RuntimeError(f"Invalid integer for {name}: {value!r}")
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise RuntimeError(f"Invalid number for {name}: {value!r}")
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ------------------------------------------
+# LOGGING
+# ------------------------------------------
+LOG_LEVEL = env_str("LOG_LEVEL", "INFO")
+# "text" (key=value fields) or "json" (one object per line)
+LOG_FORMAT = env_str("LOG_FORMAT", "text")
+
+
+# ------------------------------------------
+# TRACING
+# ------------------------------------------
+# Per-request spans reported in a Server-Timing response header
+SERVER_TIMING = env_bool("SERVER_TIMING", True)
+# Cap on Server-Timing entries per response (the header has size limits)
+TRACE_MAX_SPANS = env_int("TRACE_MAX_SPANS", 50)
+# Requests slower than this are logged with their spans (0 disables)
+TRACE_SLOW_MS = env_float("TRACE_SLOW_MS", 2000.0)
+
+
+# ------------------------------------------
+# GEMINI
+# ------------------------------------------
+# Max in-flight Gemini calls per worker process (async client only)
+GEMINI_MAX_CONCURRENCY = env_int("GEMINI_MAX_CONCURRENCY", 8)
+
+
+# ------------------------------------------
+# CLASSIFICATION
+# ------------------------------------------
+# Rule-based classifier answers on its own at or above this confidence;
+# below it the document goes to Gemini. 1.0 effectively disables the tier.
+CLASSIFIER_RULES_ENABLED = env_bool("CLASSIFIER_RULES_ENABLED", True)
+CLASSIFIER_RULES_THRESHOLD = env_float("CLASSIFIER_RULES_THRESHOLD", 0.8)
+
+
+# ------------------------------------------
+# STARTUP
+# ------------------------------------------
+# Cloud clients are built lazily on first use. With this set they are
+# built in the background right after startup instead, so the first
+# request doesn't pay for it (startup itself doesn't wait either).
+PRELOAD_CLIENTS = env_bool("PRELOAD_CLIENTS", False)
+
+
+# ------------------------------------------
+# OCR
+# ------------------------------------------
+# Threads dedicated to blocking Document AI calls
+OCR_MAX_WORKERS = env_int("OCR_MAX_WORKERS", 4)
+# Jobs allowed to wait for a worker before new ones are rejected (0 = unbounded)
+OCR_MAX_QUEUE = env_int("OCR_MAX_QUEUE", 32)
+# Documents from one /api/ocr/batch call OCR'd at the same time
+OCR_BATCH_CONCURRENCY = env_int("OCR_BATCH_CONCURRENCY", OCR_MAX_WORKERS)
+# PDFs with more pages than this are split and OCR'd range by range (0 = never)
+OCR_SPLIT_MIN_PAGES = env_int("OCR_SPLIT_MIN_PAGES", 15)
+# Pages per Document AI request once a PDF is split (online limit is 15)
+OCR_PAGES_PER_REQUEST = env_int("OCR_PAGES_PER_REQUEST", 10)
+# Page ranges of one document OCR'd at the same time
+OCR_PAGE_CONCURRENCY = env_int("OCR_PAGE_CONCURRENCY", OCR_MAX_WORKERS)
+# Extra attempts for a failed page range, with exponential backoff
+OCR_RANGE_RETRIES = env_int("OCR_RANGE_RETRIES", 2)
+OCR_RANGE_RETRY_BACKOFF = env_float("OCR_RANGE_RETRY_BACKOFF", 0.5)
+
+
+# ------------------------------------------
+# UPLOADS
+# ------------------------------------------
+# Larger uploads are rejected with 413 while they stream in
+UPLOAD_MAX_BYTES = env_int("UPLOAD_MAX_BYTES", 50 * 1024 * 1024)
+# Bytes buffered per upload before each write to disk
+UPLOAD_CHUNK_BYTES = env_int("UPLOAD_CHUNK_BYTES", 1024 * 1024)
+
+
+# ------------------------------------------
+# BACKGROUND JOBS (/api/jobs)
+# ------------------------------------------
+JOBS_DB_PATH = env_str("JOBS_DB_PATH", "cache/jobs.sqlite")
+# Jobs (OCR -> detect -> extract) run at the same time
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+# Attempts per job before it is marked failed; retries back off exponentially
+JOB_MAX_ATTEMPTS = env_int("JOB_MAX_ATTEMPTS", 3)
+JOB_RETRY_BACKOFF = env_float("JOB_RETRY_BACKOFF", 2.0)
+# Idle workers re-check the queue this often (delayed retries, other processes)
+JOB_POLL_SECONDS = env_float("JOB_POLL_SECONDS", 1.0)
+# A running job belongs to its worker for this long; the worker renews the
+# lease every third of it, and jobs whose lease ran out go back in the queue
+JOB_LEASE_SECONDS = env_float("JOB_LEASE_SECONDS", 60.0)
+
+
+# ------------------------------------------
+# CACHE
+# ------------------------------------------
+# In-process LRU tier in front of cache/gemini (0 disables a limit)
+CACHE_MEMORY_MAX_ENTRIES = env_int("CACHE_MEMORY_MAX_ENTRIES", 2048)
+CACHE_MEMORY_MAX_BYTES = env_int("CACHE_MEMORY_MAX_BYTES", 64 * 1024 * 1024)
+CACHE_MEMORY_TTL_SECONDS = env_float("CACHE_MEMORY_TTL_SECONDS", 0)
+# Disk tier: "files" (one JSON per key in cache/gemini) or "sqlite"
+CACHE_BACKEND = env_str("CACHE_BACKEND", "files")
+CACHE_SQLITE_PATH = env_str("CACHE_SQLITE_PATH", "cache/gemini.sqlite")
+# Writes buffered before one transaction commits them
+CACHE_SQLITE_BATCH_SIZE = env_int("CACHE_SQLITE_BATCH_SIZE", 32)
+CACHE_SQLITE_FLUSH_SECONDS = env_float("CACHE_SQLITE_FLUSH_SECONDS", 0.5)
+
+
+# ------------------------------------------
+# EMBEDDINGS
+# ------------------------------------------
+EMBEDDING_STORE_DIR = env_str("EMBEDDING_STORE_DIR", "cache/embeddings")
+# "float32" or "int8" (per-row scaled, 4x smaller, ~1% cosine error)
+EMBEDDING_STORE_DTYPE = env_str("EMBEDDING_STORE_DTYPE", "float32")
+# Corpus size at which similarity search switches from brute force to IVF
+VECTOR_INDEX_ANN_THRESHOLD = env_int("VECTOR_INDEX_ANN_THRESHOLD", 20000)
+# IVF lists scanned per query (higher = better recall, slower)
+VECTOR_INDEX_NPROBE = env_int("VECTOR_INDEX_NPROBE", 16)
+
+
+# ------------------------------------------
+# NEAR-DUPLICATE REUSE
+# ------------------------------------------
+NEAR_DUP_ENABLED = env_bool("NEAR_DUP_ENABLED", True)
+# Estimated Jaccard similarity (word 3-grams) needed to reuse a result
+NEAR_DUP_THRESHOLD = env_float("NEAR_DUP_THRESHOLD", 0.9)
+NEAR_DUP_DIR = env_str("NEAR_DUP_DIR", "cache/neardup")
+
+
+# ------------------------------------------
+# LOCAL STAND-INS (load tests, offline development)
+# ------------------------------------------
+# "live" (genai.Client) or "fake" (app/llm/gemini_fake.py)
+GEMINI_BACKEND = env_str("GEMINI_BACKEND", "live")
+# "docai" (Document AI) or "fake" (app/services/ocr_fake.py)
+OCR_BACKEND = env_str("OCR_BACKEND", "docai")
+FAKE_GEMINI_LATENCY = env_float("FAKE_GEMINI_LATENCY", 0.2)
+# Fraction of fake calls that raise, like a quota or 5xx error would
+FAKE_GEMINI_ERROR_RATE = env_float("FAKE_GEMINI_ERROR_RATE", 0.0)
+# JSON list of {"match": <prompt substring>, "response": <text or object>}
+FAKE_GEMINI_RECORDINGS = env_str("FAKE_GEMINI_RECORDINGS", "")
+FAKE_OCR_LATENCY = env_float("FAKE_OCR_LATENCY", 0.5)
+# Extra seconds per PDF page, so split documents show their speed-up
+FAKE_OCR_PAGE_LATENCY = env_float("FAKE_OCR_PAGE_LATENCY", 0.0)
+FAKE_OCR_ERROR_RATE = env_float("FAKE_OCR_ERROR_RATE", 0.0)
+# Directory of recorded OCR texts (<sha256 of file>.txt, or any *.txt)
+FAKE_OCR_RECORDINGS = env_str("FAKE_OCR_RECORDINGS", "")
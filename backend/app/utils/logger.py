@@ -0,0 +1,78 @@
+# app/utils/logger.py
+
+import json
+import logging
+import sys
+from contextvars import ContextVar
+from typing import Optional
+
+from app.utils.config import LOG_FORMAT, LOG_LEVEL
+
+
+_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Set by TracingMiddleware for the duration of each HTTP request
+request_id_var: ContextVar[Optional[str]] = ContextVar("docai_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    fields = {key: value for key, value in vars(record).items() if key not in _RESERVED}
+    request_id = request_id_var.get()
+    if request_id is not None:
+        fields.setdefault("request_id", request_id)
+    return fields
+
+
+class TextFormatter(logging.Formatter):
+    """`_FORMAT` followed by the structured fields as key=value pairs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, structured fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger under the "docai" namespace, writing to stderr at LOG_LEVEL.
+
+    Pass structured fields with `extra=`; they are appended as key=value
+    pairs (LOG_FORMAT=text) or become keys of the JSON line
+    (LOG_FORMAT=json), together with the current request id.
+
+    Args:
+        name: Component name, e.g. "classifier"
+    """
+    root = logging.getLogger("docai")
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        if LOG_FORMAT.lower() == "json":
+            handler.setFormatter(JSONFormatter())
+        else:
+            handler.setFormatter(TextFormatter(_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL.upper())
+        root.propagate = False
+
+    return root.getChild(name)
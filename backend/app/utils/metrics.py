@@ -0,0 +1,329 @@
+# app/utils/metrics.py
+#
+# Minimal in-process metrics registry rendered in the Prometheus text
+# exposition format (served at /metrics). Counters, gauges and
+# histograms with labels; thread-safe, no dependencies.
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+from app.utils.tracing import span
+
+
+# Seconds; covers cache hits (sub-ms) up to long OCR jobs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """+1 for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block took, in seconds (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self, key: tuple, value) -> list:
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# ------------------------------------------
+# SERIES
+# ------------------------------------------
+STAGE_SECONDS = registry.histogram(
+    "docai_stage_duration_seconds",
+    "Time spent in each pipeline stage, cache hits included.",
+    ("stage",),
+)
+
+UPSTREAM_CALLS = registry.counter(
+    "docai_upstream_calls_total",
+    "Calls to Gemini and Document AI by outcome (ok or error).",
+    ("service", "operation", "outcome"),
+)
+UPSTREAM_IN_FLIGHT = registry.gauge(
+    "docai_upstream_requests_in_flight",
+    "Gemini and Document AI calls awaiting a response.",
+    ("service",),
+)
+UPSTREAM_SECONDS = registry.histogram(
+    "docai_upstream_duration_seconds",
+    "Latency of individual Gemini and Document AI calls.",
+    ("service", "operation"),
+)
+GEMINI_TOKENS = registry.counter(
+    "docai_gemini_tokens_total",
+    "Gemini tokens from usage_metadata (prompt, candidates, cached, total).",
+    ("operation", "kind"),
+)
+OCR_PAGES = registry.counter(
+    "docai_ocr_pages_total",
+    "Pages returned by Document AI.",
+)
+
+CACHE_LOOKUPS = registry.counter(
+    "docai_cache_lookups_total",
+    "Cache lookups by operation, tier and result (hit or miss).",
+    ("operation", "tier", "result"),
+)
+
+HTTP_IN_FLIGHT = registry.gauge(
+    "docai_http_requests_in_flight",
+    "HTTP requests being served.",
+)
+HTTP_REQUESTS = registry.counter(
+    "docai_http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_SECONDS = registry.histogram(
+    "docai_http_request_duration_seconds",
+    "HTTP request latency by route template (until the response starts).",
+    ("method", "route"),
+)
+
+# Refreshed from the services on every scrape (see /metrics)
+OCR_QUEUE = registry.gauge(
+    "docai_ocr_jobs",
+    "OCR worker pool: jobs running and queued.",
+    ("state",),
+)
+PIPELINE_JOBS = registry.gauge(
+    "docai_pipeline_jobs",
+    "/api/jobs jobs by status.",
+    ("status",),
+)
+
+
+def timed_stage(stage: str):
+    """Decorator: observe a function's run time in STAGE_SECONDS and as a trace span."""
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage), STAGE_SECONDS.time(stage=stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage), STAGE_SECONDS.time(stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def upstream_call(service: str, operation: str):
+    """Count and time one call to Gemini or Document AI (traced as service.operation)."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"{service}.{operation}"), UPSTREAM_IN_FLIGHT.track(service=service):
+            yield
+        outcome = "ok"
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, service=service, operation=operation)
+        UPSTREAM_CALLS.inc(service=service, operation=operation, outcome=outcome)
+
+
+_TOKEN_FIELDS = (
+    ("prompt", "prompt_token_count"),
+    ("candidates", "candidates_token_count"),
+    ("cached", "cached_content_token_count"),
+    ("total", "total_token_count"),
+)
+
+
+def record_tokens(operation: str, response):
+    """Add a Gemini response's usage_metadata to GEMINI_TOKENS."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, field in _TOKEN_FIELDS:
+        count = getattr(usage, field, None)
+        if count:
+            GEMINI_TOKENS.inc(count, operation=operation, kind=kind)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware for the HTTP series. Pure ASGI rather than
+    BaseHTTPMiddleware so streamed responses pass straight through.
+    The route label is the matched path template (/api/ocr/{file_id}),
+    never the raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                HTTP_SECONDS.observe(
+                    time.perf_counter() - started, method=scope["method"], route=_route(scope)
+                )
+            await send(message)
+
+        with HTTP_IN_FLIGHT.track():
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                HTTP_REQUESTS.inc(method=scope["method"], route=_route(scope), status=status["code"])
+
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,66 @@
+# app/utils/pdf_utils.py
+
+import io
+from typing import List, Optional, Tuple
+
+
+def _reader(data: bytes):
+    """pypdf reader for `data`, or None if pypdf is missing or the PDF won't parse."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+
+    try:
+        return PdfReader(io.BytesIO(data))
+    except Exception:
+        return None
+
+
+def count_pages(data: bytes) -> Optional[int]:
+    """Number of pages in a PDF, or None if it can't be read."""
+    reader = _reader(data)
+    if reader is None:
+        return None
+    try:
+        return len(reader.pages)
+    except Exception:
+        return None
+
+
+def split_pages(data: bytes, pages_per_chunk: int, min_pages: int = 0) -> List[Tuple[int, int, bytes]]:
+    """
+    Split a PDF into standalone PDFs of at most `pages_per_chunk` pages.
+
+    Args:
+        data: PDF bytes
+        pages_per_chunk: Maximum pages per output PDF
+        min_pages: PDFs with this many pages or fewer are left whole
+
+    Returns:
+        [(first_page, last_page, pdf_bytes)] in page order, 1-based and
+        inclusive; [] when the PDF is short enough or can't be read
+    """
+    reader = _reader(data)
+    if reader is None:
+        return []
+
+    from pypdf import PdfWriter
+
+    chunks = []
+    try:
+        total = len(reader.pages)
+        if total <= min_pages:
+            return []
+        for start in range(0, total, pages_per_chunk):
+            end = min(start + pages_per_chunk, total)
+            writer = PdfWriter()
+            for index in range(start, end):
+                writer.add_page(reader.pages[index])
+            out = io.BytesIO()
+            writer.write(out)
+            chunks.append((start + 1, end, out.getvalue()))
+    except Exception:
+        return []
+
+    return chunks
@@ -0,0 +1,14 @@
+# app/utils/sse.py
+
+import json
+
+# Keep proxies (nginx in particular) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
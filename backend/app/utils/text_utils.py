@@ -1,6 +1,7 @@
 # app/utils/text_utils.py
 
 import re
+import hashlib
 
 def basic_clean_text(text: str) -> str:
     """
@@ -27,3 +28,29 @@ def basic_clean_text(text: str) -> str:
 
     # Strip leading and trailing whitespace
     return text.strip()
+
+
+def text_fingerprint(text: str) -> str:
+    """
+    Stable fingerprint of a document's text.
+
+    Whitespace is collapsed first, so re-flowed OCR output of the same
+    document gets the same fingerprint. Computed once when OCR text is
+    saved and reused as the cache key for every Gemini operation on it.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
+
+
+def join_page_texts(texts) -> str:
+    """
+    Stitch the OCR text of consecutive page ranges back into one document.
+
+    A single text is returned unchanged; otherwise each part is made to
+    end on a line break so the last line of one range never runs into
+    the first line of the next.
+    """
+    texts = list(texts)
+    if len(texts) == 1:
+        return texts[0]
+    return "".join(t if not t or t.endswith("\n") else t + "\n" for t in texts)
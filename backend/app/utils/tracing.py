@@ -0,0 +1,156 @@
+# app/utils/tracing.py
+#
+# Per-request trace spans, reported to the client in a Server-Timing
+# response header (shown under "Timing" in the browser's network panel):
+#
+#     Server-Timing: cache.classify;dur=0.04;desc="memory hit",
+#                    gemini.extract;dur=812.3, extract;dur=815.9, total;dur=823.1
+#
+# Spans are opened with `span(name)` anywhere below a request; outside
+# one (job workers, scripts) they cost a ContextVar lookup and record
+# nothing.
+
+import time
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from app.utils.config import SERVER_TIMING, TRACE_MAX_SPANS, TRACE_SLOW_MS
+from app.utils.logger import get_logger, request_id_var
+
+
+logger = get_logger("http")
+
+
+class Trace:
+    """Spans recorded while serving one request."""
+
+    def __init__(self, max_spans: int = TRACE_MAX_SPANS):
+        self.started = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans: List[Tuple[str, float, Optional[str]]] = []
+        self.dropped = 0
+        # Spans also arrive from run_in_threadpool and executor threads
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, desc: Optional[str] = None):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append((name, seconds, desc))
+            else:
+                self.dropped += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Spans in completion order, then the request total so far."""
+        with self._lock:
+            spans = list(self.spans)
+            dropped = self.dropped
+
+        entries = [_entry(name, seconds, desc) for name, seconds, desc in spans]
+        if dropped:
+            entries.append(_entry("dropped", 0.0, f"{dropped} more spans"))
+        entries.append(_entry("total", self.elapsed()))
+        return ", ".join(entries)
+
+
+def _entry(name: str, seconds: float, desc: Optional[str] = None) -> str:
+    entry = f"{name};dur={seconds * 1000:.2f}"
+    if desc:
+        entry += ';desc="' + desc.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return entry
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("docai_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def record(name: str, seconds: float, desc: Optional[str] = None):
+    """Add an already measured span to the current request, if any."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds, desc)
+
+
+@contextmanager
+def span(name: str, desc: Optional[str] = None):
+    """Time the block as a span of the current request (also when it raises)."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started, desc)
+
+
+class TracingMiddleware:
+    """
+    Opens a Trace and a request id for each HTTP request.
+
+    Adds `Server-Timing` (when SERVER_TIMING is on) and `X-Request-ID`
+    (the caller's, if it sent one) to the response. Headers go out with
+    the first byte, so for streamed responses (SSE) Server-Timing only
+    covers the work done before streaming started. Requests slower than
+    TRACE_SLOW_MS are logged at WARNING with their full span list.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex[:16]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                if SERVER_TIMING:
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        trace_token = _trace.set(trace)
+        request_token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = trace.elapsed() * 1000
+            fields = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "duration_ms": round(elapsed_ms, 2),
+            }
+            if TRACE_SLOW_MS and elapsed_ms >= TRACE_SLOW_MS:
+                logger.warning("slow request", extra={**fields, "spans": trace.server_timing()})
+            else:
+                logger.debug("request", extra=fields)
+            request_id_var.reset(request_token)
+            _trace.reset(trace_token)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            # Bounded and printable, since it is echoed back and logged
+            value = value.decode("latin-1")[:64]
+            return value if value.isprintable() else None
+    return None
@@ -0,0 +1,96 @@
+"""
+Cache-key cost of one /api/extract call (summary + embeddings) on large
+documents: hashing the full text per lookup vs. one saved fingerprint.
+
+A call does get+set for classify, extract, summarize and embeddings, i.e.
+eight cache keys. Before, each key normalized and MD5'd the whole text
+(extract on a second "{doc_type}|{text}" copy). Now the text is
+fingerprinted once at OCR time and each key hashes ~40 bytes.
+
+    cd backend
+    python -m benchmarks.bench_fingerprint --sizes 100000 1000000 5000000
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.utils.text_utils import text_fingerprint  # noqa: E402
+
+OPERATIONS = ("classify", "extract", "summarize", "embeddings")
+
+
+def load_corpus() -> str:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, "cache", "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    return "\n\f\n".join(texts) or "INVOICE\nInvoice No: INV-1\nTotal: 10.00\n"
+
+
+def make_document(corpus: str, size: int) -> str:
+    repeats = size // len(corpus) + 1
+    return (corpus * repeats)[:size]
+
+
+def legacy_key(text: str, operation: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.md5(f"{operation}:{normalized}".encode("utf-8")).hexdigest()
+
+
+def keys_before(text: str, doc_type: str = "invoice"):
+    for operation in OPERATIONS:
+        source = f"{doc_type}|{text}" if operation == "extract" else text
+        legacy_key(source, operation)  # get
+        legacy_key(source, operation)  # set
+
+
+def keys_after(fingerprint: str, doc_type: str = "invoice"):
+    for operation in OPERATIONS:
+        fp = f"{doc_type}|{fingerprint}" if operation == "extract" else fingerprint
+        for _ in range(2):  # get + set
+            hashlib.md5(f"{operation}:{fp}".encode("utf-8")).hexdigest()
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache key cost per /api/extract call")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+
+    print(f"{'doc size':>12} {'before (ms)':>12} {'fingerprint (ms)':>17} {'after (ms)':>11} {'speedup':>8}")
+    for size in args.sizes:
+        text = make_document(corpus, size)
+        fingerprint = text_fingerprint(text)
+
+        before = best_of(lambda: keys_before(text), args.repeat)
+        once = best_of(lambda: text_fingerprint(text), args.repeat)
+        after = best_of(lambda: keys_after(fingerprint), args.repeat)
+
+        print(
+            f"{size:>12,} {before * 1000:>12.2f} {once * 1000:>17.2f} "
+            f"{after * 1000:>11.4f} {before / max(after, 1e-9):>7.0f}x"
+        )
+
+    print("\n'fingerprint' is paid once per document at OCR time, not per call.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Import and startup time of the API process.
+
+Each run starts a fresh interpreter in a scratch directory and records:
+
+    import_ms   `import main` (every router, service and singleton)
+    ready_ms    import + app lifespan startup + first GET /health answered
+    process_ms  wall time of the whole process, interpreter start included
+
+No credentials are needed: cloud clients are only built on first use
+(or in the background with PRELOAD_CLIENTS=1), so none of the above
+should touch the network. One extra run under `python -X importtime`
+lists the modules that cost the most to import.
+
+Results are written as JSON; pass a previous file with --baseline to
+fail (exit 1) when the median ready_ms got slower than --tolerance allows.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 10 --output bench_startup.json
+    python -m benchmarks.bench_startup --runs 10 --baseline bench_startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line
+CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+
+async def ready():
+    sent = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    scope = {
+        "type": "http", "method": "GET", "path": "/health", "raw_path": b"/health",
+        "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    async with main.app.router.lifespan_context(main.app):
+        await main.app(scope, receive, send)
+        t_ready = time.perf_counter()
+    assert sent[0]["status"] == 200, sent[0]
+    return t_ready
+
+t_ready = asyncio.run(ready())
+print(json.dumps({"import_ms": (t_import - t0) * 1000, "ready_ms": (t_ready - t0) * 1000}))
+"""
+
+
+def run_once(workdir: str, env: dict) -> dict:
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    if out.returncode != 0:
+        sys.exit("startup failed:\n" + "\n".join(out.stderr.strip().splitlines()[-5:]))
+
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    return result
+
+
+def slowest_imports(workdir: str, env: dict, top: int) -> list:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue  # header line
+        modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+
+    modules.sort(key=lambda m: m["self_ms"], reverse=True)
+    return modules[:top]
+
+
+def summarize(values: list) -> dict:
+    values = sorted(values)
+    return {
+        "median": round(statistics.median(values), 1),
+        "min": round(values[0], 1),
+        "max": round(values[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed median ready_ms slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="docai-startup-")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+
+    # Warm-up run: fills the OS page cache and writes .pyc files
+    run_once(workdir, env)
+
+    runs = [run_once(workdir, env) for _ in range(args.runs)]
+    results = {key: summarize([r[key] for r in runs]) for key in ("import_ms", "ready_ms", "process_ms")}
+    imports = slowest_imports(workdir, env, args.top)
+
+    print(f"{'':<12} {'median':>9} {'min':>9} {'max':>9}   ({args.runs} runs, ms)")
+    for key, stats in results.items():
+        print(f"{key:<12} {stats['median']:>9.1f} {stats['min']:>9.1f} {stats['max']:>9.1f}")
+
+    print("\nslowest imports (self time):")
+    for m in imports:
+        print(f"  {m['self_ms']:>8.1f} ms  {m['module']}")
+
+    if args.output:
+        report = {
+            "benchmark": "startup",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"runs": args.runs},
+            "results": results,
+            "slowest_imports": imports,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults written to {os.path.abspath(args.output)}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            before = json.load(f)["results"]["ready_ms"]["median"]
+        now = results["ready_ms"]["median"]
+        ratio = now / max(before, 1e-9)
+        if ratio > 1 + args.tolerance:
+            print(f"REGRESSION ready_ms: median {before:.1f} -> {now:.1f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nno ready_ms regression beyond {args.tolerance:.0%} vs. {os.path.abspath(args.baseline)}")
+
+
+if __name__ == "__main__":
+    main()
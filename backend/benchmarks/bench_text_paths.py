@@ -0,0 +1,203 @@
+"""
+Throughput, latency and allocations of the hot text paths.
+
+Replays the stored OCR corpus (cache/*.txt) through the rule-based
+classifier, each local extractor, basic_clean_text and the cache key
+derivation. --docs scales the corpus synthetically: documents are cycled
+with their digits rewritten, so every one is distinct (and misses any
+cache) while keeping the layout of real OCR output. --size-factor makes
+each document N times longer.
+
+Timing and allocation tracking run as separate passes, since tracemalloc
+itself slows every allocation down. Results are written as JSON; pass a
+previous file with --baseline to fail (exit 1) when a target's p50 got
+slower than --tolerance allows.
+
+    cd backend
+    python -m benchmarks.bench_text_paths --docs 2000 --output bench_text_paths.json
+    python -m benchmarks.bench_text_paths --docs 2000 --baseline bench_text_paths.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DIGIT_RE = re.compile(r"\d")
+
+
+def load_corpus() -> list:
+    texts = set()
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, "cache", "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if text.strip():
+            texts.add(text)
+    return sorted(texts) or ["INVOICE\nInvoice No: INV-1\nBill To:\nACME\nTotal Amount: 10.00\n"]
+
+
+def synthesize(corpus: list, docs: int, size_factor: int, seed: int) -> list:
+    rng = random.Random(seed)
+    out = []
+    for i in range(docs):
+        text = corpus[i % len(corpus)] * size_factor
+        if i >= len(corpus):
+            text = DIGIT_RE.sub(lambda _: str(rng.randrange(10)), text)
+        out.append(text)
+    return out
+
+
+def targets() -> dict:
+    from app.detectors.document_classifier import document_classifier
+    from app.extractors.id_extractor import id_extractor
+    from app.extractors.invoice_extractor import invoice_extractor
+    from app.extractors.po_extractor import po_extractor
+    from app.extractors.receipt_extractor import receipt_extractor
+    from app.services.cache_service import cache_service
+    from app.utils.text_utils import basic_clean_text
+
+    return {
+        "classifier": document_classifier.classify,
+        "extract.invoice": invoice_extractor.extract,
+        "extract.receipt": receipt_extractor.extract,
+        "extract.id_card": id_extractor.extract,
+        "extract.purchase_order": po_extractor.extract,
+        "basic_clean_text": basic_clean_text,
+        # Without a saved fingerprint the whole text is normalized + hashed
+        "cache_key": lambda text: cache_service._get_cache_key(text, "classify"),
+    }
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, documents: list) -> dict:
+    # Warm-up: lazy compilation, caches, first-call imports
+    for text in documents[:10]:
+        fn(text)
+
+    latencies = []
+    started = time.perf_counter()
+    for text in documents:
+        t0 = time.perf_counter()
+        fn(text)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    tracemalloc.start()
+    peaks = []
+    try:
+        for text in documents:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(text)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "docs_per_sec": round(len(documents) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "mean_ms": round(elapsed / len(documents) * 1000, 4),
+        "alloc_peak_kib_mean": round(sum(peaks) / len(peaks) / 1024, 2),
+        "alloc_peak_kib_max": round(max(peaks) / 1024, 2),
+    }
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = current["p50_ms"] / max(before["p50_ms"], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append((name, before["p50_ms"], current["p50_ms"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--size-factor", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="Run only these targets")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    parser.add_argument("--baseline", help="Previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p50 slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    documents = synthesize(corpus, args.docs, args.size_factor, args.seed)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Keep the cache backend's files out of the real cache/ directory
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.chdir(tempfile.mkdtemp(prefix="docai-bench-"))
+
+    selected = targets()
+    if args.only:
+        selected = {name: fn for name, fn in selected.items() if name in args.only}
+
+    avg_chars = sum(map(len, documents)) // len(documents)
+    print(f"corpus: {len(corpus)} OCR texts -> {len(documents)} docs, avg {avg_chars:,} chars\n")
+    print(f"{'target':<24} {'docs/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+
+    results = {}
+    for name, fn in selected.items():
+        stats = measure(fn, documents)
+        results[name] = stats
+        print(
+            f"{name:<24} {stats['docs_per_sec']:>10,.0f} {stats['p50_ms']:>9.3f} "
+            f"{stats['p99_ms']:>9.3f} {stats['alloc_peak_kib_mean']:>9.1f}"
+        )
+
+    if output:
+        report = {
+            "benchmark": "text_paths",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "docs": len(documents),
+                "corpus_texts": len(corpus),
+                "size_factor": args.size_factor,
+                "avg_chars": avg_chars,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults written to {output}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, now, ratio in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} -> {now:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"\nno p50 regressions beyond {args.tolerance:.0%} vs. {baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Top-k similarity search latency and recall: brute force vs. IVF.
+
+Builds a synthetic clustered corpus (documents from the same template sit
+close together, like real vendor documents), then times queries against
+an exact index and an IVF index and reports recall@k of the latter.
+
+    cd backend
+    python -m benchmarks.bench_vector_search --docs 100000 --dim 768
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.vector_index import VectorIndex  # noqa: E402
+
+
+def make_corpus(docs: int, dim: int, templates: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((templates, dim)).astype(np.float32)
+    assignment = rng.integers(0, templates, docs)
+    noise = rng.standard_normal((docs, dim)).astype(np.float32) * 0.6
+    return centers[assignment] + noise
+
+
+def time_queries(index: VectorIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        rows, _ = index.search(q, k)
+        latencies.append(time.perf_counter() - t0)
+        results.append(set(rows.tolist()))
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similarity search benchmark")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--templates", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = make_corpus(args.docs, args.dim, args.templates, rng)
+    queries = corpus[rng.choice(args.docs, args.queries, replace=False)]
+    queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.1
+
+    exact = VectorIndex(ann_threshold=args.docs + 1)
+    t0 = time.perf_counter()
+    exact.add(corpus)
+    exact_build = time.perf_counter() - t0
+
+    ivf = VectorIndex(ann_threshold=1, nprobe=args.nprobe)
+    t0 = time.perf_counter()
+    ivf.add(corpus)
+    ivf_build = time.perf_counter() - t0
+
+    exact_ms, truth = time_queries(exact, queries, args.k)
+    ivf_ms, found = time_queries(ivf, queries, args.k)
+    recall = np.mean([len(t & f) / len(t) for t, f in zip(truth, found)])
+
+    print(f"corpus: {args.docs:,} x {args.dim}, k={args.k}, queries={args.queries}")
+    print(f"{'index':<12} {'build (s)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'recall@k':>9}")
+    print(f"{'brute_force':<12} {exact_build:>10.2f} {np.percentile(exact_ms, 50):>9.2f} "
+          f"{np.percentile(exact_ms, 99):>9.2f} {1.0:>9.3f}")
+    print(f"{'ivf':<12} {ivf_build:>10.2f} {np.percentile(ivf_ms, 50):>9.2f} "
+          f"{np.percentile(ivf_ms, 99):>9.2f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+End-to-end load test: /api/upload -> /api/ocr/{id} -> /api/extract/{id}.
+
+Each session uploads one document, OCRs it and extracts it. Sessions run
+at each --concurrency level in turn, and every level reports sessions/s,
+HTTP requests/s, latency percentiles (end to end and per step), errors,
+and the Gemini cache hit ratio over that level (from /api/cache/stats).
+
+By default the app runs in-process (httpx ASGITransport) with
+GEMINI_BACKEND=fake and OCR_BACKEND=fake in a scratch directory, so no
+quota is spent; tune the stand-ins with FAKE_GEMINI_* / FAKE_OCR_*
+(latency, error rate, recordings). --url targets a running server
+instead; start it with the same variables to keep it offline.
+
+--documents sets how many distinct files are cycled through: sessions
+beyond that re-upload known content, which deduplicates to the stored
+blob and hits the OCR and Gemini caches, so it controls the expected hit
+ratio.
+
+    cd backend
+    python -m benchmarks.load_test --concurrency 1 4 16 --sessions 64 --documents 16
+    FAKE_GEMINI_ERROR_RATE=0.05 python -m benchmarks.load_test --extract-params "pipeline=concurrent"
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = ("upload", "ocr", "extract")
+
+
+def load_documents(count: int) -> list:
+    """`count` distinct PDF payloads, built from the PDFs in storage/."""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, "storage", "*.pdf"))):
+        with open(path, "rb") as f:
+            samples.append(f.read())
+    if not samples:
+        samples = [b"%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n"]
+
+    # Bytes after %%EOF are ignored by PDF readers but change the hash
+    return [samples[i % len(samples)] + f"\n%loadtest-{i}\n".encode() for i in range(count)]
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def cache_counters(stats: dict) -> tuple:
+    tiers = stats["cache_stats"]["tiers"]
+    memory, disk = tiers["memory"], tiers["disk"]
+    return memory["hits"] + disk["hits"], memory["hits"] + memory["misses"]
+
+
+async def run_session(client, payload: bytes, extract_params: str) -> dict:
+    timings, error = {}, None
+
+    async def step(name: str, method: str, url: str, **kwargs):
+        t0 = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        timings[name] = time.perf_counter() - t0
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:120]}")
+        return response.json()
+
+    started = time.perf_counter()
+    try:
+        uploaded = await step(
+            "upload", "POST", "/api/upload",
+            files={"file": ("loadtest.pdf", payload, "application/pdf")},
+        )
+        file_id = uploaded["file_id"]
+        await step("ocr", "POST", f"/api/ocr/{file_id}")
+        url = f"/api/extract/{file_id}" + (f"?{extract_params}" if extract_params else "")
+        await step("extract", "POST", url)
+    except Exception as e:
+        error = str(e)
+
+    return {"total": time.perf_counter() - started, "steps": timings, "error": error}
+
+
+async def run_level(client, documents: list, offset: int, sessions: int, concurrency: int, extract_params: str) -> dict:
+    hits_before, lookups_before = cache_counters((await client.get("/api/cache/stats")).json())
+
+    queue = asyncio.Queue()
+    for i in range(sessions):
+        queue.put_nowait(documents[(offset + i) % len(documents)])
+
+    results = []
+
+    async def worker():
+        while not queue.empty():
+            payload = queue.get_nowait()
+            results.append(await run_session(client, payload, extract_params))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    hits_after, lookups_after = cache_counters((await client.get("/api/cache/stats")).json())
+    lookups = lookups_after - lookups_before
+
+    ok = [r for r in results if r["error"] is None]
+    totals = sorted(r["total"] for r in ok)
+    requests = sum(len(r["steps"]) for r in results)
+
+    def ms(value: float) -> float:
+        return round(value * 1000, 2)
+
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "errors": len(results) - len(ok),
+        "error_samples": sorted({r["error"] for r in results if r["error"]})[:3],
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_sec": round(len(ok) / elapsed, 2),
+        "requests_per_sec": round(requests / elapsed, 2),
+        "p50_ms": ms(percentile(totals, 0.50)),
+        "p95_ms": ms(percentile(totals, 0.95)),
+        "p99_ms": ms(percentile(totals, 0.99)),
+        "step_p50_ms": {
+            name: ms(percentile(sorted(r["steps"][name] for r in results if name in r["steps"]), 0.50))
+            for name in STEPS
+        },
+        "cache_hit_ratio": round((hits_after - hits_before) / lookups, 4) if lookups else 0.0,
+    }
+
+
+async def main_async(args) -> list:
+    import httpx
+
+    documents = load_documents(args.documents)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        # In-process app against the local stand-ins, in a scratch directory
+        os.environ.setdefault("GEMINI_BACKEND", "fake")
+        os.environ.setdefault("OCR_BACKEND", "fake")
+        os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+        sys.path.insert(0, BACKEND_DIR)
+        os.chdir(tempfile.mkdtemp(prefix="docai-load-"))
+
+        from main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+
+    levels = []
+    offset = 0
+    async with client:
+        print(
+            f"{'conc':>5} {'sess/s':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'errors':>7} {'cache hit':>10}"
+        )
+        for concurrency in args.concurrency:
+            level = await run_level(client, documents, offset, args.sessions, concurrency, args.extract_params)
+            offset += args.sessions
+            levels.append(level)
+            print(
+                f"{concurrency:>5} {level['sessions_per_sec']:>8.2f} {level['requests_per_sec']:>8.2f} "
+                f"{level['p50_ms']:>9.1f} {level['p95_ms']:>9.1f} {level['p99_ms']:>9.1f} "
+                f"{level['errors']:>7} {level['cache_hit_ratio']:>10.1%}"
+            )
+            for sample in level["error_samples"]:
+                print(f"      e.g. {sample}")
+
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--sessions", type=int, default=32, help="Sessions per concurrency level")
+    parser.add_argument("--documents", type=int, default=16, help="Distinct documents cycled through")
+    parser.add_argument("--extract-params", default="", help='Query string for /api/extract, e.g. "fused=true"')
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    levels = asyncio.run(main_async(args))
+
+    if output:
+        report = {
+            "benchmark": "load_test",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.url or "in-process",
+            "params": {
+                "sessions": args.sessions,
+                "documents": args.documents,
+                "extract_params": args.extract_params,
+                "env": {
+                    k: v for k, v in os.environ.items()
+                    if k.startswith(("FAKE_", "GEMINI_BACKEND", "OCR_BACKEND", "OCR_MAX", "GEMINI_MAX"))
+                },
+            },
+            "levels": levels,
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from dotenv import load_dotenv
 load_dotenv()   # <-- MUST BE FIRST
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.api.upload_router import router as upload_router
 from app.api.detect_router import router as detect_router
@@ -10,11 +14,49 @@ from app.api.ocr_router import router as ocr_router
 from app.api.extract_router import router as extract_router
 from app.api.health_router import router as health_router
 from app.api.cache_router import router as cache_router  # ✅ NEW
+from app.api.search_router import router as search_router
+from app.api.summary_router import router as summary_router
+from app.api.jobs_router import router as jobs_router
+from app.api.metrics_router import router as metrics_router
+from app.services.job_queue import job_queue
+from app.utils.config import PRELOAD_CLIENTS
+from app.utils.logger import get_logger
+from app.utils.metrics import MetricsMiddleware
+from app.utils.tracing import TracingMiddleware
+
+
+logger = get_logger("main")
+
+
+def preload_clients():
+    """Build the Gemini and Document AI clients ahead of the first request."""
+    from app.llm.gemini_client import shared_client
+    from app.services.ocr_service import ocr_service
+
+    for name, build in (("Gemini", shared_client), ("Document AI", lambda: ocr_service.processor_path)):
+        try:
+            build()
+            logger.info("client ready", extra={"client": name})
+        except Exception as e:
+            logger.warning("client not available yet", extra={"client": name, "error": str(e)})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background pipeline workers for /api/jobs
+    await job_queue.start()
+    preload = asyncio.create_task(run_in_threadpool(preload_clients)) if PRELOAD_CLIENTS else None
+    yield
+    if preload is not None:
+        await preload
+    await job_queue.stop()
+
 
 app = FastAPI(
     title="DocAI — Universal Document Ingestion",
     description="Enterprise Document Intelligence with Smart Caching",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -24,6 +66,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # Routers
 app.include_router(upload_router)
@@ -32,6 +76,10 @@ app.include_router(ocr_router)
 app.include_router(extract_router)
 app.include_router(health_router)
 app.include_router(cache_router)  # ✅ NEW
+app.include_router(search_router)
+app.include_router(summary_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,34 @@
+# tests/conftest.py
+#
+# Runs the suite against the local fakes (GEMINI_BACKEND / OCR_BACKEND
+# = fake) in a scratch working directory: the service singletons create
+# their cache and upload directories relative to it when app modules
+# are first imported.
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ["GEMINI_BACKEND"] = "fake"
+os.environ["OCR_BACKEND"] = "fake"
+os.environ.setdefault("FAKE_GEMINI_LATENCY", "0")
+os.environ.setdefault("FAKE_OCR_LATENCY", "0")
+os.chdir(tempfile.mkdtemp(prefix="docai-tests-"))
+
+
+@pytest.fixture
+def fake_gemini():
+    """The shared async Gemini client, pointed at a fresh zero-latency fake."""
+    from app.llm.gemini_client import async_gemini
+    from app.llm.gemini_fake import FakeGenAIClient
+
+    previous = async_gemini._client
+    fake = FakeGenAIClient(latency=0.0)
+    async_gemini.client = fake
+    yield fake
+    async_gemini.client = previous
@@ -0,0 +1,56 @@
+# tests/test_cache_service.py
+
+import pytest
+
+from app.services.cache_files import FileCacheBackend
+from app.services.cache_service import CacheService
+from app.services.cache_sqlite import SQLiteCacheBackend
+from app.utils.text_utils import text_fingerprint
+
+TEXT = "INVOICE\nInvoice No: INV-7\n\nTotal:   12.50"
+
+
+@pytest.fixture(params=["files", "sqlite"])
+def cache(request, tmp_path):
+    service = CacheService()
+    if request.param == "files":
+        service.disk = FileCacheBackend(str(tmp_path / "gemini"))
+    else:
+        service.disk = SQLiteCacheBackend(path=str(tmp_path / "gemini.sqlite"), flush_seconds=0)
+    service.memory.clear()
+    return service
+
+
+def write_legacy(cache: CacheService, text: str, operation: str, result: dict):
+    """An entry as written before keys were text fingerprints."""
+    key = cache._legacy_cache_key(text, operation)
+    cache.disk.write(key, {"operation": operation, "cached_at": None, "text_length": len(text), "result": result})
+
+
+def test_rekey_moves_old_entries_to_fingerprint_keys(cache):
+    write_legacy(cache, TEXT, "classify", {"document_type": "invoice", "confidence": 0.9})
+    write_legacy(cache, TEXT, "summarize", {"summary": "An invoice."})
+    write_legacy(cache, f"invoice|{TEXT}", "extract", {"invoice_number": "INV-7"})
+    assert cache.get(TEXT, "classify") is None
+
+    counts = cache.rekey([TEXT])
+
+    assert counts == {"rekeyed": 3, "unmatched": 0, "purged": 0}
+    assert cache.get(TEXT, "classify") == {"document_type": "invoice", "confidence": 0.9}
+    assert cache.get(TEXT, "summarize") == {"summary": "An invoice."}
+    assert cache.get(TEXT, "extract", f"invoice|{text_fingerprint(TEXT)}") == {"invoice_number": "INV-7"}
+    assert cache.stats()["total_entries"] == 3
+
+
+def test_rekey_keeps_current_entries_and_purges_only_on_request(cache):
+    cache.set(TEXT, "classify", {"document_type": "receipt", "confidence": 0.8})
+    write_legacy(cache, TEXT, "classify", {"document_type": "invoice", "confidence": 0.9})
+    write_legacy(cache, "a document no longer on disk", "summarize", {"summary": "Gone."})
+
+    assert cache.rekey([TEXT]) == {"rekeyed": 1, "unmatched": 1, "purged": 0}
+    assert cache.get(TEXT, "classify")["document_type"] == "receipt"
+    assert cache.stats()["total_entries"] == 2
+
+    assert cache.rekey([TEXT], purge=True) == {"rekeyed": 0, "unmatched": 1, "purged": 1}
+    assert cache.stats()["total_entries"] == 1
+
@@ -0,0 +1,63 @@
+# tests/test_classification_gate.py
+
+import asyncio
+import logging
+
+from app.detectors.document_classifier import ClassificationGate
+from app.llm.gemini_prompts import DOCUMENT_TYPES
+
+INVOICE = "Tax Invoice\nInvoice No: INV-1\nBill To: Globex\nDue Date: 01/02/2024\nQty 1\nTotal Amount: 10.00"
+ID_CARD = "Identity Card\nID No: 12345\nDate of Birth: 01/01/1990\nBlood Group: O+\nNationality: Indian"
+
+
+def test_labels_outside_the_gemini_set_are_escalated():
+    gate = ClassificationGate(threshold=0.5)
+
+    assert gate.classifier.classify(ID_CARD)["document_type"] == "id_card"
+    assert gate.check(ID_CARD) is None
+    assert gate.peek(ID_CARD) is None
+    assert gate.stats()["escalated_to_llm"] == 1
+
+
+def test_confident_answers_in_the_label_set_are_accepted():
+    gate = ClassificationGate(threshold=0.5)
+
+    answer = gate.check(INVOICE)
+
+    assert answer["document_type"] == "invoice"
+    assert answer["document_type"] in DOCUMENT_TYPES
+    assert answer["tier"] == "rules"
+    assert gate.stats()["answered_by_rules"] == 1
+
+
+def test_decisions_are_logged_at_debug_with_fields(caplog):
+    gate = ClassificationGate(threshold=0.5)
+    logger = logging.getLogger("docai")
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="docai"):
+            gate.check(INVOICE)
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    [record] = [r for r in caplog.records if r.name == "docai.classifier"]
+    assert record.levelno == logging.DEBUG
+    assert record.decision == "accept"
+    assert record.document_type == "invoice"
+
+
+def test_warm_writes_entries_the_rules_tier_would_answer(fake_gemini, monkeypatch):
+    from app.api.cache_router import warm_cache
+    from app.detectors.document_classifier import classification_gate
+    from app.services.cache_service import cache_service
+
+    monkeypatch.setattr(classification_gate, "enabled", True)
+    monkeypatch.setattr(classification_gate, "threshold", 0.0)
+    cache_service.clear("classify")
+
+    first = asyncio.run(warm_cache())
+    second = asyncio.run(warm_cache())
+
+    assert [w["cache"] for w in first["warmed"]] == ["written"] * 3
+    assert first["message"] == "Wrote 3 of 3 sample classifications to the cache"
+    assert [w["cache"] for w in second["warmed"]] == ["already cached"] * 3
@@ -0,0 +1,79 @@
+# tests/test_embedding_store.py
+
+import base64
+
+import numpy as np
+import pytest
+
+from app.services.embedding_store import EmbeddingStore, encode_vector
+
+
+def vector(seed: int, dim: int = 8) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+
+
+def test_float32_rows_round_trip_as_read_only_views(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dtype="float32")
+    store.add("fp-a", vector(1), label="file-1")
+    store.add("fp-b", vector(2), label="file-2")
+
+    stored = store.get("fp-a")
+    assert np.array_equal(stored, vector(1))
+    assert not stored.flags.writeable
+    assert store.get("missing") is None
+    assert len(store) == 2
+
+
+def test_int8_rows_are_dequantized_within_a_step(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dtype="int8")
+    values = vector(3)
+    store.add("fp", values)
+
+    stored = store.get("fp")
+    assert stored.dtype == np.float32
+    assert np.max(np.abs(stored - values)) <= np.max(np.abs(values)) / 127
+
+
+def test_a_key_is_stored_once_and_collects_labels(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.add("fp", vector(4), label="file-1")
+    store.add("fp", vector(5), label="file-2")
+
+    assert len(store) == 1
+    assert np.array_equal(store.get("fp"), vector(4))
+    assert store.labels("fp") == ["file-1", "file-2"]
+    assert store.key_for_label("file-2") == "fp"
+
+
+def test_rows_appended_by_another_store_are_picked_up(tmp_path):
+    ours = EmbeddingStore(str(tmp_path))
+    theirs = EmbeddingStore(str(tmp_path))
+    theirs.add("fp", vector(6), label="file-1")
+
+    assert np.array_equal(ours.get("fp"), vector(6))
+    vectors, scales, keys = ours.matrix()
+    assert keys == ["fp"] and scales is None and vectors.shape == (1, 8)
+
+
+def test_dimension_mismatch_and_clear(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.add("fp", vector(7))
+
+    with pytest.raises(ValueError):
+        store.add("other", vector(8, dim=4))
+
+    store.clear()
+    assert len(store) == 0
+    assert store.matrix() == (None, None, [])
+    store.add("other", vector(8, dim=4))
+    assert store.stats()["dim"] == 4
+
+
+def test_base64_encoding_is_packed_little_endian_float32():
+    values = vector(9)
+    encoded = encode_vector(values, "base64")
+
+    assert encoded["dim"] == 8
+    assert np.array_equal(np.frombuffer(base64.b64decode(encoded["data"]), dtype="<f4"), values)
+    assert encode_vector(values) == values.tolist()
+    assert encode_vector(None) is None
@@ -0,0 +1,187 @@
+# tests/test_job_queue.py
+
+import asyncio
+
+import pytest
+
+from app.services.job_queue import JobError, JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite"))
+
+
+def stub_queue(store, fail=None, **kwargs) -> JobQueue:
+    """A queue whose stages record their calls instead of doing the work."""
+    queue = JobQueue(store, retry_backoff=0.0, **kwargs)
+    queue.calls = []
+
+    def stage(name):
+        async def run(job):
+            queue.calls.append(name)
+            if fail and name in fail:
+                raise fail[name]
+            if name == "extract":
+                job["result"] = {"file_id": job["file_id"]}
+            return {}
+        return run
+
+    for name in ("ocr", "detect", "extract"):
+        setattr(queue, f"_stage_{name}", stage(name))
+    return queue
+
+
+def test_a_queued_job_is_claimed_by_one_worker_only(store):
+    other_process = JobStore(store.path)
+    job = store.submit("file-1", {})
+
+    claimed = store.claim("worker-a")
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == "running"
+    assert other_process.claim("worker-b") is None
+
+
+def test_only_expired_leases_are_requeued(store):
+    live = store.submit("live", {})
+    store.claim("worker-a", lease_seconds=60)
+    assert store.requeue_expired() == 0
+    assert store.get(live["id"])["status"] == "running"
+
+    dead = store.submit("dead", {})
+    store.claim("worker-b", lease_seconds=-1)
+    assert store.requeue_expired() == 1
+    assert store.get(dead["id"])["status"] == "queued"
+    assert store.get(live["id"])["status"] == "running"
+
+
+def test_a_worker_that_lost_its_lease_cannot_write(store):
+    job = store.submit("file-1", {})
+    store.claim("worker-a", lease_seconds=-1)
+    store.requeue_expired()
+    store.claim("worker-b")
+
+    assert not store.renew(job["id"], "worker-a")
+    assert not store.update(job["id"], owner="worker-a", status="completed")
+    assert store.update(job["id"], owner="worker-b", status="completed")
+    assert store.get(job["id"])["status"] == "completed"
+
+
+def test_release_requeues_only_own_jobs(store):
+    mine = store.submit("mine", {})
+    store.claim("worker-a")
+    theirs = store.submit("theirs", {})
+    store.claim("worker-b")
+
+    assert store.release("worker-a") == 1
+    assert store.get(mine["id"])["status"] == "queued"
+    assert store.get(theirs["id"])["status"] == "running"
+
+
+def test_job_runs_all_stages_and_saves_its_result(store):
+    queue = stub_queue(store)
+    job = store.submit("file-1", {})
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+
+    done = store.get(job["id"])
+    assert queue.calls == ["ocr", "detect", "extract"]
+    assert done["status"] == "completed"
+    assert done["result"] == {"file_id": "file-1"}
+    assert set(done["stages"]) == {"ocr", "detect", "extract"}
+
+
+def test_resume_skips_finished_stages(store):
+    queue = stub_queue(store)
+    job = store.submit("file-1", {})
+    store.update(job["id"], stages={"ocr": {}})
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+
+    assert queue.calls == ["detect", "extract"]
+    assert store.get(job["id"])["status"] == "completed"
+
+
+def test_extract_marked_done_without_a_result_is_redone(store):
+    queue = stub_queue(store)
+    job = store.submit("file-1", {})
+    store.update(job["id"], stages={"ocr": {}, "detect": {}, "extract": {}})
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+
+    done = store.get(job["id"])
+    assert queue.calls == ["extract"]
+    assert done["result"] == {"file_id": "file-1"}
+
+
+def test_failed_stage_is_retried_then_fails(store):
+    queue = stub_queue(store, fail={"detect": RuntimeError("quota")}, max_attempts=2)
+    job = store.submit("file-1", {})
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+    retried = store.get(job["id"])
+    assert retried["status"] == "queued"
+    assert retried["error"] == "detect: quota"
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+    failed = store.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 2
+    assert queue.calls == ["ocr", "detect", "detect"]
+
+
+def test_job_error_fails_without_retry(store):
+    queue = stub_queue(store, fail={"ocr": JobError("File not found")})
+    job = store.submit("file-1", {})
+
+    asyncio.run(queue._run(store.claim(queue.worker_id)))
+
+    failed = store.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 1
+
+
+def test_workers_process_submitted_jobs(store):
+    queue = stub_queue(store, workers=2, poll_seconds=0.05)
+
+    async def scenario():
+        await queue.start()
+        jobs = [await queue.submit(f"file-{i}", {}) for i in range(3)]
+        for _ in range(100):
+            if all(store.get(job["id"])["status"] == "completed" for job in jobs):
+                break
+            await asyncio.sleep(0.02)
+        await queue.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert [store.get(job["id"])["status"] for job in jobs] == ["completed"] * 3
+
+
+def test_a_worker_survives_a_store_error(store, monkeypatch):
+    queue = stub_queue(store, workers=1, poll_seconds=0.01)
+    claim = store.claim
+    failures = []
+
+    def flaky_claim(*args, **kwargs):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("database is locked")
+        return claim(*args, **kwargs)
+
+    monkeypatch.setattr(store, "claim", flaky_claim)
+
+    async def scenario():
+        await queue.start()
+        job = await queue.submit("file-1", {})
+        for _ in range(100):
+            if store.get(job["id"])["status"] == "completed":
+                break
+            await asyncio.sleep(0.02)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert failures
+    assert store.get(job["id"])["status"] == "completed"
+    assert all(task.done() for task in queue._tasks)
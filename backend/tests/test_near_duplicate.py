@@ -0,0 +1,73 @@
+# tests/test_near_duplicate.py
+
+import asyncio
+import uuid
+
+from app.services.cache_service import cache_service
+from app.services.extractor_service import extractor_service
+from app.services.near_duplicate import near_duplicate_index
+from app.utils.text_utils import text_fingerprint
+
+
+def invoice_text(number: str, total: str, footer: str, batch: str) -> str:
+    items = "\n".join(f"Widget model {i} batch {batch} Qty 1 Rate 5.00 Amount 5.00" for i in range(60))
+    return (
+        "ACME Supplies Ltd\nTax Invoice\n"
+        f"Invoice No: {number}\nInvoice Date: 05/03/2024\nDue Date: 04/04/2024\n"
+        "Bill To:\nGlobex Corporation\nDescription Qty Rate Amount\n"
+        f"{items}\nSub Total: {total}\nTotal Amount: INR {total}\n{footer}\n"
+    )
+
+
+def seed_neighbour(text: str, extraction: dict) -> str:
+    """Index a document and cache its invoice extraction, as a past run would."""
+    fp = text_fingerprint(text)
+    near_duplicate_index.add(fp, text)
+    cache_service.set(text, "extract", extraction, f"invoice|{fp}")
+    return fp
+
+
+def run(text: str, near_duplicates: bool) -> dict:
+    return asyncio.run(extractor_service.run(
+        text, fingerprint=text_fingerprint(text), near_duplicates=near_duplicates,
+    ))
+
+
+def test_extraction_with_different_field_values_is_not_borrowed(fake_gemini):
+    batch = uuid.uuid4().hex
+    a = invoice_text("INV-0000", "100.00", "Thank you for your business", batch)
+    b = invoice_text("INV-0001", "101.00", "Thank you for your business", batch)
+    source = seed_neighbour(a, {"invoice_number": "INV-0000", "total": 100})
+
+    result = run(b, near_duplicates=True)
+
+    # Rules tier classified B (nothing cached); its type still selected A's extraction
+    assert result["detection_tier"] == "rules"
+    assert result["near_duplicate"]["source_fingerprint"] == source
+    assert result["near_duplicate"]["reused"] == []
+    assert result["near_duplicate"]["rejected"] == ["extract"]
+    assert result["extraction"] != {"invoice_number": "INV-0000", "total": 100}
+
+
+def test_borrowed_extraction_is_reported_and_not_cached(fake_gemini):
+    batch = uuid.uuid4().hex
+    a = invoice_text("INV-0042", "100.00", "Thank you for your business", batch)
+    c = invoice_text("INV-0042", "100.00", "Thanks again for your business", batch)
+    borrowed = {"invoice_number": "INV-0042", "total": 100, "currency": "INR"}
+    source = seed_neighbour(a, borrowed)
+
+    result = run(c, near_duplicates=True)
+
+    assert result["extraction"] == borrowed
+    assert result["near_duplicate"]["source_fingerprint"] == source
+    assert result["near_duplicate"]["score"] >= near_duplicate_index.threshold
+    assert result["near_duplicate"]["reused"] == ["extract"]
+    assert fake_gemini.calls == 0
+
+    # Nothing was stored under C's own key: without reuse, Gemini is asked
+    fp = text_fingerprint(c)
+    assert cache_service.get(c, "extract", f"invoice|{fp}") is None
+    result = run(c, near_duplicates=False)
+    assert result["near_duplicate"] is None
+    assert result["extraction"] != borrowed
+    assert fake_gemini.calls == 1
@@ -0,0 +1,126 @@
+# tests/test_ocr_service.py
+
+import asyncio
+import io
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from pypdf import PdfWriter
+
+from app.services.ocr_fake import FakeDocumentAIClient
+from app.services.ocr_service import OCRService
+
+
+def blank_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def fake_service(**fake_options) -> OCRService:
+    service = OCRService(client=FakeDocumentAIClient(**fake_options))
+    service.project_id, service.location, service.processor_id = "test", "us", "fake"
+    return service
+
+
+def test_fake_backend_runs_without_the_documentai_sdk(monkeypatch):
+    # A None entry makes `import google.cloud.documentai_v1` raise ImportError
+    monkeypatch.setitem(sys.modules, "google.cloud.documentai_v1", None)
+    service = fake_service()
+
+    assert service.extract_text(b"%PDF-1.4 fake", "application/pdf")
+
+
+def test_stopping_early_withdraws_queued_ranges():
+    service = fake_service(latency=0.1)
+    fake = service.client
+    service.max_workers, service.max_queue = 1, 0
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    service.split_min_pages, service.pages_per_request, service.page_concurrency = 10, 5, 6
+
+    async def first_range():
+        ranges = service.iter_document_async(blank_pdf(30), "application/pdf")
+        first = await ranges.__anext__()
+        await ranges.aclose()
+        return first
+
+    first, last, _ = asyncio.run(first_range())
+    assert last - first == 4
+
+    # The range running on the worker finishes; the queued ones never start
+    time.sleep(0.3)
+    stats = service.queue_stats()
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    assert fake.calls < 6
+
+
+def test_a_stream_and_a_blob_ocr_share_their_range_calls(tmp_path):
+    service = fake_service(latency=0.05)
+    fake = service.client
+    service.split_min_pages, service.pages_per_request = 10, 5
+
+    pdf = blank_pdf(30)
+    path = tmp_path / "blob.pdf"
+    path.write_bytes(pdf)
+    blob = {"sha256": uuid.uuid4().hex, "mime_type": "application/pdf"}
+
+    async def both():
+        async def stream():
+            return [part async for part in service.iter_document_async(pdf, "application/pdf", blob)]
+
+        return await asyncio.gather(stream(), service.extract_blob_async(blob, str(path)))
+
+    parts, (text, cached) = asyncio.run(both())
+
+    assert len(parts) == 6
+    assert not cached
+    assert fake.calls == 6
+
+
+def stream_events(monkeypatch, file_id: str, ranges, stop_after=None) -> list:
+    """Body of /api/ocr/{file_id}/stream with iter_document_async faked."""
+    from app.api import ocr_router
+    from app.services.document_service import document_service
+
+    async def fake_ranges(file_bytes, mime_type, blob=None):
+        for item in ranges:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    blob = {"sha256": uuid.uuid4().hex, "mime_type": "application/pdf"}
+    monkeypatch.setattr(document_service, "get_blob", lambda _: blob)
+    monkeypatch.setattr(document_service, "read_file_bytes", lambda _: b"%PDF-1.4 fake")
+    monkeypatch.setattr(ocr_router.ocr_service, "iter_document_async", fake_ranges)
+
+    async def consume():
+        response = await ocr_router.perform_ocr_stream(file_id)
+        body = response.body_iterator
+        events = []
+        async for event in body:
+            events.append(event)
+            if len(events) == stop_after:
+                await body.aclose()
+                break
+        return events
+
+    return asyncio.run(consume())
+
+
+def test_stream_clears_saved_ranges_on_error_and_disconnect(monkeypatch):
+    from app.services.document_service import document_service
+
+    failed = stream_events(monkeypatch, "failed", [(1, 5, "one"), RuntimeError("boom")])
+    assert "event: error" in failed[-1]
+    assert document_service.get_partial_text("failed") is None
+
+    # start, then the first range: the client goes away
+    gone = stream_events(monkeypatch, "gone", [(1, 5, "one"), (6, 10, "two")], stop_after=2)
+    assert "event: pages" in gone[-1]
+    assert document_service.get_partial_text("gone") is None
@@ -0,0 +1,140 @@
+# tests/test_singleflight.py
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.llm.gemini_client import AsyncGeminiClient
+from app.llm.gemini_fake import FakeGenAIClient
+from app.llm.singleflight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == [1]
+    assert results == [{"value": 42}] * 5
+    assert flight.stats()["upstream_calls"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        return await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_error_reaches_every_waiter_and_releases_the_key():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        # The key is free again: the next call runs instead of replaying the error
+        retry = await flight.do("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retry
+
+    results, retry = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "upstream down" for r in results)
+    assert retry == "ok"
+
+
+def test_a_failure_with_no_waiters_is_not_left_unretrieved():
+    flight = SingleFlight()
+
+    async def failing():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do("key", failing))
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_a_cancelled_leader_does_not_fail_the_other_callers():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()  # e.g. its client disconnected
+        result = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return result
+
+    assert asyncio.run(scenario()) == "value"
+    assert calls == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_the_call_is_cancelled_once_its_last_caller_gives_up():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.do("key", slow), timeout=0.02)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert cancelled == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_concurrent_identical_gemini_requests_make_one_upstream_call():
+    fake = FakeGenAIClient(latency=0.05)
+    client = AsyncGeminiClient(client=fake)
+    text = f"quarterly figures {uuid.uuid4().hex} lorem ipsum dolor"
+
+    async def scenario():
+        return await asyncio.gather(*(client.summarize(text) for _ in range(5)))
+
+    summaries = asyncio.run(scenario())
+
+    assert summaries == ["Fake summary."] * 5
+    assert fake.calls == 1
@@ -0,0 +1,151 @@
+# tests/test_upload_stream.py
+
+import asyncio
+import hashlib
+import os
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.services.upload_stream import (
+    MissingUpload,
+    UnsupportedUpload,
+    UploadError,
+    UploadTooLarge,
+    receive_upload,
+)
+
+BOUNDARY = "docai-test-boundary"
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+def multipart(parts) -> bytes:
+    """Body for [(field name, filename or None, content)]."""
+    body = b""
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def streamed_request(body: bytes, chunk_size: int = 1000, content_length: bool = False,
+                     content_type: str = f"multipart/form-data; boundary={BOUNDARY}"):
+    """A Request whose body arrives in chunks; `sent` counts the chunks read."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    sent = []
+
+    async def receive():
+        i = len(sent)
+        sent.append(i)
+        return {"type": "http.request", "body": chunks[i], "more_body": i < len(chunks) - 1}
+
+    headers = [(b"content-type", content_type.encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": headers}
+    return Request(scope, receive), chunks, sent
+
+
+def receive(request, path, **kwargs):
+    return asyncio.run(receive_upload(request, str(path), **kwargs))
+
+
+def test_file_is_streamed_to_disk_with_its_hash(tmp_path):
+    path = tmp_path / "upload"
+    body = multipart([("note", None, b"hello"), ("file", "a.pdf", PDF)])
+    request, _, _ = streamed_request(body, chunk_size=97)
+
+    result = receive(request, path)
+
+    assert result.filename == "a.pdf"
+    assert result.size == len(PDF)
+    assert result.mime_type == "application/pdf"
+    assert result.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert path.read_bytes() == PDF
+
+
+def test_oversized_stream_is_cut_off_early(tmp_path):
+    path = tmp_path / "upload"
+    request, chunks, sent = streamed_request(multipart([("file", "big.pdf", PDF * 10)]))
+
+    with pytest.raises(UploadTooLarge) as e:
+        receive(request, path, max_bytes=len(PDF))
+
+    assert e.value.status_code == 413
+    assert len(sent) < len(chunks)
+    assert os.listdir(tmp_path) == []   # .part file removed
+
+
+def test_oversized_content_length_is_refused_before_reading(tmp_path):
+    request, _, sent = streamed_request(multipart([("file", "big.pdf", PDF * 10)]), content_length=True)
+
+    with pytest.raises(UploadTooLarge):
+        receive(request, tmp_path / "upload", max_bytes=len(PDF))
+
+    assert sent == []
+
+
+def test_malformed_body_is_a_400(tmp_path):
+    body = multipart([("file", "a.pdf", PDF)]).replace(b"\r\n\r\n", b"\r\n", 1)
+    request, _, _ = streamed_request(body)
+
+    with pytest.raises(UploadError) as e:
+        receive(request, tmp_path / "upload")
+
+    assert e.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_non_multipart_request_is_a_400(tmp_path):
+    request, _, sent = streamed_request(PDF, content_type="application/pdf")
+
+    with pytest.raises(UploadError) as e:
+        receive(request, tmp_path / "upload")
+
+    assert e.value.status_code == 400
+    assert sent == []
+
+
+def test_unsupported_file_type_is_a_415(tmp_path):
+    request, _, _ = streamed_request(multipart([("file", "a.zip", b"PK\x03\x04" + b"\x00" * 4000)]))
+
+    with pytest.raises(UnsupportedUpload):
+        receive(request, tmp_path / "upload")
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_file_part_is_a_422(tmp_path):
+    request, _, _ = streamed_request(multipart([("note", None, b"hello"), ("other", "a.pdf", PDF)]))
+
+    with pytest.raises(MissingUpload) as e:
+        receive(request, tmp_path / "upload")
+
+    assert e.value.status_code == 422
+
+
+def test_oversized_form_field_is_rejected(tmp_path):
+    request, _, _ = streamed_request(multipart([("note", None, b"x" * 100_000), ("file", "a.pdf", PDF)]))
+
+    with pytest.raises(UploadError, match="Form field too large"):
+        receive(request, tmp_path / "upload")
+
+
+def test_upload_endpoint_maps_errors_to_status_codes():
+    import main
+
+    async def post(body: bytes, content_type: str):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/upload", content=body, headers={"content-type": content_type})
+
+    malformed = asyncio.run(post(b"--not-the-boundary\r\ngarbage", f"multipart/form-data; boundary={BOUNDARY}"))
+    assert malformed.status_code == 400
+    assert malformed.json()["detail"].startswith("Malformed multipart upload")
+
+    ok = asyncio.run(post(multipart([("file", "a.pdf", PDF)]), f"multipart/form-data; boundary={BOUNDARY}"))
+    assert ok.status_code == 200
+    assert ok.json()["file_id"]
@@ -0,0 +1,54 @@
+# tests/test_vector_index.py
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+
+def clustered(n: int, dim: int = 16, clusters: int = 4, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    return centres[np.arange(n) % clusters] + 0.05 * rng.normal(size=(n, dim))
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 15, 16, 40])
+def test_ivf_trains_at_small_thresholds(size):
+    index = VectorIndex(ann_threshold=1, nprobe=64)
+    vectors = clustered(size)
+    index.add(vectors)
+
+    assert index.mode == "ivf"
+    assert 1 <= index.stats()["lists"] <= size
+
+    # Probing every bucket scores every row, so the nearest row is itself
+    rows, scores = index.search(vectors[size - 1], k=1)
+    assert rows.tolist() == [size - 1]
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_ivf_matches_brute_force_when_probing_every_list():
+    vectors = clustered(300)
+    exact = VectorIndex(ann_threshold=10**9)
+    ivf = VectorIndex(ann_threshold=50, nprobe=10**6)
+    exact.add(vectors)
+    for chunk in np.array_split(vectors, 6):  # grows past the threshold, then retrains
+        ivf.add(chunk)
+
+    assert exact.mode == "brute_force"
+    assert ivf.mode == "ivf"
+    for query in vectors[::37]:
+        exact_rows, _ = exact.search(query, k=5)
+        ivf_rows, _ = ivf.search(query, k=5)
+        assert set(ivf_rows.tolist()) == set(exact_rows.tolist())
+
+
+def test_search_excludes_the_query_row():
+    index = VectorIndex(ann_threshold=1, nprobe=64)
+    vectors = clustered(10)
+    index.add(vectors)
+
+    rows, _ = index.search(vectors[3], k=3, exclude=3)
+
+    assert 3 not in rows.tolist()
+    assert len(rows) == 3
@@ -1,5 +1,5 @@
 import React, { useState, useRef } from "react";
-import { uploadInvoice, runOCR, runDetect, runExtract } from "./api/invoice";
+import { uploadInvoice, runOCRStream, runDetect, runExtract } from "./api/invoice";
 import DragDrop from "./components/DragDrop";
 import PdfPreview from "./components/PdfPreview";
 import CacheStats from "./components/CacheStats";
@@ -48,7 +48,12 @@ export default function App() {
             const fileId = up.file_id ?? up.id;
 
             setLoadingStep("Running OCR...");
-            await runOCR(fileId);
+            let pagesDone = 0;
+            await runOCRStream(fileId, ({ first_page, last_page }) => {
+                if (!last_page) return;
+                pagesDone += last_page - first_page + 1;
+                setLoadingStep(`Running OCR... (${pagesDone} pages done)`);
+            });
 
             setLoadingStep("Running detection...");
             const detectStart = Date.now();
@@ -20,6 +20,41 @@ export async function runOCR(fileId) {
     return resp.data;
 }
 
+// run OCR streamed page by page -> POST /api/ocr/{file_id}/stream (SSE)
+// onPages({ first_page, last_page, text }) is called as each page range is done.
+// No axios timeout here: long scans keep sending events until they finish.
+export async function runOCRStream(fileId, onPages = () => {}) {
+    const resp = await fetch(`${API.defaults.baseURL}/api/ocr/${fileId}/stream`, { method: "POST" });
+    if (!resp.ok) {
+        const body = await resp.json().catch(() => ({}));
+        throw new Error(body.detail || `OCR failed (HTTP ${resp.status})`);
+    }
+
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let end;
+        while ((end = buffer.indexOf("\n\n")) !== -1) {
+            const raw = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+
+            const event = raw.match(/^event: (.*)$/m)?.[1];
+            const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || "{}");
+
+            if (event === "pages") onPages(data);
+            if (event === "error") throw new Error(data.detail);
+            if (event === "done") return data;
+        }
+    }
+    throw new Error("OCR stream ended early");
+}
+
 // run detect -> POST /api/detect?file_id=...
 export async function runDetect(fileId, overrideType = "") {
     const params = { file_id: fileId };
@@ -37,3 +72,29 @@ export async function runExtract(fileId, include_summary = true, include_embeddi
     const resp = await API.post(`/api/extract/${fileId}`, null, { params });
     return resp.data;
 }
+
+// run OCR for many files at once -> POST /api/ocr/batch
+export async function runOCRBatch(fileIds, includeText = false) {
+    const resp = await API.post("/api/ocr/batch", {
+        file_ids: fileIds,
+        include_text: includeText,
+    });
+    return resp.data;
+}
+
+// queue upload -> OCR -> detect -> extract as one background job -> POST /api/jobs
+export async function submitJob(file, params = {}) {
+    const fd = new FormData();
+    fd.append("file", file);
+    const resp = await API.post("/api/jobs", fd, {
+        params,
+        headers: { "Content-Type": "multipart/form-data" },
+    });
+    return resp.data;
+}
+
+// job status, per-stage summaries and (once completed) the extract result -> GET /api/jobs/{job_id}
+export async function getJob(jobId) {
+    const resp = await API.get(`/api/jobs/${jobId}`);
+    return resp.data;
+}